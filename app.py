@@ -2,40 +2,158 @@
 Beatify - Transform words into music using AI
 Main Flask Application
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, g, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import sys
+import time
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from routes.music_routes import music_bp
+from config.settings import APP_CONFIG, RATE_LIMIT_CONFIG, TRACING_CONFIG
 from utils.logger import setup_logger
+from utils import metrics, tracing
+from utils.static_assets import StaticAssets, negotiate
+from utils.rate_limiter import create_rate_limiter, too_many_requests
 
-# Initialize Flask app
-app = Flask(__name__, static_folder='frontend', static_url_path='')
-CORS(app)
+
+class TracedJSONProvider(DefaultJSONProvider):
+    """JSON provider that records response serialization as a trace span"""
+
+    def dumps(self, obj, **kwargs):
+        with tracing.span('serialize'):
+            return super().dumps(obj, **kwargs)
+
+# Initialize Flask app; the frontend is served by the in-memory asset bundle below
+app = Flask(__name__, static_folder=None)
+app.json = TracedJSONProvider(app)
+CORS(app, expose_headers=[
+    'Server-Timing', 'X-Trace-Id', 'Idempotent-Replayed',
+    'RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset', 'RateLimit-Policy', 'Retry-After'
+])
 
 # Setup logger
 logger = setup_logger()
 
+# The mix renderer's spawned workers re-run this script as __mp_main__ before
+# taking tasks; they only need utils.audio_dsp, so don't build a controller,
+# rate limiter or asset bundle there
+MIX_WORKER = __name__ == '__mp_main__'
+
 # Register blueprints
-app.register_blueprint(music_bp, url_prefix='/api')
+if not MIX_WORKER:
+    from routes.music_routes import music_bp
+    app.register_blueprint(music_bp, url_prefix='/api')
+
+if TRACING_CONFIG['file']:
+    tracing.add_exporter(tracing.JsonLinesExporter(TRACING_CONFIG['file']))
+
+# Request metrics and tracing
+@app.before_request
+def start_timer():
+    """Record request start time and open the request trace"""
+    g.request_start = time.perf_counter()
+    if TRACING_CONFIG['enabled']:
+        incoming = request.headers.get('X-Trace-Id') or request.headers.get('traceparent')
+        trace = tracing.start_trace(tracing.clean_trace_id(incoming), request.path)
+        g.route_span = trace.start_span('route')
+
+# Per-client rate limiting of API routes
+if not MIX_WORKER:
+    app.extensions['rate_limiter'] = create_rate_limiter(RATE_LIMIT_CONFIG)
+
+if RATE_LIMIT_CONFIG['proxy_hops']:
+    # Only the entries our own proxies appended are trusted: the leftmost
+    # X-Forwarded-For values come from the client and can be anything
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=RATE_LIMIT_CONFIG['proxy_hops'])
+
+@app.before_request
+def enforce_rate_limit():
+    """Charge the caller's bucket for this route's budget and reject with 429 when it is empty"""
+    rate_limiter = app.extensions.get('rate_limiter')
+    if rate_limiter is None or request.blueprint != 'music':
+        return None
+    view = app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'rate_limit_budget', 'read')
+    if getattr(view, 'rate_limit_deferred', False):
+        # The view charges its own budget once it knows the request is expensive
+        budget = 'read'
+    client = g.client_id = rate_limiter.client_id(request.headers.get('X-API-Key'), request.remote_addr)
+    decision = g.rate_limit = rate_limiter.check(budget, client)
+    if not decision.allowed:
+        return too_many_requests(decision)
+    return None
+
+@app.after_request
+def add_rate_limit_headers(response):
+    """Attach RateLimit-* headers for the budget charged to this request"""
+    decision = g.pop('rate_limit', None)
+    if decision is not None:
+        response.headers.extend(decision.headers())
+    return response
+
+@app.after_request
+def record_metrics(response):
+    """Count the request, observe its latency and attach the timing breakdown"""
+    start = g.pop('request_start', None)
+    # Use the matched rule, not the raw path, to keep label cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    route_span = g.pop('route_span', None)
+    if route_span is not None:
+        route_span.end()
+        trace = tracing.end_trace()
+        if trace is not None:
+            response.headers['X-Trace-Id'] = trace.trace_id
+            response.headers['Server-Timing'] = trace.server_timing()
+    status = str(response.status_code)
+    metrics.HTTP_REQUESTS.inc(route=route, method=request.method, status=status)
+    if response.status_code >= 400:
+        metrics.HTTP_ERRORS.inc(route=route, status=status)
+    if start is not None:
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, route=route)
+    return response
+
+# Prometheus metrics
+@app.route('/metrics')
+def prometheus_metrics():
+    """Expose metrics in Prometheus text format"""
+    return Response(metrics.REGISTRY.render(), mimetype=metrics.CONTENT_TYPE)
 
 # Serve frontend
+static_assets = None if MIX_WORKER else StaticAssets(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend'),
+    reload=APP_CONFIG['debug']
+)
+
+def asset_response(asset):
+    """Serve a precompressed asset, answering revalidation with 304"""
+    encoding, body = negotiate(asset, request.accept_encodings)
+    etag = f'{asset.etag}-{encoding}' if encoding else asset.etag
+    response = Response(body, mimetype=asset.mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = asset.cache_control
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """Serve main page"""
-    return send_from_directory('frontend', 'index.html')
+    return asset_response(static_assets.get('index.html'))
 
 @app.route('/<path:path>')
 def serve_static(path):
-    """Serve static files"""
-    try:
-        return send_from_directory('frontend', path)
-    except:
-        return send_from_directory('frontend', 'index.html')
+    """Serve static files, falling back to the main page for client-side routes"""
+    asset = static_assets.get(path)
+    if asset is None:
+        if os.path.splitext(path)[1]:
+            return not_found(None)
+        asset = static_assets.get('index.html')
+    return asset_response(asset)
 
 # Health check
 @app.route('/health')
@@ -56,7 +174,7 @@ def not_found(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    logger.error(f'Internal error: {str(error)}')
+    logger.error('Internal error: %s', error)
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
@@ -0,0 +1,119 @@
+"""
+Concurrency Stress Benchmark - Playlist mutations from many threads
+
+Threads hammer a shared MusicController with add_to_playlist,
+reorder_playlist_tracks and rename_playlist calls. Every track is added
+by exactly one call, so after the run each playlist must contain exactly
+the tracks whose add succeeded: any lost update or duplicate is reported
+as a failure. Throughput is reported for each thread count.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--threads 1,2,4,8,16] [--ops 20000] [--playlists 32]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+
+from controllers.music_controller import MusicController
+from utils.track_record import TrackRecord
+
+
+def make_record(i):
+    return TrackRecord(
+        title=f'Track {i}', language='English', genre='Pop', mood='happy', style='synth pop',
+        lyrics=None, duration='1-2 minutes', audio_url='placeholder', audio_format='mp3',
+        audio_engine='placeholder', keyword=f'word{i}', timestamp='2025-01-01T00:00:00Z', model='perplexity'
+    )
+
+
+def run(thread_count, ops, playlist_count):
+    controller = MusicController()
+    seed_ids = []
+    for i in range(playlist_count):
+        track_id = f's{i}'
+        controller.track_store[track_id] = make_record(i)
+        seed_ids.append(track_id)
+    for i in range(ops):
+        controller.track_store[f't{i}'] = make_record(i)
+
+    playlist_ids = [
+        controller.create_playlist(f'Playlist {i}', [seed_ids[i]])['playlist_id']
+        for i in range(playlist_count)
+    ]
+
+    added = {playlist_id: set() for playlist_id in playlist_ids}
+    added_lock = threading.Lock()
+    counts = {'add': 0, 'reorder': 0, 'reorder_mismatch': 0, 'rename': 0}
+    barrier = threading.Barrier(thread_count + 1)
+
+    def worker(index):
+        rng = random.Random(index)
+        local = dict.fromkeys(counts, 0)
+        barrier.wait()
+        for op in range(index, ops, thread_count):
+            playlist_id = rng.choice(playlist_ids)
+            roll = rng.random()
+            if roll < 0.6:
+                result = controller.add_to_playlist(playlist_id, [f't{op}'])
+                if result['success'] and result['added_count']:
+                    with added_lock:
+                        added[playlist_id].add(f't{op}')
+                local['add'] += 1
+            elif roll < 0.9:
+                ordered = list(controller.get_playlist(playlist_id)['tracks'])
+                rng.shuffle(ordered)
+                result = controller.reorder_playlist_tracks(playlist_id, ordered)
+                local['reorder' if result['success'] else 'reorder_mismatch'] += 1
+            else:
+                controller.rename_playlist(playlist_id, f'Playlist {op}')
+                local['rename'] += 1
+        with added_lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    errors = 0
+    for index, playlist_id in enumerate(playlist_ids):
+        tracks = controller.get_playlist(playlist_id)['tracks']
+        expected = added[playlist_id] | {seed_ids[index]}
+        if len(tracks) != len(set(tracks)) or set(tracks) != expected:
+            errors += 1
+    return ops / elapsed, counts, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', default='1,2,4,8,16', help='Comma-separated thread counts')
+    parser.add_argument('--ops', type=int, default=20000, help='Operations per run')
+    parser.add_argument('--playlists', type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'ops/s':>10} {'adds':>7} {'reorders':>9} {'mismatch':>9} {'renames':>8}  result")
+    failed = False
+    for thread_count in (int(value) for value in args.threads.split(',')):
+        throughput, counts, errors = run(thread_count, args.ops, args.playlists)
+        failed = failed or errors > 0
+        print(f"{thread_count:>7} {throughput:>10,.0f} {counts['add']:>7} {counts['reorder']:>9} "
+              f"{counts['reorder_mismatch']:>9} {counts['rename']:>8}  "
+              f"{'OK' if not errors else f'{errors} playlists lost updates'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
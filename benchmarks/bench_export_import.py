@@ -0,0 +1,105 @@
+"""
+Export / Import Benchmark - NDJSON round trip of a large library
+
+Seeds a MusicController with synthetic tracks and playlists, streams the
+export into a temporary file, then imports that file into a fresh
+controller. Reports throughput for both directions, the process's peak
+RSS growth during export (which should stay flat as the library grows)
+and, with --wait-index, how long background indexing takes to catch up.
+
+Usage:
+    python benchmarks/bench_export_import.py [--tracks 1000000] [--playlists 1000] [--wait-index]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+
+from controllers.music_controller import MusicController
+from utils.track_record import TrackRecord
+
+GENRES = ['Pop', 'Rock', 'Jazz', 'Classical', 'Electronic', 'Folk', 'Hip-Hop']
+MOODS = ['happy', 'calm', 'energetic', 'melancholic', 'romantic']
+LANGUAGES = ['English', 'Hindi', 'Tamil', 'Spanish', 'Japanese']
+WORDS = ['moon', 'river', 'night', 'love', 'fire', 'rain', 'dream', 'road', 'star', 'heart']
+
+
+def make_record(i, rng):
+    lyrics = ' '.join(rng.choice(WORDS) for _ in range(40))
+    return TrackRecord(
+        title=f'Track {i}', language=rng.choice(LANGUAGES), genre=rng.choice(GENRES),
+        mood=rng.choice(MOODS), style=f'{rng.choice(WORDS)} {rng.choice(GENRES).lower()}', lyrics=lyrics,
+        duration='1-2 minutes', audio_url=f'/api/audio/synth/{i:020x}.wav', audio_format='wav',
+        audio_engine='synth', keyword=rng.choice(WORDS), timestamp='2025-01-01T00:00:00Z', model='perplexity'
+    )
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=200000)
+    parser.add_argument('--playlists', type=int, default=1000)
+    parser.add_argument('--playlist-size', type=int, default=20)
+    parser.add_argument('--wait-index', action='store_true', help='Also time background indexing')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    source = MusicController()
+    ids = [str(1700000000000 + i) for i in range(args.tracks)]
+    for start in range(0, args.tracks, 10000):
+        source.track_store.put_many(
+            (ids[i], make_record(i, rng)) for i in range(start, min(start + 10000, args.tracks))
+        )
+    for p in range(args.playlists):
+        source.create_playlist(f'Playlist {p}', rng.sample(ids, min(args.playlist_size, len(ids))))
+    print(f"seeded {len(source.track_store):,} tracks ({source.track_store.spilled_count:,} spilled), "
+          f"{len(source.playlist_store):,} playlists; peak RSS {max_rss_mb():,.0f} MB")
+
+    with tempfile.NamedTemporaryFile('w+b', suffix='.ndjson', delete=False) as handle:
+        path = handle.name
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        for line in source.export_records():
+            handle.write(line.encode('utf-8'))
+        export_seconds = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 1e6
+    records = args.tracks + args.playlists
+    print(f"export  {export_seconds:7.2f}s  {records / export_seconds:>10,.0f} records/s  "
+          f"{size_mb / export_seconds:7.1f} MB/s  ({size_mb:,.0f} MB, peak RSS +{max_rss_mb() - rss_before:,.0f} MB)")
+    source.track_store.close()
+    del source
+
+    target = MusicController()
+    with open(path, 'rb') as handle:
+        result = target.import_records(handle)
+    os.remove(path)
+    print(f"import  {result['seconds']:7.2f}s  {result['records_per_second']:>10,} records/s  "
+          f"{result['megabytes_per_second']:7.1f} MB/s  ({result['tracks']:,} tracks, {result['playlists']:,} playlists, "
+          f"{result['errors']} errors, index backlog {result['index_backlog']:,})")
+
+    if args.wait_index:
+        start = time.perf_counter()
+        while target._index_backlog or target._indexer is not None:
+            time.sleep(0.05)
+        print(f"index   {result['seconds'] + time.perf_counter() - start:7.2f}s after import started "
+              f"({len(target.search_index):,} searchable)")
+    else:
+        target._index_backlog.clear()
+        while target._indexer is not None:
+            time.sleep(0.05)
+    target.track_store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Hot Path Microbenchmarks - Controller operations as the stores grow
+
+Fills a MusicController with synthetic tracks and playlists at increasing
+sizes, measures time and peak memory for each operation, and flags
+operations whose cost grows faster than linearly with store size.
+
+Usage:
+    python benchmarks/bench_hot_paths.py [--sizes 1000,10000,100000,1000000] [--output hot_paths.json]
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+
+from controllers.music_controller import MusicController
+from utils.validators import validate_input
+from utils.json_formatter import prepare_json
+from utils.track_record import TrackRecord
+
+GENRES = ['Electronic', 'Pop', 'Hip Hop', 'Rock', 'Jazz', 'Ambient', 'Lo-fi', 'House']
+MOODS = ['energetic', 'happy', 'sad', 'relaxed', 'emotional', 'chill', 'dark']
+LANGUAGES = ['English', 'Spanish', 'French', 'German', 'Japanese', 'Hindi', 'Tamil']
+
+# Slope of log(time) vs log(size) above this is reported as super-linear
+SUPERLINEAR_SLOPE = 1.15
+
+
+def synthetic_response(i):
+    return {
+        'track': {
+            'title': f'Track {i}',
+            'language': LANGUAGES[i % len(LANGUAGES)],
+            'genre': GENRES[i % len(GENRES)],
+            'mood': MOODS[i % len(MOODS)],
+            'style': 'warm analog synths with punchy drums',
+            'lyrics': ' '.join(['la'] * 60),
+            'duration': '1-2 minutes',
+            'audio_url': 'placeholder'
+        },
+        'metadata': {'keyword': f'word{i}', 'timestamp': '2025-01-01T00:00:00Z', 'model': 'perplexity'}
+    }
+
+
+def build_controller(size):
+    """
+    Controller holding `size` tracks, size // 10 playlists of 10 tracks and
+    one playlist of every track
+
+    Returns:
+        tuple: (controller, track ids, id of the playlist holding every track)
+    """
+    controller = MusicController()
+    track_ids = []
+    for i in range(size):
+        track_id = str(10 ** 12 + i)
+        data = prepare_json(synthetic_response(i), f'word{i}')
+        data['track'].update({'audio_url': 'placeholder', 'audio_format': 'mp3', 'audio_engine': 'placeholder'})
+        controller.track_store[track_id] = TrackRecord.from_dict(data)
+        track_ids.append(track_id)
+
+    # Created through the controller so tracks are pinned as in production
+    for p in range(max(1, size // 10)):
+        controller.create_playlist(f'Playlist {p}', track_ids[p * 10:(p + 1) * 10])
+
+    # One playlist that holds every track, to exercise per-playlist scaling
+    big_id = controller.create_playlist('Everything', track_ids)['playlist_id']
+    return controller, track_ids, big_id
+
+
+def operations(controller, track_ids, big_id):
+    """Name -> (setup, operation) pairs; setup returns the argument passed to the operation"""
+    rng = random.Random(0)
+    extra = track_ids[:100]
+    extra_set = set(extra)
+
+    def add_setup():
+        # Make room for the 100 tracks we add back, as a copy-on-write update
+        def drop_extra(playlist):
+            playlist['tracks'] = [t for t in playlist['tracks'] if t not in extra_set]
+            return True
+
+        controller.playlist_store.update(big_id, drop_extra)
+        controller.track_store.unpin(extra)
+        return extra
+
+    def reorder_setup():
+        ordered = list(controller.playlist_store[big_id]['tracks'])
+        rng.shuffle(ordered)
+        return ordered
+
+    return {
+        'validate_input': (lambda: 'Sunrise Boulevard', validate_input),
+        'prepare_json': (lambda: synthetic_response(1), lambda data: prepare_json(data, 'word')),
+        'list_tracks': (lambda: None, lambda _: controller.list_tracks()),
+        'list_playlists': (lambda: None, lambda _: controller.list_playlists()),
+        'add_to_playlist (100 into big)': (add_setup, lambda ids: controller.add_to_playlist(big_id, ids)),
+        'reorder_playlist_tracks (big)': (
+            reorder_setup, lambda ordered: controller.reorder_playlist_tracks(big_id, ordered)
+        ),
+    }
+
+
+def measure(setup, operation, repeats):
+    """Best wall time over `repeats` runs, then one traced run for peak memory"""
+    best = float('inf')
+    for _ in range(repeats):
+        argument = setup()
+        gc.collect()
+        start = time.perf_counter()
+        operation(argument)
+        best = min(best, time.perf_counter() - start)
+
+    argument = setup()
+    gc.collect()
+    tracemalloc.start()
+    operation(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def slope(points):
+    """Least-squares slope of log(time) against log(size)"""
+    xs = [math.log(size) for size, value in points if value > 0]
+    ys = [math.log(value) for size, value in points if value > 0]
+    if len(xs) < 2:
+        return None
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator if denominator else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated store sizes')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = {}
+    for size in sizes:
+        build_start = time.perf_counter()
+        controller, track_ids, big_id = build_controller(size)
+        print(f"\nsize {size:,} (built in {time.perf_counter() - build_start:.1f}s)")
+        for name, (setup, operation) in operations(controller, track_ids, big_id).items():
+            seconds, peak = measure(setup, operation, args.repeats)
+            results.setdefault(name, []).append({'size': size, 'seconds': seconds, 'peak_bytes': peak})
+            print(f"  {name:<34} {seconds * 1000:12.3f} ms  peak {peak / 1024:10.1f} KiB")
+        del controller, track_ids
+        gc.collect()
+
+    print(f"\n{'operation':<34} {'slope':>7}  scaling")
+    summary = {}
+    for name, points in results.items():
+        value = slope([(p['size'], p['seconds']) for p in points])
+        flagged = value is not None and value > SUPERLINEAR_SLOPE
+        summary[name] = {'slope': value, 'superlinear': flagged}
+        label = 'n/a' if value is None else f'{value:7.2f}'
+        print(f"{name:<34} {label:>7}  {'SUPER-LINEAR' if flagged else 'ok'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'sizes': sizes, 'results': results, 'summary': summary}, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
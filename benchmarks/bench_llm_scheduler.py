@@ -0,0 +1,104 @@
+"""
+LLM Scheduler Benchmark - Interactive latency under a saturating batch load
+
+Simulated upstream calls (a fixed sleep) run through LLMScheduler while
+batch tenants keep every worker thread busy and interactive requests
+arrive at a steady rate. The same load is run with every call in one
+class and tenant (plain FIFO under the concurrency cap) and with the
+fair-share classes, reporting interactive queue wait and how evenly the
+batch tenants shared the remaining capacity.
+
+Usage:
+    python benchmarks/bench_llm_scheduler.py [--seconds 10] [--service-ms 100] [--slots 4]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+
+from services.llm_scheduler import LLMScheduler
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def run(fair, args):
+    scheduler = LLMScheduler(
+        max_concurrency=args.slots,
+        reserved=1 if fair else 0,
+        queue_timeout=0
+    )
+    service = args.service_ms / 1000
+    stop = threading.Event()
+    batch_done = {}
+    lock = threading.Lock()
+
+    def batch_worker(tenant):
+        while not stop.is_set():
+            with scheduler.slot(*(('batch', tenant) if fair else ('interactive', 'all'))):
+                time.sleep(service)
+            with lock:
+                batch_done[tenant] = batch_done.get(tenant, 0) + 1
+
+    waits = []
+
+    def interactive_call(user):
+        started = time.perf_counter()
+        scheduler.acquire(*(('interactive', user) if fair else ('interactive', 'all')))
+        wait = time.perf_counter() - started
+        try:
+            time.sleep(service)
+        finally:
+            scheduler.release('interactive')
+        with lock:
+            waits.append(wait)
+
+    # Tenant "big" runs three times as many workers as tenant "small"
+    workers = [threading.Thread(target=batch_worker, args=('big',), daemon=True) for _ in range(args.batch_threads * 3)]
+    workers += [threading.Thread(target=batch_worker, args=('small',), daemon=True) for _ in range(args.batch_threads)]
+    for thread in workers:
+        thread.start()
+
+    rng = random.Random(7)
+    calls = []
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        time.sleep(rng.expovariate(args.interactive_rate))
+        call = threading.Thread(target=interactive_call, args=(f'user{rng.randrange(50)}',))
+        call.start()
+        calls.append(call)
+    for call in calls:
+        call.join()
+    stop.set()
+    for thread in workers:
+        thread.join()
+    return sorted(waits), batch_done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--service-ms', type=float, default=100)
+    parser.add_argument('--slots', type=int, default=4)
+    parser.add_argument('--batch-threads', type=int, default=8, help='Workers for the small batch tenant (big gets 3x)')
+    parser.add_argument('--interactive-rate', type=float, default=5, help='Interactive calls per second')
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  batch calls big/small")
+    for label, fair in (('fifo', False), ('fair', True)):
+        waits, batch_done = run(fair, args)
+        print(f"{label:>6} {len(waits):>6} {percentile(waits, 0.5) * 1e3:>8.1f} {percentile(waits, 0.95) * 1e3:>8.1f} "
+              f"{percentile(waits, 0.99) * 1e3:>8.1f} {waits[-1] * 1e3 if waits else 0:>8.1f}  "
+              f"{batch_done.get('big', 0)}/{batch_done.get('small', 0)}")
+
+
+if __name__ == '__main__':
+    main()
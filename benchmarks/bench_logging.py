@@ -0,0 +1,95 @@
+"""
+Logging Benchmark - Request-thread cost of synchronous vs queued logging
+
+Simulates stdout backpressure with a sink that sleeps on every write and
+measures how many log calls per second request threads can make.
+
+Usage:
+    python benchmarks/bench_logging.py [--threads 8] [--messages 2000] [--write-delay 0.0002]
+"""
+import argparse
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import NonBlockingQueueHandler, SamplingFilter
+
+
+class SlowStream(io.TextIOBase):
+    """Stream whose writes block for a fixed time, like a congested pipe"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+
+def make_handler(mode, stream, sample_rate):
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sink = logging.StreamHandler(stream)
+    sink.setFormatter(formatter)
+    if mode == 'sync':
+        return sink, None
+    log_queue = queue.Queue(maxsize=100000)
+    handler = NonBlockingQueueHandler(log_queue)
+    if sample_rate < 1.0:
+        handler.addFilter(SamplingFilter(sample_rate))
+    listener = logging.handlers.QueueListener(log_queue, sink)
+    listener.start()
+    return handler, listener
+
+
+def run(mode, threads, messages, delay, sample_rate=1.0):
+    logger = logging.getLogger(f'bench.{mode}.{sample_rate}')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler, listener = make_handler(mode, SlowStream(delay), sample_rate)
+    logger.addHandler(handler)
+
+    def worker():
+        for i in range(messages):
+            logger.info('Generating music for: "%s" in %s', 'keyword', 'English')
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if listener:
+        listener.stop()
+    logger.removeHandler(handler)
+
+    total = threads * messages
+    label = mode if sample_rate >= 1.0 else f'{mode} (sampled {sample_rate:g})'
+    print(f"{label:<24} {total / elapsed:12,.0f} calls/s  {elapsed / total * 1e6:8.2f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--write-delay', type=float, default=0.0002,
+                        help='Seconds each write to the sink blocks')
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.messages} messages, sink delay {args.write_delay * 1e3:.2f} ms\n")
+    run('sync', args.threads, args.messages, args.write_delay)
+    run('queue', args.threads, args.messages, args.write_delay)
+    run('queue', args.threads, args.messages, args.write_delay, sample_rate=0.1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Model Router Benchmark - Cost and latency-target misses against a fixed model
+
+Replays a simulated stream of interactive calls through ModelRouter on a
+simulated clock (--rate calls per second), so the rolling window ages as
+it would in production. Each model's latency is drawn from a log-normal
+distribution; part-way
+through, the cheapest model slows down past the target, and later the
+mid-priced one starts failing. The same stream is run with routing off
+(always sonar-pro, the service default) and on, reporting total cost,
+calls over the latency target, failed calls and the router's own
+overhead per decision.
+
+Usage:
+    python benchmarks/bench_model_router.py [--calls 6000] [--rate 2] [--target 10]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+
+from services import model_router
+from services.model_router import ModelRouter, parse_costs
+
+MODELS = ['sonar', 'sonar-pro', 'sonar-reasoning']
+COSTS = parse_costs('sonar=1,sonar-reasoning=2,sonar-pro=3')
+MEDIAN_SECONDS = {'sonar': 4.0, 'sonar-pro': 3.0, 'sonar-reasoning': 6.0}
+
+
+def simulate(model, phase, rng):
+    """Latency and success of one simulated call"""
+    median = MEDIAN_SECONDS[model]
+    if model == 'sonar' and phase == 1:
+        median *= 4  # the cheap model is overloaded
+    ok = not (model == 'sonar-reasoning' and phase == 2 and rng.random() < 0.6)
+    return median * math.exp(rng.gauss(0, 0.3)), ok
+
+
+def run(enabled, args):
+    rng = random.Random(7)
+    now = [0.0]
+    model_router.time = types.SimpleNamespace(monotonic=lambda: now[0])
+    router = ModelRouter(MODELS, 'sonar-pro', enabled=enabled, costs=COSTS,
+                         targets={'interactive': args.target})
+    cost = late = failed = 0
+    choose_seconds = 0.0
+    for call in range(args.calls):
+        # Phases: normal, cheap model slow, cheap model back but mid model failing
+        phase = call * 3 // args.calls
+        now[0] += 1.0 / args.rate
+        started = time.perf_counter()
+        model = router.choose('interactive')
+        choose_seconds += time.perf_counter() - started
+        latency, ok = simulate(model, phase, rng)
+        router.record(model, latency, ok)
+        cost += COSTS[model]
+        late += latency > args.target
+        failed += not ok
+    return cost, late, failed, choose_seconds / args.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=6000)
+    parser.add_argument('--rate', type=float, default=2, help='Simulated calls per second')
+    parser.add_argument('--target', type=float, default=10, help='Interactive latency target in seconds')
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'cost':>8} {'late':>6} {'failed':>7} {'choose us':>10}")
+    for label, enabled in (('fixed', False), ('routed', True)):
+        cost, late, failed, overhead = run(enabled, args)
+        print(f"{label:>6} {cost:>8} {late:>6} {failed:>7} {overhead * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
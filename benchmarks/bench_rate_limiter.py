@@ -0,0 +1,83 @@
+"""
+Rate Limiter Overhead Benchmark
+
+Measures the cost of one token-bucket check on the in-process backend for
+a growing number of distinct clients and threads, then the end-to-end
+cost per request by timing GET /api/tracks through the Flask test client
+with the limiter on and off.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--checks 200000] [--requests 5000]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+
+from utils.rate_limiter import RateLimiter, MemoryBackend
+
+
+def bench_checks(checks, clients, threads):
+    limiter = RateLimiter({'read': '1000000/1'}, MemoryBackend(max_keys=max(clients * 2, 1000)))
+    ids = [f'ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}' for i in range(clients)]
+    per_thread = checks // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset):
+        barrier.wait()
+        for i in range(offset, offset + per_thread):
+            limiter.check('read', ids[i % clients])
+
+    workers = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (per_thread * threads)
+
+
+def bench_requests(count):
+    import app as application
+    client = application.app.test_client()
+    # Large read budget so every request takes the normal (allowed) path
+    limiter = RateLimiter({'read': f'{count * 10}/1'}, MemoryBackend())
+
+    results = {}
+    for label, active in (('off', None), ('on', limiter)) * 3:
+        application.app.extensions['rate_limiter'] = active
+        for _ in range(200):
+            client.get('/api/tracks')
+        start = time.perf_counter()
+        for _ in range(count):
+            client.get('/api/tracks')
+        elapsed = (time.perf_counter() - start) / count
+        results[label] = min(results.get(label, elapsed), elapsed)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--checks', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'threads':>8} {'us/check':>9}")
+    for clients in (1, 10000, 100000):
+        for threads in (1, 8):
+            print(f"{clients:>8} {threads:>8} {bench_checks(args.checks, clients, threads) * 1e6:>9.2f}")
+
+    results = bench_requests(args.requests)
+    print(f"\nGET /api/tracks via test client: limiter off {results['off'] * 1e6:.0f} us, "
+          f"on {results['on'] * 1e6:.0f} us, overhead {(results['on'] - results['off']) * 1e6:+.1f} us/request")
+
+
+if __name__ == '__main__':
+    main()
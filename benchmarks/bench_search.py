@@ -0,0 +1,89 @@
+"""
+Search Benchmark - Index build rate and BM25 query latency as the index grows
+
+Indexes synthetic tracks whose words follow a Zipf distribution (so some
+terms appear in most tracks and most terms are rare) and times rare,
+common and multi-word queries at each size.
+
+Usage:
+    python benchmarks/bench_search.py [--sizes 10000,100000,1000000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.search_index import SearchIndex
+
+VOCABULARY_SIZE = 50000
+
+
+def make_vocabulary(rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(VOCABULARY_SIZE)]
+
+
+def make_document(rng, vocabulary, weights):
+    words = rng.choices(vocabulary, cum_weights=weights, k=70)
+    return {
+        'title': ' '.join(words[:3]),
+        'keyword': words[3],
+        'style': ' '.join(words[4:10]),
+        'lyrics': ' '.join(words[10:])
+    }
+
+
+def time_queries(index, queries, limit):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated index sizes')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per category')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    # Zipf(1.1) cumulative weights
+    weights, total = [], 0.0
+    for rank in range(1, VOCABULARY_SIZE + 1):
+        total += 1 / rank ** 1.1
+        weights.append(total)
+
+    categories = {
+        'common (top 20 terms)': lambda: vocabulary[rng.randrange(20)],
+        'mid (rank 100-1000)': lambda: vocabulary[rng.randrange(100, 1000)],
+        'rare (rank 10k+)': lambda: vocabulary[rng.randrange(10000, VOCABULARY_SIZE)],
+        'three words': lambda: ' '.join(rng.choices(vocabulary, cum_weights=weights, k=3)),
+    }
+
+    index = SearchIndex()
+    indexed = 0
+    for size in (int(size) for size in args.sizes.split(',')):
+        start = time.perf_counter()
+        while indexed < size:
+            index.add(str(indexed), make_document(rng, vocabulary, weights))
+            indexed += 1
+        elapsed = time.perf_counter() - start
+        print(f"\nsize {size:,}  ({elapsed:.1f}s to grow, {len(index._postings):,} terms)")
+        for name, make_query in categories.items():
+            queries = [make_query() for _ in range(args.queries)]
+            p50, p99 = time_queries(index, queries, args.limit)
+            print(f"  {name:<24} p50 {p50 * 1000:8.3f} ms   p99 {p99 * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Similar Tracks Benchmark - Feature matrix memory and top-k latency as it grows
+
+Adds synthetic tracks through TrackVectors.add (the same path generation
+uses), then reports matrix memory and cosine top-k latency for single
+queries and batches.
+
+Usage:
+    python benchmarks/bench_similar.py [--sizes 10000,100000,1000000] [--queries 50] [--batch 16]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+
+from config.settings import MUSIC_SETTINGS
+from utils.track_vectors import TrackVectors
+
+WORDS = [
+    'warm', 'analog', 'synths', 'punchy', 'drums', 'airy', 'pads', 'deep', 'bass', 'vocal',
+    'chops', 'lush', 'strings', 'gritty', 'guitar', 'soft', 'piano', 'vinyl', 'crackle', 'bright',
+    'heart', 'night', 'dream', 'fire', 'rain', 'love', 'light', 'road', 'home', 'sky'
+]
+
+
+def synthetic_track(rng):
+    return {
+        'genre': rng.choice(MUSIC_SETTINGS['genres']),
+        'mood': rng.choice(MUSIC_SETTINGS['moods']),
+        'language': rng.choice(MUSIC_SETTINGS['languages']),
+        'style': ' '.join(rng.choices(WORDS[:20], k=6)),
+        'lyrics': ' '.join(rng.choices(WORDS, k=40))
+    }
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.99) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated matrix sizes')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=16, help='Query tracks per batched call')
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vectors = TrackVectors()
+    if not vectors.available:
+        sys.exit('NumPy is required for this benchmark')
+
+    print(f"{vectors.dimensions} dimensions per track")
+    for size in (int(size) for size in args.sizes.split(',')):
+        start = time.perf_counter()
+        added = len(vectors)
+        while len(vectors) < size:
+            vectors.add(str(len(vectors)), synthetic_track(rng))
+        rate = (size - added) / (time.perf_counter() - start)
+
+        single = []
+        for _ in range(args.queries):
+            query = str(rng.randrange(size))
+            start = time.perf_counter()
+            vectors.most_similar([query], args.k)
+            single.append(time.perf_counter() - start)
+
+        batched = []
+        for _ in range(max(1, args.queries // args.batch)):
+            queries = [str(rng.randrange(size)) for _ in range(args.batch)]
+            start = time.perf_counter()
+            vectors.most_similar(queries, args.k)
+            batched.append((time.perf_counter() - start) / args.batch)
+
+        used = size * vectors.dimensions * 4
+        print(f"\nsize {size:,}  ({rate:,.0f} tracks/s added)")
+        print(f"  matrix        {used / 2 ** 20:8.1f} MiB used, {vectors.nbytes / 2 ** 20:8.1f} MiB allocated "
+              f"({used / size:.0f} B/track)")
+        p50, p99 = percentiles(single)
+        print(f"  single query  p50 {p50 * 1000:8.2f} ms   p99 {p99 * 1000:8.2f} ms")
+        p50, p99 = percentiles(batched)
+        print(f"  batch of {args.batch:<4} p50 {p50 * 1000:8.2f} ms   p99 {p99 * 1000:8.2f} ms  per query")
+
+
+if __name__ == '__main__':
+    main()
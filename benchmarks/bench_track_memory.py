@@ -0,0 +1,102 @@
+"""
+Track Memory Benchmark - Bytes per stored track, nested dicts vs TrackRecord
+
+Builds tracks the way the app does (parsed from JSON, so every track owns
+its own copies of genre, mood and language strings) and measures the
+memory held by each representation with tracemalloc.
+
+Usage:
+    python benchmarks/bench_track_memory.py [--tracks 100000] [--lyrics-lines 24]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-benchmark')
+
+from config.settings import MUSIC_SETTINGS
+from utils.json_formatter import prepare_json
+from utils.track_record import TrackRecord
+
+WORDS = (
+    'heart night dream fire rain love light road home sky stars city dance '
+    'alone forever tonight feel hold run free lost found golden shadow ocean'
+).split()
+
+
+def synthetic_lyrics(rng, lines):
+    verse = [' '.join(rng.choices(WORDS, k=rng.randint(5, 9))).capitalize() for _ in range(lines // 2)]
+    chorus = [' '.join(rng.choices(WORDS, k=6)).capitalize() for _ in range(4)]
+    return '\n'.join(verse[:len(verse) // 2] + chorus + verse[len(verse) // 2:] + chorus)
+
+
+def synthetic_track(rng, i, lines):
+    raw = json.dumps({
+        'track': {
+            'title': f'Track {i}',
+            'language': rng.choice(MUSIC_SETTINGS['languages']),
+            'genre': rng.choice(MUSIC_SETTINGS['genres']),
+            'mood': rng.choice(MUSIC_SETTINGS['moods']),
+            'style': 'warm analog synths with punchy drums and airy pads',
+            'lyrics': synthetic_lyrics(rng, lines),
+            'duration': '1-2 minutes'
+        },
+        'metadata': {'keyword': f'word{i}', 'timestamp': '2025-01-01T00:00:00Z', 'model': 'perplexity'}
+    })
+    data = prepare_json(json.loads(raw), f'word{i}')
+    data['track'].update(json.loads('{"audio_url": "placeholder", "audio_format": "mp3", "audio_engine": "placeholder"}'))
+    return data
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = {str(i): build(i) for i in range(count)}
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=100000)
+    parser.add_argument('--lyrics-lines', type=int, default=24)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tracks = [synthetic_track(rng, i, args.lyrics_lines) for i in range(args.tracks)]
+    lyrics_bytes = sum(len(t['track']['lyrics'].encode('utf-8')) for t in tracks) / args.tracks
+    print(f"{args.tracks:,} tracks, average lyrics {lyrics_bytes:,.0f} bytes")
+
+    # Copy so the dict store owns its strings, as it would after parsing a response
+    dict_store, dict_bytes, _ = measure(lambda i: json.loads(json.dumps(tracks[i])), args.tracks)
+    del dict_store
+    record_store, record_bytes, elapsed = measure(
+        lambda i: TrackRecord.from_dict(json.loads(json.dumps(tracks[i]))), args.tracks
+    )
+
+    sample = [str(rng.randrange(args.tracks)) for _ in range(1000)]
+    start = time.perf_counter()
+    for track_id in sample:
+        record_store[track_id].to_dict()
+    read_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    print(f"  nested dicts   {dict_bytes / args.tracks:10,.0f} B/track")
+    print(f"  TrackRecord    {record_bytes / args.tracks:10,.0f} B/track  "
+          f"({1 - record_bytes / dict_bytes:.0%} smaller)")
+    print(f"  build {elapsed / args.tracks * 1e6:.1f} us/track (includes JSON round trip), "
+          f"to_dict {read_us:.1f} us/track")
+
+
+if __name__ == '__main__':
+    main()
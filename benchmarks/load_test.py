@@ -0,0 +1,256 @@
+"""
+Load Test - Throughput and latency percentiles against local upstream stubs
+
+Starts stub Perplexity and Freesound servers, runs the Flask app on a
+local threaded server pointed at them, then drives the API at each
+concurrency level and writes the results as JSON.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1,8,32 --requests 200 --output bench.json
+    python benchmarks/load_test.py --compare bench.json   # re-run and show deltas
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_servers import (
+    StubConfig, PerplexityStubHandler, FreesoundStubHandler, start_stub
+)
+
+SCENARIOS = ('generate', 'tracks', 'playlists')
+WORDS = ['sunrise', 'ocean', 'thunder', 'velvet', 'neon', 'harbor', 'ember', 'glacier',
+         'meadow', 'comet', 'lantern', 'canyon', 'willow', 'orbit', 'saffron', 'tide']
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def start_app(args, perplexity_url, freesound_url):
+    """Configure the environment, import the app and serve it on a free port"""
+    os.environ.update({
+        'PERPLEXITY_API_KEY': 'pplx-loadtest',
+        'PERPLEXITY_API_URL': f'{perplexity_url}/chat/completions',
+        'FREESOUND_API_KEY': '' if args.no_freesound else 'loadtest',
+        'FREESOUND_API_URL': f'{freesound_url}/apiv2/search/text/',
+        'GENERATION_CACHE_TTL': os.environ.get('GENERATION_CACHE_TTL', '0' if not args.cache else '3600'),
+        'LOG_SAMPLE_RATE': os.environ.get('LOG_SAMPLE_RATE', '0'),
+        # Every simulated user shares one address, so per-client limits would throttle the run
+        'RATE_LIMIT_ENABLED': os.environ.get('RATE_LIMIT_ENABLED', 'false'),
+    })
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from app import app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+class Client:
+    """One simulated user with its own HTTP session"""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def timed(self, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=60, **kwargs)
+            ok = response.status_code < 400
+            body = response.json() if ok and response.content else None
+        except Exception:
+            ok, body = False, None
+        return time.perf_counter() - start, ok, body
+
+
+def run_scenario(name, base_url, concurrency, total, state):
+    """
+    Issue `total` operations from `concurrency` workers
+
+    Returns:
+        dict: Result record for this scenario and concurrency
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(i):
+        nonlocal errors
+        if not hasattr(local, 'client'):
+            local.client = Client(base_url)
+        client = local.client
+
+        if name == 'generate':
+            elapsed, ok, body = client.timed('POST', '/api/generate', json={
+                'word': random.choice(WORDS), 'language': 'English'
+            })
+            if ok and body:
+                with lock:
+                    state['track_ids'].append(body['trackId'])
+        elif name == 'tracks':
+            elapsed, ok, _ = client.timed('GET', '/api/tracks')
+        else:
+            # Mixed playlist workload: create, read, add, list
+            track_ids = state['track_ids']
+            op = i % 4
+            if op == 0 or not state['playlist_ids']:
+                elapsed, ok, body = client.timed('POST', '/api/playlists', json={
+                    'name': f'load {i}', 'track_ids': random.sample(track_ids, min(5, len(track_ids)))
+                })
+                if ok and body:
+                    with lock:
+                        state['playlist_ids'].append(body['playlist_id'])
+            elif op == 1:
+                elapsed, ok, _ = client.timed('GET', f"/api/playlist/{random.choice(state['playlist_ids'])}")
+            elif op == 2:
+                elapsed, ok, _ = client.timed('PUT', f"/api/playlist/{random.choice(state['playlist_ids'])}", json={
+                    'action': 'add', 'track_ids': [random.choice(track_ids)]
+                })
+            else:
+                elapsed, ok, _ = client.timed('GET', '/api/playlists')
+
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': errors,
+        'duration_s': round(wall, 3),
+        'throughput_rps': round(total / wall, 2) if wall else 0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p90': round(percentile(latencies, 0.90) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0,
+            'mean': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0
+        }
+    }
+
+
+def print_results(results, baseline=None):
+    previous = {}
+    if baseline:
+        previous = {(r['scenario'], r['concurrency']): r for r in baseline.get('results', [])}
+
+    print(f"\n{'scenario':<10} {'conc':>5} {'rps':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'err':>5}")
+    for result in results:
+        latency = result['latency_ms']
+        line = (f"{result['scenario']:<10} {result['concurrency']:>5} {result['throughput_rps']:>9.1f} "
+                f"{latency['p50']:>9.1f} {latency['p90']:>9.1f} {latency['p99']:>9.1f} {result['errors']:>5}")
+        old = previous.get((result['scenario'], result['concurrency']))
+        if old:
+            rps_delta = (result['throughput_rps'] / old['throughput_rps'] - 1) * 100 if old['throughput_rps'] else 0
+            p99_delta = (latency['p99'] / old['latency_ms']['p99'] - 1) * 100 if old['latency_ms']['p99'] else 0
+            line += f"   rps {rps_delta:+.1f}%  p99 {p99_delta:+.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and level')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--perplexity-latency', default='lognormal:800:0.4')
+    parser.add_argument('--perplexity-error-rate', type=float, default=0.0)
+    parser.add_argument('--lyrics-chars', type=int, default=400, help='Lyrics size in stub responses')
+    parser.add_argument('--freesound-latency', default='lognormal:150:0.3')
+    parser.add_argument('--freesound-error-rate', type=float, default=0.0)
+    parser.add_argument('--no-freesound', action='store_true', help='Use placeholder audio instead')
+    parser.add_argument('--cache', action='store_true', help='Leave the generation cache enabled')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    levels = [int(level) for level in args.concurrency.split(',')]
+    scenarios = [name for name in args.scenarios.split(',') if name in SCENARIOS]
+
+    perplexity_config = StubConfig(args.perplexity_latency, args.perplexity_error_rate, args.lyrics_chars)
+    freesound_config = StubConfig(args.freesound_latency, args.freesound_error_rate)
+    _, perplexity_url = start_stub(PerplexityStubHandler, perplexity_config)
+    _, freesound_url = start_stub(FreesoundStubHandler, freesound_config)
+    server, base_url = start_app(args, perplexity_url, freesound_url)
+
+    # Seed tracks so read and playlist scenarios have data at every level
+    state = {'track_ids': [], 'playlist_ids': []}
+    run_scenario('generate', base_url, 8, 20, state)
+
+    results = []
+    for name in scenarios:
+        for level in levels:
+            result = run_scenario(name, base_url, level, args.requests, state)
+            results.append(result)
+            print(f"  {name} @ {level}: {result['throughput_rps']} rps, p99 {result['latency_ms']['p99']} ms")
+
+    server.shutdown()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': vars(args),
+            'upstream_calls': {
+                'perplexity': perplexity_config.requests,
+                'freesound': freesound_config.requests
+            }
+        },
+        'results': results
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
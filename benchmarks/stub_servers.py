@@ -0,0 +1,247 @@
+"""
+Stub Servers - Local stand-ins for the Perplexity and Freesound APIs
+
+Both stubs answer with realistic response shapes (including the
+markdown-fenced JSON Perplexity returns) after a configurable delay, and
+can be told to fail a fraction of requests.
+
+Usage (standalone):
+    python benchmarks/stub_servers.py --perplexity-port 8801 --freesound-port 8802
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+GENRES = ['Electronic', 'Pop', 'Hip Hop', 'Rock', 'Jazz', 'Ambient', 'Lo-fi', 'House']
+MOODS = ['energetic', 'happy', 'sad', 'relaxed', 'emotional', 'chill', 'dark', 'uplifting']
+LYRIC_WORDS = ['night', 'light', 'heart', 'sky', 'fire', 'rain', 'dream', 'road', 'echo', 'gold']
+
+
+class LatencyModel:
+    """
+    Samples a delay in seconds from a spec string
+
+    Specs (milliseconds):
+        "fixed:200"            always 200 ms
+        "uniform:100:400"      uniformly between 100 and 400 ms
+        "lognormal:800:0.5"    log-normal with median 800 ms and sigma 0.5
+        "exp:300"              exponential with mean 300 ms
+    """
+
+    def __init__(self, spec='fixed:0'):
+        self.spec = spec
+        kind, *params = spec.split(':')
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if kind not in ('fixed', 'uniform', 'lognormal', 'exp'):
+            raise ValueError(f'Unknown latency spec: {spec}')
+
+    def sample(self):
+        if self.kind == 'fixed':
+            ms = self.params[0] if self.params else 0
+        elif self.kind == 'uniform':
+            ms = random.uniform(self.params[0], self.params[1])
+        elif self.kind == 'lognormal':
+            ms = random.lognormvariate(0, self.params[1]) * self.params[0]
+        else:
+            ms = random.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0
+        return max(ms, 0) / 1000
+
+
+class StubConfig:
+    """Behaviour shared by both stubs"""
+
+    def __init__(self, latency='fixed:0', error_rate=0.0, response_size=400, error_status=503):
+        """
+        Args:
+            latency (str): Latency spec (see LatencyModel)
+            error_rate (float): Fraction of requests answered with error_status
+            response_size (int): Lyrics characters (Perplexity) or result count (Freesound)
+            error_status (int): HTTP status used for injected errors
+        """
+        self.latency = LatencyModel(latency)
+        self.error_rate = error_rate
+        self.response_size = response_size
+        self.error_status = error_status
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+
+def _lyrics(size):
+    words = []
+    length = 0
+    while length < size:
+        word = random.choice(LYRIC_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def _track(word, language, lyrics_size):
+    return {
+        'track': {
+            'title': f'{word.title()} in {language}',
+            'language': language,
+            'genre': random.choice(GENRES),
+            'mood': random.choice(MOODS),
+            'style': 'warm analog synths, punchy drums and a rolling bassline',
+            'lyrics': _lyrics(lyrics_size),
+            'duration': '1-2 minutes',
+            'audio_url': 'placeholder'
+        },
+        'metadata': {
+            'keyword': word,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'model': 'perplexity'
+        }
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    config = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay_or_fail(self):
+        """Apply latency; returns True if an error response was sent"""
+        self.config.count()
+        time.sleep(self.config.latency.sample())
+        if random.random() < self.config.error_rate:
+            self._send_json(self.config.error_status, {'error': 'injected failure'})
+            return True
+        return False
+
+
+class PerplexityStubHandler(_StubHandler):
+    """Answers POST /chat/completions like the Perplexity API"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if self._delay_or_fail():
+            return
+
+        messages = payload.get('messages', [])
+        system = messages[0]['content'] if messages else ''
+        user = messages[-1]['content'] if messages else ''
+        word = user.rsplit(':', 1)[-1].strip() or 'word'
+
+        multi = re.search(r'for EACH of these languages: (.*?)\.\n', system)
+        if multi:
+            languages = [lang.strip() for lang in multi.group(1).split(',')]
+            body = {'tracks': [_track(word, lang, self.config.response_size) for lang in languages]}
+        else:
+            single = re.search(r"user's word in (\w+)", system)
+            body = _track(word, single.group(1) if single else 'English', self.config.response_size)
+
+        content = '```json\n' + json.dumps(body, ensure_ascii=False, indent=2) + '\n```'
+        self._send_json(200, {
+            'id': 'stub',
+            'model': payload.get('model', 'sonar'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 400, 'completion_tokens': len(content) // 4}
+        })
+
+
+class FreesoundStubHandler(_StubHandler):
+    """Answers GET /apiv2/search/text/ and serves fake preview files"""
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith('/previews/'):
+            return self._send_preview()
+        if self._delay_or_fail():
+            return
+
+        host = f'http://{self.headers.get("Host")}'
+        results = []
+        for i in range(max(1, self.config.response_size // 40)):
+            sound_id = random.randint(1000, 999999)
+            results.append({
+                'id': sound_id,
+                'name': f'stub sound {sound_id}',
+                'duration': random.uniform(30, 180),
+                'username': 'stub',
+                'previews': {
+                    'preview-hq-mp3': f'{host}/previews/{sound_id}-hq.mp3',
+                    'preview-lq-mp3': f'{host}/previews/{sound_id}-lq.mp3'
+                }
+            })
+        self._send_json(200, {'count': len(results), 'results': results})
+
+    def _send_preview(self):
+        # Deterministic bytes so repeated fetches are identical
+        data = (b'ID3' + self.path.encode('utf-8')) * 2048
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stub(handler_class, config, port=0, host='127.0.0.1'):
+    """
+    Start a stub server on a background thread
+
+    Args:
+        handler_class (type): PerplexityStubHandler or FreesoundStubHandler
+        config (StubConfig): Stub behaviour
+        port (int): Port to bind (0 picks a free one)
+        host (str): Interface to bind
+
+    Returns:
+        tuple: (server, base_url)
+    """
+    handler = type(handler_class.__name__, (handler_class,), {'config': config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Perplexity and Freesound stubs')
+    parser.add_argument('--perplexity-port', type=int, default=8801)
+    parser.add_argument('--freesound-port', type=int, default=8802)
+    parser.add_argument('--perplexity-latency', default='lognormal:800:0.4')
+    parser.add_argument('--freesound-latency', default='lognormal:150:0.3')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    _, perplexity_url = start_stub(
+        PerplexityStubHandler, StubConfig(args.perplexity_latency, args.error_rate), args.perplexity_port
+    )
+    _, freesound_url = start_stub(
+        FreesoundStubHandler, StubConfig(args.freesound_latency, args.error_rate), args.freesound_port
+    )
+    print(f"PERPLEXITY_API_URL={perplexity_url}/chat/completions")
+    print(f"FREESOUND_API_URL={freesound_url}/apiv2/search/text/")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Beatify - Offline bulk generation
+
+Generates tracks for every word in an input file without going through
+the HTTP API, writing them to NDJSON in the /api/export track format (so
+the output can be loaded with POST /api/import).
+
+Input is one job per line, either plain text or JSON:
+
+    moon
+    river<TAB>Hindi,Tamil
+    {"word": "star", "languages": ["English", "Spanish"]}
+
+Lines without languages use --languages. Blank lines and lines starting
+with # are ignored. Each finished job is appended to a checkpoint file
+after its tracks are flushed to the output, so rerunning the same command
+after a crash skips completed jobs, retries failed ones and drops any
+partial output written after the last checkpoint. A non-empty output
+without a checkpoint is left alone unless --force is given, which starts
+it over.
+
+Usage:
+    python bulk_generate.py words.txt -o catalog.ndjson [--workers 4] [--rate 2] [--languages English] [--force]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_jobs(path, default_languages):
+    """
+    Parse the input file
+
+    Args:
+        path (str): Input file
+        default_languages (list): Languages for lines that don't name any
+
+    Returns:
+        list: (word, languages tuple) jobs in file order, duplicates removed
+
+    Raises:
+        ValueError: On a malformed line or an unsupported language, before
+                    any job runs
+    """
+    # Deferred like the controller import in main(): settings are read at import time
+    from utils.validators import validate_language
+
+    jobs, seen = [], set()
+    with open(path, encoding='utf-8') as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                try:
+                    entry = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f'{path}:{number}: invalid JSON ({e})') from None
+                word = entry.get('word')
+                languages = entry.get('languages') or ([entry['language']] if entry.get('language') else [])
+                # A bare string would otherwise become one job per character
+                if not isinstance(languages, list) or not all(isinstance(item, str) for item in languages):
+                    raise ValueError(f'{path}:{number}: languages must be a list of language names')
+            else:
+                word, _, languages = line.partition('\t')
+                languages = [language.strip() for language in languages.split(',') if language.strip()]
+            if not isinstance(word, str) or not word.strip():
+                raise ValueError(f'{path}:{number}: missing word')
+            languages = tuple(dict.fromkeys(languages or default_languages))
+            invalid = [language for language in languages if not validate_language(language)]
+            if invalid:
+                raise ValueError(f"{path}:{number}: unsupported languages: {', '.join(invalid)}")
+            job = (word.strip(), languages)
+            if job not in seen:
+                seen.add(job)
+                jobs.append(job)
+    return jobs
+
+
+def job_key(job):
+    word, languages = job
+    return f"{word}\t{','.join(languages)}"
+
+
+def load_checkpoint(path):
+    """
+    Read completed jobs from a checkpoint file
+
+    Args:
+        path (str): Checkpoint file
+
+    Returns:
+        tuple: (set of completed job keys, output offset after the last completed job)
+    """
+    done, offset = set(), 0
+    if not os.path.exists(path):
+        return done, offset
+    valid = 0
+    with open(path, 'r+b') as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if entry['status'] == 'ok':
+                done.add(entry['key'])
+            offset = entry['offset']
+            valid += len(line)
+        # Drop a torn final line from a crash so new entries start cleanly
+        handle.truncate(valid)
+    return done, offset
+
+
+class RateLimiter:
+    """Spaces job starts evenly so at most `rate` begin per second across all workers"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class BulkRun:
+    """One bulk-generation run: workers generate, a lock serializes output and checkpoint writes"""
+
+    def __init__(self, controller, output, checkpoint, rate):
+        self.controller = controller
+        self.output = output
+        self.checkpoint = checkpoint
+        self.limiter = RateLimiter(rate)
+        self.latencies = []
+        self.counts = {'ok': 0, 'failed': 0, 'tracks': 0}
+        self._lock = threading.Lock()
+
+    def run_job(self, job):
+        # Deferred like the controller import in main(): settings are read at import time
+        from services.llm_scheduler import llm_priority
+
+        word, languages = job
+        self.limiter.wait()
+        started = time.perf_counter()
+        try:
+            with llm_priority('batch', tenant='bulk_generate'):
+                if len(languages) == 1:
+                    result = self.controller.generate_music(word, languages[0])
+                    track_ids = [result['trackId']] if result['success'] else []
+                else:
+                    result = self.controller.generate_music_multi(word, list(languages))
+                    track_ids = result.get('trackIds', [])
+            error = None if result['success'] else result.get('message') or result.get('error')
+        except Exception as e:
+            track_ids, error = [], str(e)
+        self.record(job, track_ids, error, time.perf_counter() - started)
+
+    def record(self, job, track_ids, error, latency):
+        lines = []
+        for track_id in track_ids:
+            record = self.controller.track_store.get(track_id, promote=False)
+            lines.append(json.dumps(
+                {'type': 'track', 'id': track_id, **record.to_dict()}, ensure_ascii=False, separators=(',', ':')
+            ) + '\n')
+
+        with self._lock:
+            self.output.write(''.join(lines).encode('utf-8'))
+            self.output.flush()
+            os.fsync(self.output.fileno())
+            self.checkpoint.write(json.dumps({
+                'key': job_key(job),
+                'status': 'failed' if error else 'ok',
+                'tracks': track_ids,
+                'error': error,
+                'offset': self.output.tell()
+            }, ensure_ascii=False) + '\n')
+            # Only flushed, not fsynced: "a crash never leaves duplicates" relies on
+            # the output being fsynced first. A lost checkpoint entry just reruns
+            # the job after its output is truncated back to the previous offset
+            self.checkpoint.flush()
+
+            self.latencies.append(latency)
+            self.counts['failed' if error else 'ok'] += 1
+            self.counts['tracks'] += len(track_ids)
+            if error:
+                print(f'failed: {job[0]} ({", ".join(job[1])}): {error}', file=sys.stderr)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate tracks for every word in a file')
+    parser.add_argument('input', help='Words file (text or JSON lines)')
+    parser.add_argument('-o', '--output', help='NDJSON output (default: <input>.ndjson)')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.checkpoint)')
+    parser.add_argument('--languages', default='English', help='Comma-separated default languages')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent generations')
+    parser.add_argument('--rate', type=float, default=0, help='Maximum jobs started per second (0 = unlimited)')
+    parser.add_argument('--progress', type=float, default=10, help='Seconds between progress lines (0 = off)')
+    parser.add_argument('--verbose', action='store_true', help='Keep the application INFO logs')
+    parser.add_argument('--force', action='store_true', help='Overwrite a non-empty output that has no checkpoint')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        os.environ.setdefault('LOG_SAMPLE_RATE', '0')
+    # Imported after the environment is settled, since settings are read at import time
+    from controllers.music_controller import MusicController
+    from utils.validators import validate_language
+
+    output_path = args.output or os.path.splitext(args.input)[0] + '.ndjson'
+    checkpoint_path = args.checkpoint or output_path + '.checkpoint'
+    default_languages = [language.strip() for language in args.languages.split(',') if language.strip()]
+    invalid = [language for language in default_languages if not validate_language(language)]
+    if invalid:
+        parser.error(f"unsupported languages: {', '.join(invalid)}")
+
+    try:
+        jobs = read_jobs(args.input, default_languages)
+    except ValueError as e:
+        parser.error(str(e))
+    # Without a checkpoint the offset is 0, so resuming would empty the output
+    if (not args.force and not os.path.exists(checkpoint_path)
+            and os.path.exists(output_path) and os.path.getsize(output_path)):
+        parser.error(f'{output_path} is not empty and has no checkpoint ({checkpoint_path}); '
+                     'pass --force to overwrite it')
+    done, offset = load_checkpoint(checkpoint_path)
+    pending = [job for job in jobs if job_key(job) not in done]
+    print(f'{len(jobs)} jobs, {len(jobs) - len(pending)} already done, {len(pending)} to run', file=sys.stderr)
+
+    # Anything past the last checkpointed offset belongs to a job that never finished
+    with open(output_path, 'a+b') as handle:
+        handle.truncate(offset)
+
+    controller = MusicController()
+    # Nothing interactive shares this process, so batch calls may use every slot
+    controller.perplexity_service.scheduler.configure(max_concurrency=max(1, args.workers), reserved=0)
+    with open(output_path, 'ab') as output, open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+        run = BulkRun(controller, output, checkpoint, args.rate)
+        started = time.perf_counter()
+        stop = threading.Event()
+
+        def report():
+            while not stop.wait(args.progress):
+                finished = run.counts['ok'] + run.counts['failed']
+                elapsed = time.perf_counter() - started
+                print(f'{finished}/{len(pending)} jobs, {run.counts["failed"]} failed, '
+                      f'{finished / elapsed:.2f} jobs/s', file=sys.stderr)
+
+        if args.progress:
+            threading.Thread(target=report, daemon=True).start()
+        pool = ThreadPoolExecutor(max_workers=max(1, args.workers))
+        try:
+            for _ in pool.map(run.run_job, pending):
+                pass
+        except KeyboardInterrupt:
+            print('Interrupted; finishing running jobs. Rerun the same command to resume', file=sys.stderr)
+            raise
+        finally:
+            # Queued jobs are dropped, running ones finish and are checkpointed
+            pool.shutdown(wait=True, cancel_futures=True)
+            stop.set()
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(run.latencies)
+    finished = len(latencies)
+    print(f"\n{finished} jobs in {elapsed:.1f}s ({finished / elapsed if elapsed else 0:.2f} jobs/s, "
+          f"{run.counts['tracks'] / elapsed if elapsed else 0:.2f} tracks/s)")
+    print(f"  ok {run.counts['ok']}, failed {run.counts['failed']}, tracks {run.counts['tracks']}")
+    if latencies:
+        print(f"  latency p50 {percentile(latencies, 0.5):.2f}s  p90 {percentile(latencies, 0.9):.2f}s  "
+              f"p99 {percentile(latencies, 0.99):.2f}s  max {latencies[-1]:.2f}s")
+    print(f"  output {output_path}")
+    controller.track_store.close()
+    sys.exit(1 if run.counts['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,19 +10,37 @@ load_dotenv()
 # Perplexity Configuration (Required)
 PERPLEXITY_CONFIG = {
     'api_key': os.getenv('PERPLEXITY_API_KEY', ''),
-    'api_url': 'https://api.perplexity.ai/chat/completions'
+    'api_url': os.getenv('PERPLEXITY_API_URL', 'https://api.perplexity.ai/chat/completions')
 }
 
 # Model Settings
 MODEL_SETTINGS = {
     'perplexity_model': os.getenv('PERPLEXITY_MODEL', 'llama-3.1-sonar-large-128k-online'),
     'max_tokens': int(os.getenv('MAX_TOKENS', '2000')),
+    # Ceiling for one multi-language call, which otherwise asks for max_tokens per language
+    'max_tokens_per_call': int(os.getenv('MAX_TOKENS_PER_CALL', '8000')),
     'temperature': float(os.getenv('TEMPERATURE', '0.7'))
 }
 
 # Audio Configuration (Optional)
 AUDIO_CONFIG = {
-    'freesound_api_key': os.getenv('FREESOUND_API_KEY', '')
+    'freesound_api_key': os.getenv('FREESOUND_API_KEY', ''),
+    'freesound_api_url': os.getenv('FREESOUND_API_URL', 'https://freesound.org/apiv2/search/text/'),
+    # auto: Freesound with a key, otherwise local synthesis (or placeholders without NumPy)
+    'backend': os.getenv('AUDIO_BACKEND', 'auto').lower(),
+    # Remote audio is only fetched from these hosts (and their subdomains)
+    'allowed_hosts': [
+        host.strip().lower()
+        for host in os.getenv('AUDIO_ALLOWED_HOSTS', 'freesound.org,soundhelix.com').split(',')
+        if host.strip()
+    ]
+}
+
+# Procedural Audio Synthesis (used by the "synth" audio backend)
+SYNTH_CONFIG = {
+    'cache_dir': os.getenv('SYNTH_CACHE_DIR', 'cache/synth'),
+    'sample_rate': int(os.getenv('SYNTH_SAMPLE_RATE', '22050')),
+    'duration': float(os.getenv('SYNTH_DURATION', '12'))
 }
 
 # Music Settings
@@ -44,12 +62,153 @@ MUSIC_SETTINGS = {
     ]
 }
 
+# Track Storage
+TRACK_STORE_CONFIG = {
+    'compress_lyrics_min_bytes': int(os.getenv('LYRICS_COMPRESS_MIN_BYTES', '256')),
+    'max_tracks': int(os.getenv('TRACK_STORE_MAX_TRACKS', '0')),  # 0 = unlimited
+    'max_bytes': int(float(os.getenv('TRACK_STORE_MAX_MB', '256')) * 1024 * 1024),
+    'max_age': float(os.getenv('TRACK_STORE_MAX_IDLE_SECONDS', '0')),  # 0 = never
+    'spill_dir': os.getenv('TRACK_SPILL_DIR', 'cache/spill')
+}
+
+# Change Feed
+CHANGE_LOG_CONFIG = {
+    'capacity': int(os.getenv('CHANGE_LOG_SIZE', '10000')),
+    'heartbeat': float(os.getenv('CHANGE_STREAM_HEARTBEAT', '15'))
+}
+
+# Bulk Export / Import
+TRANSFER_CONFIG = {
+    'import_batch_size': int(os.getenv('IMPORT_BATCH_SIZE', '1000')),
+    'export_chunk_bytes': int(os.getenv('EXPORT_CHUNK_BYTES', '65536'))
+}
+
+# Similar Tracks
+SIMILARITY_CONFIG = {
+    'style_buckets': int(os.getenv('SIMILAR_STYLE_BUCKETS', '32')),
+    'lyric_buckets': int(os.getenv('SIMILAR_LYRIC_BUCKETS', '32'))
+}
+
+# Playlist Mix Rendering
+MIX_CONFIG = {
+    'cache_dir': os.getenv('MIX_CACHE_DIR', 'cache/mixes'),
+    'workers': int(os.getenv('MIX_WORKERS', str(max(1, (os.cpu_count() or 2) - 1)))),
+    'fetch_workers': int(os.getenv('MIX_FETCH_WORKERS', '4')),
+    'sample_rate': int(os.getenv('MIX_SAMPLE_RATE', '22050')),
+    'crossfade': float(os.getenv('MIX_CROSSFADE_SECONDS', '3')),
+    'target_dbfs': float(os.getenv('MIX_TARGET_DBFS', '-16'))
+}
+
+# Audio Proxy Cache
+AUDIO_CACHE_CONFIG = {
+    'cache_dir': os.getenv('AUDIO_CACHE_DIR', 'cache/audio'),
+    'max_bytes': int(float(os.getenv('AUDIO_CACHE_MAX_MB', '512')) * 1024 * 1024),
+    'max_file_bytes': int(float(os.getenv('AUDIO_CACHE_MAX_FILE_MB', '50')) * 1024 * 1024),
+    'timeout': float(os.getenv('AUDIO_FETCH_TIMEOUT', '30'))
+}
+
+# Generation Cache & Pre-warming
+CACHE_SETTINGS = {
+    # Off by default: a cached description repeats for every request of the same word
+    'generation_ttl': float(os.getenv('GENERATION_CACHE_TTL', '0')),
+    'max_entries': int(os.getenv('GENERATION_CACHE_SIZE', '1000')),
+    'hot_keyword_capacity': int(os.getenv('HOT_KEYWORD_CAPACITY', '1000')),
+    'prewarm_enabled': os.getenv('PREWARM_ENABLED', 'false').lower() == 'true',
+    'prewarm_top_k': int(os.getenv('PREWARM_TOP_K', '20')),
+    'prewarm_interval': float(os.getenv('PREWARM_INTERVAL', '60')),
+    'prewarm_idle_seconds': float(os.getenv('PREWARM_IDLE_SECONDS', '10'))
+}
+
+# Idempotency-Key support for POST /api/generate
+IDEMPOTENCY_CONFIG = {
+    'ttl': float(os.getenv('IDEMPOTENCY_TTL', '86400')),
+    'max_keys': int(os.getenv('IDEMPOTENCY_MAX_KEYS', '10000')),
+    'wait_timeout': float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '120'))
+}
+
+# Per-client rate limiting; budgets are "requests/seconds" token buckets
+RATE_LIMIT_CONFIG = {
+    # Off by default: behind a proxy without RATE_LIMIT_PROXY_HOPS every user shares one IP bucket
+    'enabled': os.getenv('RATE_LIMIT_ENABLED', 'false').lower() == 'true',
+    'backend': os.getenv('RATE_LIMIT_BACKEND', 'memory').lower(),  # memory or redis
+    'redis_url': os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0'),
+    'api_keys': [key.strip() for key in os.getenv('RATE_LIMIT_API_KEYS', '').split(',') if key.strip()],
+    # Reverse proxies in front of the app; each appends one X-Forwarded-For entry
+    'proxy_hops': int(os.getenv('RATE_LIMIT_PROXY_HOPS', '0')),
+    'max_keys': int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000')),
+    'budgets': {
+        'generate': os.getenv('RATE_LIMIT_GENERATE', '10/60'),
+        'batch': os.getenv('RATE_LIMIT_BATCH', '5/60'),
+        'read': os.getenv('RATE_LIMIT_READ', '600/60')
+    }
+}
+
+# Upstream LLM call scheduling (interactive, batch and prewarm classes)
+LLM_SCHEDULER_CONFIG = {
+    'max_concurrency': int(os.getenv('LLM_MAX_CONCURRENCY', '4')),
+    'reserved_interactive': int(os.getenv('LLM_RESERVED_INTERACTIVE', '1')),
+    'queue_timeout': float(os.getenv('LLM_QUEUE_TIMEOUT', '60')),
+    'retry_after': int(os.getenv('LLM_RETRY_AFTER', '5')),  # Retry-After seconds on a 503 when every slot stays busy
+    # Callers must present one of these X-API-Key values to run as interactive; everyone else is batch
+    'interactive_api_keys': [key.strip() for key in os.getenv('LLM_INTERACTIVE_API_KEYS', '').split(',') if key.strip()],
+    'weights': {
+        'interactive': float(os.getenv('LLM_WEIGHT_INTERACTIVE', '8')),
+        'batch': float(os.getenv('LLM_WEIGHT_BATCH', '2')),
+        'prewarm': float(os.getenv('LLM_WEIGHT_PREWARM', '1'))
+    }
+}
+
+# Model Routing
+MODEL_ROUTING_CONFIG = {
+    # Off by default: PERPLEXITY_MODEL is used for every call
+    'enabled': os.getenv('MODEL_ROUTING_ENABLED', 'false').lower() == 'true',
+    # Relative cost per call; the cheapest model that meets the latency target wins
+    'costs': os.getenv('MODEL_COSTS', 'sonar=1,sonar-reasoning=2,sonar-pro=3'),
+    'targets': {  # Seconds, per LLM priority class
+        'interactive': float(os.getenv('MODEL_TARGET_INTERACTIVE', '10')),
+        'batch': float(os.getenv('MODEL_TARGET_BATCH', '30')),
+        'prewarm': float(os.getenv('MODEL_TARGET_PREWARM', '60'))
+    },
+    'window': float(os.getenv('MODEL_STATS_WINDOW', '300')),
+    'max_samples': int(os.getenv('MODEL_STATS_MAX_SAMPLES', '200')),
+    'min_samples': int(os.getenv('MODEL_STATS_MIN_SAMPLES', '5')),
+    'max_error_rate': float(os.getenv('MODEL_MAX_ERROR_RATE', '0.25')),
+    # Every Nth routed call tries a model that has too few recent samples
+    'probe_every': int(os.getenv('MODEL_PROBE_EVERY', '20'))
+}
+
+# Upstream Record/Replay
+CASSETTE_CONFIG = {
+    'mode': os.getenv('UPSTREAM_CASSETTE_MODE', 'off').lower(),  # off, record or replay
+    'path': os.getenv('UPSTREAM_CASSETTE_PATH', 'cassettes/upstream.jsonl.gz'),
+    'speed': os.getenv('UPSTREAM_CASSETTE_SPEED', 'fast').lower(),  # fast or recorded
+    'strict': os.getenv('UPSTREAM_CASSETTE_STRICT', 'false').lower() == 'true'
+}
+
+# Request Tracing
+TRACING_CONFIG = {
+    'enabled': os.getenv('TRACING_ENABLED', 'true').lower() == 'true',
+    'file': os.getenv('TRACE_FILE', '')  # Optional JSON-lines trace log
+}
+
+# Logging
+LOGGING_CONFIG = {
+    'format': os.getenv('LOG_FORMAT', 'text').lower(),  # "text" or "json"
+    'queue_size': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+    # Fraction of INFO records kept, overall and per message template prefix
+    # e.g. LOG_SAMPLE_RATES="Calling Perplexity API=0.1,Generating audio=0.05"
+    'sample_rate': float(os.getenv('LOG_SAMPLE_RATE', '1.0')),
+    'sample_rates': os.getenv('LOG_SAMPLE_RATES', '')
+}
+
 # App Settings
 APP_CONFIG = {
     'port': int(os.getenv('PORT', '5000')),
     'host': os.getenv('HOST', '0.0.0.0'),
     'debug': os.getenv('FLASK_ENV', 'production') == 'development',
-    'cors_origins': os.getenv('CORS_ORIGINS', '*').split(',')
+    'cors_origins': os.getenv('CORS_ORIGINS', '*').split(','),
+    # Required in X-Admin-Key by /api/admin/* routes; they are disabled when unset
+    'admin_api_key': os.getenv('ADMIN_API_KEY', '')
 }
 
 def validate_config():
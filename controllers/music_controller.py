@@ -1,11 +1,34 @@
 """
 Music Controller - Business logic for music generation
 """
+import copy
+import json
+import os
+import threading
 import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from config.settings import CACHE_SETTINGS, CHANGE_LOG_CONFIG, SYNTH_CONFIG, TRANSFER_CONFIG
 from services.perplexity_service import PerplexityService
 from services.audio_engine import AudioEngine
-from utils.validators import validate_input
+from services.audio_cache import AudioCache
+from services.llm_scheduler import SchedulerTimeout
+from services.mix_renderer import MixRenderer
+from services.model_router import requested_model
+from services.prewarmer import CachePrewarmer
+from utils.validators import validate_input, validate_audio_url, validate_remote_audio_url
 from utils.json_formatter import prepare_json
+from utils.heavy_hitters import SpaceSaving
+from utils.search_index import SearchIndex
+from utils.track_record import TrackRecord
+from utils.track_store import TrackStore
+from utils.playlist_store import PlaylistStore, PlaylistConflict
+from utils.change_log import ChangeLog
+from utils.track_vectors import TrackVectors
+from utils.ttl_cache import TTLCache
+from utils.metrics import STAGE_LATENCY, GENERATION_CACHE, STORE_SIZE, STORE_BYTES
+from utils.tracing import traced
 from utils.logger import setup_logger
 
 logger = setup_logger()
@@ -17,10 +40,131 @@ class MusicController:
         """Initialize services and storage"""
         self.perplexity_service = PerplexityService()
         self.audio_engine = AudioEngine()
-        self.track_store = {}  # In-memory storage
-        self.playlist_store = {}  # In-memory playlist storage
+        self.audio_cache = AudioCache()
+        self.mix_renderer = MixRenderer()
+        self.track_store = TrackStore()  # Track id -> TrackRecord; cold tracks spill to disk
+        self.playlist_store = PlaylistStore()  # In-memory playlist storage
+        self.changes = ChangeLog(CHANGE_LOG_CONFIG['capacity'])
+        self.search_index = SearchIndex()
+        self.track_vectors = TrackVectors()
+
+        # Hot keyword tracking and generation cache
+        self.hot_keywords = SpaceSaving(CACHE_SETTINGS['hot_keyword_capacity'])
+        self.generation_cache = TTLCache(
+            max_entries=CACHE_SETTINGS['max_entries'],
+            ttl=CACHE_SETTINGS['generation_ttl']
+        )
+        self.last_request_at = 0.0
+        self._last_id = 0
+        self._id_lock = threading.Lock()
+        self._index_backlog = deque()  # Imported track ids waiting for search/similarity indexing
+        self._indexer = None
+        self._indexer_lock = threading.Lock()
+        self.prewarmer = CachePrewarmer(
+            self,
+            top_k=CACHE_SETTINGS['prewarm_top_k'],
+            interval=CACHE_SETTINGS['prewarm_interval'],
+            idle_seconds=CACHE_SETTINGS['prewarm_idle_seconds']
+        )
+        if CACHE_SETTINGS['prewarm_enabled'] and self.generation_cache.enabled:
+            self.prewarmer.start()
+
+        # Store sizes are read at scrape time
+        STORE_SIZE.set_function(lambda: len(self.track_store), store='tracks')
+        STORE_SIZE.set_function(lambda: self.track_store.resident_count, store='tracks_resident')
+        STORE_SIZE.set_function(lambda: self.track_store.spilled_count, store='tracks_spilled')
+        STORE_SIZE.set_function(lambda: len(self.playlist_store), store='playlists')
+        STORE_SIZE.set_function(lambda: len(self.generation_cache), store='generation_cache')
+        STORE_SIZE.set_function(lambda: len(self.hot_keywords), store='hot_keywords')
+        STORE_SIZE.set_function(lambda: len(self.audio_cache), store='audio_cache')
+        STORE_SIZE.set_function(lambda: len(self.search_index), store='search_index')
+        STORE_SIZE.set_function(lambda: len(self.track_vectors), store='track_vectors')
+        STORE_SIZE.set_function(lambda: len(self._index_backlog), store='index_backlog')
+        STORE_BYTES.set_function(lambda: self.track_store.resident_bytes, store='tracks')
+
         logger.info("MusicController initialized")
+
+    @staticmethod
+    def _cache_key(word, language):
+        return (str(word).strip().lower(), language)
+
+    def _describe(self, word, language, custom_settings):
+        """
+        Get a music description, serving it from the generation cache when possible
+
+        Args:
+            word (str): The input word/name
+            language (str): Target language
+            custom_settings (dict): Custom settings (bypass the cache when set, as
+                                    does a model override from model_request())
+
+        Returns:
+            dict: Raw Perplexity response (safe to mutate)
+        """
+        key = self._cache_key(word, language)
+        cacheable = self._cacheable(custom_settings)
+        if cacheable:
+            cached = self.generation_cache.get(key)
+            if cached is not None:
+                GENERATION_CACHE.inc(result='hit')
+                logger.info('Generation cache hit for "%s" (%s)', word, language)
+                return copy.deepcopy(cached)
+            GENERATION_CACHE.inc(result='miss')
+
+        response = self.perplexity_service.generate_music_description(
+            word,
+            language,
+            custom_settings
+        )
+        if cacheable:
+            self._cache_description(key, response)
+        return response
+
+    @staticmethod
+    def _cacheable(custom_settings):
+        """Custom settings and a per-request model override both bypass the generation cache"""
+        return not custom_settings and requested_model() is None
+
+    def _cache_description(self, key, response):
+        # Drop the timestamp so every cache hit gets a fresh one in prepare_json
+        cached = copy.deepcopy(response)
+        if isinstance(cached, dict) and isinstance(cached.get('metadata'), dict):
+            cached['metadata'].pop('timestamp', None)
+        self.generation_cache.set(key, cached)
+
+    def refresh_generation(self, word, language='English'):
+        """
+        Regenerate and cache the description for a word, without storing a track
+
+        Args:
+            word (str): The input word/name
+            language (str): Target language
+        """
+        response = self.perplexity_service.generate_music_description(word, language, {})
+        self._cache_description(self._cache_key(word, language), response)
+
+    def get_hot_keywords(self, limit=20):
+        """
+        List the most requested (word, language) pairs
+
+        Args:
+            limit (int): Maximum number of entries
+
+        Returns:
+            list: Keyword summaries, most requested first
+        """
+        return [
+            {
+                'word': word,
+                'language': language,
+                'count': count,
+                'error': error,
+                'cached': self.generation_cache.age((word, language)) is not None
+            }
+            for (word, language), count, error in self.hot_keywords.top(limit)
+        ]
     
+    @traced('controller')
     def generate_music(self, word, language='English', custom_settings=None):
         """
         Generate music from a word
@@ -34,63 +178,273 @@ class MusicController:
             dict: Generation result
         """
         try:
-            logger.info(f'Generating music for: "{word}"')
+            logger.info('Generating music for: "%s"', word)
+            self.last_request_at = time.time()
             
             # Step 1: Validate input
-            is_valid, error_message = validate_input(word)
+            with STAGE_LATENCY.time(stage='validate'):
+                is_valid, error_message = validate_input(word)
             if not is_valid:
-                logger.warning(f"Validation failed: {error_message}")
+                logger.warning("Validation failed: %s", error_message)
                 return {
                     'success': False,
                     'error': error_message
                 }
             
-            # Step 2: Get music description from Perplexity AI
+            # Step 2: Get music description from Perplexity AI (or the cache)
+            self.hot_keywords.add(self._cache_key(word, language))
             logger.info("Requesting description from Perplexity AI...")
-            perplexity_response = self.perplexity_service.generate_music_description(
-                word, 
-                language, 
-                custom_settings or {}
-            )
-            
-            # Step 3: Prepare and validate JSON
-            logger.info("Preparing JSON response...")
-            prepared_data = prepare_json(perplexity_response, word)
+            perplexity_response = self._describe(word, language, custom_settings or {})
             
-            # Step 4: Generate audio from description
-            logger.info("Generating audio...")
-            audio_data = self.audio_engine.generate_audio(prepared_data['track'])
-            
-            # Step 5: Add audio info to response
-            prepared_data['track']['audio_url'] = audio_data['url']
-            prepared_data['track']['audio_format'] = audio_data['format']
-            prepared_data['track']['audio_engine'] = audio_data['engine']
-            
-            # Step 6: Store track
-            track_id = str(int(time.time() * 1000))
-            self.track_store[track_id] = prepared_data
-            
-            logger.info(f'Successfully generated track: {track_id}')
+            return self._finalize_track(word, perplexity_response)
             
+        except SchedulerTimeout as e:
+            return self._overloaded(e)
+        except Exception as e:
+            logger.error('Error generating music: %s', e, exc_info=True)
             return {
-                'success': True,
-                'trackId': track_id,
-                'data': prepared_data,
-                'audioInfo': {
-                    'engine': audio_data['engine'],
-                    'format': audio_data['format'],
-                    'note': audio_data.get('note', '')
+                'success': False,
+                'error': 'Failed to generate music',
+                'message': str(e)
+            }
+    
+    @traced('controller')
+    def generate_music_multi(self, word, languages, custom_settings=None):
+        """
+        Generate one track per language, using a single upstream call for all cache misses
+
+        Args:
+            word (str): The input word/name
+            languages (list): Target languages
+            custom_settings (dict): Optional custom settings
+
+        Returns:
+            dict: Generation result with one entry per stored track. Languages
+                  whose track could not be built are listed under "failed";
+                  the others are still stored and returned.
+        """
+        try:
+            logger.info('Generating music for: "%s" in %s languages', word, len(languages))
+            self.last_request_at = time.time()
+
+            # Step 1: Validate input
+            with STAGE_LATENCY.time(stage='validate'):
+                is_valid, error_message = validate_input(word)
+            if not is_valid:
+                logger.warning("Validation failed: %s", error_message)
+                return {
+                    'success': False,
+                    'error': error_message
                 }
+
+            custom_settings = custom_settings or {}
+
+            # Step 2: Serve what we can from the cache, fetch the rest in one call
+            responses = {}
+            cacheable = self._cacheable(custom_settings)
+            for language in languages:
+                key = self._cache_key(word, language)
+                self.hot_keywords.add(key)
+                cached = self.generation_cache.get(key) if cacheable else None
+                if cached is not None:
+                    GENERATION_CACHE.inc(result='hit')
+                    responses[language] = copy.deepcopy(cached)
+                elif cacheable:
+                    GENERATION_CACHE.inc(result='miss')
+
+            missing = [language for language in languages if language not in responses]
+            if missing:
+                logger.info("Requesting %s descriptions from Perplexity AI...", len(missing))
+                fetched = self.perplexity_service.generate_multilingual_descriptions(
+                    word,
+                    missing,
+                    custom_settings
+                )
+                for language, response in fetched.items():
+                    if cacheable:
+                        self._cache_description(self._cache_key(word, language), response)
+                    responses[language] = response
+
+            # Steps 3-6: Prepare, add audio and store each track separately
+            tracks, failed = [], []
+            for language in languages:
+                try:
+                    entry = self._finalize_track(word, responses[language])
+                except Exception as e:
+                    logger.error('Error building %s track for "%s": %s', language, word, e, exc_info=True)
+                    failed.append({'language': language, 'error': str(e)})
+                    continue
+                entry.pop('success', None)
+                tracks.append(entry)
+
+            if not tracks:
+                return {
+                    'success': False,
+                    'error': 'Failed to generate music',
+                    'message': '; '.join(f"{entry['language']}: {entry['error']}" for entry in failed),
+                    'failed': failed
+                }
+
+            result = {
+                'success': True,
+                'trackIds': [entry['trackId'] for entry in tracks],
+                'tracks': tracks,
+                'upstreamCalls': 1 if missing else 0
             }
-            
+            if failed:
+                # Tracks already stored stay stored; the caller sees which languages are missing
+                result['failed'] = failed
+            return result
+
+        except SchedulerTimeout as e:
+            return self._overloaded(e)
         except Exception as e:
-            logger.error(f'Error generating music: {str(e)}', exc_info=True)
+            logger.error('Error generating music: %s', e, exc_info=True)
             return {
                 'success': False,
                 'error': 'Failed to generate music',
                 'message': str(e)
             }
-    
+
+    def _overloaded(self, error):
+        """Result for a generation that timed out waiting for an upstream slot"""
+        return {
+            'success': False,
+            'error': 'Too many generations in progress, try again later',
+            'message': str(error),
+            'status': 503
+        }
+
+    def _new_id(self):
+        """Millisecond timestamp ID, bumped when several are created in the same millisecond"""
+        with self._id_lock:
+            new_id = max(int(time.time() * 1000), self._last_id + 1)
+            self._last_id = new_id
+        return str(new_id)
+
+    def _finalize_track(self, word, perplexity_response):
+        """
+        Prepare a raw description, attach audio and store it as a new track
+
+        Args:
+            word (str): The input word/name
+            perplexity_response (dict): Raw Perplexity response for one track
+
+        Returns:
+            dict: Generation result for the stored track
+        """
+        # Step 3: Prepare and validate JSON
+        logger.info("Preparing JSON response...")
+        with STAGE_LATENCY.time(stage='prepare_json'):
+            prepared_data = prepare_json(perplexity_response, word)
+
+        # Step 4: Generate audio from description
+        logger.info("Generating audio...")
+        with STAGE_LATENCY.time(stage='audio_lookup'):
+            audio_data = self.audio_engine.generate_audio(prepared_data['track'])
+
+        # Step 5: Add audio info to response
+        prepared_data['track']['audio_url'] = audio_data['url']
+        prepared_data['track']['audio_format'] = audio_data['format']
+        prepared_data['track']['audio_engine'] = audio_data['engine']
+
+        # Step 6: Store track
+        with STAGE_LATENCY.time(stage='store'):
+            track_id = self._new_id()
+            self.track_store[track_id] = TrackRecord.from_dict(prepared_data)
+            self._index_track(track_id, prepared_data)
+            track = prepared_data['track']
+            self.changes.append('track.created', track_id, {
+                'id': track_id,
+                'title': track['title'],
+                'keyword': prepared_data['metadata']['keyword'],
+                'timestamp': prepared_data['metadata']['timestamp'],
+                'genre': track['genre'],
+                'mood': track['mood'],
+                'language': track['language']
+            })
+
+        logger.info('Successfully generated track: %s', track_id)
+
+        return {
+            'success': True,
+            'trackId': track_id,
+            'data': prepared_data,
+            'audioInfo': {
+                'engine': audio_data['engine'],
+                'format': audio_data['format'],
+                'note': audio_data.get('note', '')
+            }
+        }
+
+    def _index_track(self, track_id, data):
+        track = data['track']
+        self.search_index.add(track_id, {
+            'title': track['title'],
+            'keyword': data['metadata']['keyword'],
+            'style': track['style'],
+            'lyrics': track['lyrics']
+        })
+        self.track_vectors.add(track_id, track)
+
+    def search_tracks(self, query, limit=20):
+        """
+        Full-text search over track titles, keywords, styles and lyrics
+
+        Args:
+            query (str): Free-text query in any language
+            limit (int): Maximum number of results
+
+        Returns:
+            tuple: (list of track summaries best first, total number of matches)
+        """
+        ranked, total = self.search_index.search(query, limit)
+        results = []
+        for track_id, score in ranked:
+            record = self.track_store.get(track_id, promote=False)
+            if not record:
+                continue
+            results.append({
+                'id': track_id,
+                'title': record.title,
+                'keyword': record.keyword,
+                'language': record.language,
+                'genre': record.genre,
+                'score': round(score, 4)
+            })
+        return results, total
+
+    def similar_tracks(self, track_id, k=10):
+        """
+        Find the tracks closest to a track by genre, mood, language, style and lyrics
+
+        Args:
+            track_id (str): Track identifier
+            k (int): Maximum number of results
+
+        Returns:
+            dict: {'success': True, 'tracks': [...]} or {'success': False, 'error': str, 'status': int}
+        """
+        if not self.track_vectors.available:
+            return {'success': False, 'error': 'Similar tracks require NumPy', 'status': 503}
+        if track_id not in self.track_vectors:
+            return {'success': False, 'error': 'Track not found', 'status': 404}
+
+        tracks = []
+        for similar_id, score in self.track_vectors.most_similar([track_id], k).get(track_id, []):
+            record = self.track_store.get(similar_id, promote=False)
+            if not record:
+                continue
+            tracks.append({
+                'id': similar_id,
+                'title': record.title,
+                'genre': record.genre,
+                'mood': record.mood,
+                'language': record.language,
+                'score': round(score, 4)
+            })
+        return {'success': True, 'tracks': tracks}
+
     def get_track(self, track_id):
         """
         Retrieve a track by ID
@@ -101,8 +455,139 @@ class MusicController:
         Returns:
             dict: Track data or None
         """
-        return self.track_store.get(track_id)
+        record = self.track_store.get(track_id)
+        return record.to_dict() if record else None
     
+    def _audio_source(self, track_id):
+        """
+        Resolve where a track's audio lives
+
+        Args:
+            track_id (str): Track identifier
+
+        Returns:
+            tuple: ('file', path) for a local synth clip, ('remote', url) for
+                   allowed remote audio, or None
+        """
+        record = self.track_store.get(track_id)
+        if not record:
+            return None
+
+        audio_url = record.audio_url or ''
+        synth_prefix = '/api/audio/synth/'
+        if audio_url.startswith(synth_prefix):
+            path = os.path.join(os.path.abspath(SYNTH_CONFIG['cache_dir']), os.path.basename(audio_url))
+            return ('file', path) if os.path.exists(path) else None
+        if not validate_remote_audio_url(audio_url):
+            if audio_url.startswith(('http://', 'https://')):
+                logger.warning("Refusing audio for track %s from a host that is not allowed", track_id)
+            return None
+        return 'remote', audio_url
+
+    @contextmanager
+    def pinned_track_audio(self, track_id):
+        """
+        Get a local file for a track's audio, fetching and caching remote audio once
+
+        The file can't be evicted from the audio cache until the block exits.
+
+        Args:
+            track_id (str): Track identifier
+
+        Yields:
+            str: Path of the audio file, or None if the track or its audio is unknown
+        """
+        source = self._audio_source(track_id)
+        if not source or source[0] == 'file':
+            yield source[1] if source else None
+            return
+        with self.audio_cache.pinned(source[1]) as path:
+            yield path
+
+    def open_track_audio(self, track_id):
+        """
+        Open a track's audio for sending to a client
+
+        Cached and local files come back as an open handle, so eviction can't
+        remove them mid-send. A cache miss streams from upstream while the
+        cache fills instead of waiting for the whole download.
+
+        Args:
+            track_id (str): Track identifier
+
+        Returns:
+            dict: {'file': handle, 'mimetype': str} or {'stream': iterator,
+                  'length': int or None, 'mimetype': str}, or None if the
+                  track or its audio is unknown
+        """
+        source = self._audio_source(track_id)
+        if not source:
+            return None
+        kind, location = source
+        mimetype = AudioCache.mimetype(AudioCache.file_name(location) if kind == 'remote' else location)
+        if kind == 'file':
+            try:
+                return {'file': open(location, 'rb'), 'mimetype': mimetype}
+            except FileNotFoundError:
+                return None
+
+        handle = self.audio_cache.open(location)
+        if handle:
+            return {'file': handle, 'mimetype': mimetype}
+        chunks, length = self.audio_cache.stream(location)
+        return {'stream': chunks, 'length': length, 'mimetype': mimetype}
+
+    def get_playlist_mix(self, playlist_id):
+        """
+        Get a playlist's continuous mix, either cached or as a live render
+
+        Args:
+            playlist_id (str): Playlist identifier
+
+        Returns:
+            dict: {'path': str} for a cached mix, {'stream': generator} for a
+                  render in progress, or {'error': str, 'status': int}
+        """
+        playlist = self.get_playlist(playlist_id)
+        if not playlist:
+            return {'error': 'Playlist not found', 'status': 404}
+        if not self.mix_renderer.available:
+            return {'error': 'Mix rendering requires NumPy', 'status': 503}
+
+        cached = self.mix_renderer.cached_mix(playlist)
+        if cached:
+            return {'path': cached}
+
+        # Audio is fetched lazily by the renderer; only check there is something to fetch
+        if not any(self._audio_source(track_id) for track_id in playlist['tracks']):
+            return {'error': 'No playable audio in playlist', 'status': 422}
+
+        # Snapshot so later edits don't change the version being rendered
+        snapshot = {'id': playlist['id'], 'tracks': list(playlist['tracks']), 'updated_at': playlist['updated_at']}
+        return {'stream': self.mix_renderer.stream_mix(snapshot, self.pinned_track_audio)}
+
+    def get_changes(self, since, limit=None):
+        """
+        Get track and playlist changes after a sequence number
+
+        Args:
+            since (int): Last sequence number the client has applied
+            limit (int): Maximum number of changes
+
+        Returns:
+            dict: {'changes': [...], 'latest': int, 'reset': bool}
+        """
+        return self.changes.since(since, limit)
+
+    def wait_for_changes(self, since, timeout, limit=None):
+        """
+        Block until changes after `since` exist or the timeout passes
+
+        Returns:
+            dict: Same shape as get_changes()
+        """
+        return self.changes.wait(since, timeout, limit)
+
     def list_tracks(self):
         """
         List all generated tracks
@@ -113,11 +598,11 @@ class MusicController:
         return [
             {
                 'id': track_id,
-                'title': data['track']['title'],
-                'keyword': data['metadata']['keyword'],
-                'timestamp': data['metadata']['timestamp']
+                'title': record.title,
+                'keyword': record.keyword,
+                'timestamp': record.timestamp
             }
-            for track_id, data in self.track_store.items()
+            for track_id, record in self.track_store.items()
         ]
 
     def create_playlist(self, name, track_ids):
@@ -138,7 +623,7 @@ class MusicController:
                 if track_id in self.track_store:
                     valid_tracks.append(track_id)
                 else:
-                    logger.warning(f"Track {track_id} not found, skipping")
+                    logger.warning("Track %s not found, skipping", track_id)
 
             if not valid_tracks:
                 return {
@@ -146,17 +631,18 @@ class MusicController:
                     'error': 'No valid tracks provided'
                 }
 
-            # Create playlist
-            playlist_id = str(int(time.time() * 1000))
-            self.playlist_store[playlist_id] = {
+            # Create playlist; its tracks stay resident while it exists
+            self.track_store.pin(valid_tracks)
+            playlist_id = self._new_id()
+            self.playlist_store.put(playlist_id, {
                 'id': playlist_id,
                 'name': name,
                 'tracks': valid_tracks,
                 'created_at': time.time(),
                 'updated_at': time.time()
-            }
+            }, on_commit=self._record_playlist_change('playlist.created'))
 
-            logger.info(f"Created playlist '{name}' with {len(valid_tracks)} tracks")
+            logger.info("Created playlist '%s' with %s tracks", name, len(valid_tracks))
             return {
                 'success': True,
                 'playlist_id': playlist_id,
@@ -164,7 +650,7 @@ class MusicController:
             }
 
         except Exception as e:
-            logger.error(f"Error creating playlist: {str(e)}")
+            logger.error("Error creating playlist: %s", e)
             return {
                 'success': False,
                 'error': 'Failed to create playlist',
@@ -200,170 +686,319 @@ class MusicController:
             for playlist_id, data in self.playlist_store.items()
         ]
 
-    def add_to_playlist(self, playlist_id, track_ids):
+    def _record_playlist_change(self, event_type, op=None, **details):
+        """Build an on_commit callback that appends a playlist event to the change log"""
+        def record(playlist):
+            data = {'playlist': playlist}
+            if op:
+                data['op'] = op
+            data.update(details)
+            self.changes.append(event_type, playlist['id'], data)
+        return record
+
+    @staticmethod
+    def _conflict_result(conflict):
+        return {
+            'success': False,
+            'error': 'Playlist was modified by another request',
+            'conflict': True,
+            'data': conflict.current
+        }
+
+    def add_to_playlist(self, playlist_id, track_ids, expected_updated_at=None):
         """
         Add tracks to an existing playlist
 
         Args:
             playlist_id (str): Playlist identifier
             track_ids (list): List of track IDs to add
+            expected_updated_at (float): Only apply if the playlist is still at this version
 
         Returns:
             dict: Update result
         """
         try:
-            if playlist_id not in self.playlist_store:
+            added = []
+
+            def add(playlist):
+                for track_id in track_ids:
+                    if track_id in self.track_store and track_id not in playlist['tracks']:
+                        playlist['tracks'].append(track_id)
+                        added.append(track_id)
+                self.track_store.pin(added)
+                return bool(added)
+
+            playlist, changed = self.playlist_store.update(
+                playlist_id, add, expected_updated_at,
+                on_commit=self._record_playlist_change('playlist.updated', 'add', track_ids=added)
+            )
+            if playlist is None:
                 return {
                     'success': False,
                     'error': 'Playlist not found'
                 }
 
-            playlist = self.playlist_store[playlist_id]
-            added_count = 0
-
-            for track_id in track_ids:
-                if track_id in self.track_store and track_id not in playlist['tracks']:
-                    playlist['tracks'].append(track_id)
-                    added_count += 1
-
-            if added_count > 0:
-                playlist['updated_at'] = time.time()
-                logger.info(f"Added {added_count} tracks to playlist '{playlist['name']}'")
+            if changed:
+                logger.info("Added %s tracks to playlist '%s'", len(added), playlist['name'])
 
             return {
                 'success': True,
-                'added_count': added_count,
+                'added_count': len(added),
                 'data': playlist
             }
 
+        except PlaylistConflict as e:
+            return self._conflict_result(e)
         except Exception as e:
-            logger.error(f"Error adding to playlist: {str(e)}")
+            logger.error("Error adding to playlist: %s", e)
             return {
                 'success': False,
                 'error': 'Failed to add tracks to playlist',
                 'message': str(e)
             }
 
-    def remove_from_playlist(self, playlist_id, track_ids):
+    def remove_from_playlist(self, playlist_id, track_ids, expected_updated_at=None):
         """
         Remove tracks from a playlist
 
         Args:
             playlist_id (str): Playlist identifier
             track_ids (list): List of track IDs to remove
+            expected_updated_at (float): Only apply if the playlist is still at this version
 
         Returns:
             dict: Update result
         """
         try:
-            if playlist_id not in self.playlist_store:
+            removed = []
+
+            def remove(playlist):
+                for track_id in track_ids:
+                    if track_id in playlist['tracks']:
+                        playlist['tracks'].remove(track_id)
+                        removed.append(track_id)
+                self.track_store.unpin(removed)
+                return bool(removed)
+
+            playlist, changed = self.playlist_store.update(
+                playlist_id, remove, expected_updated_at,
+                on_commit=self._record_playlist_change('playlist.updated', 'remove', track_ids=removed)
+            )
+            if playlist is None:
                 return {
                     'success': False,
                     'error': 'Playlist not found'
                 }
 
-            playlist = self.playlist_store[playlist_id]
-            removed_count = 0
-
-            for track_id in track_ids:
-                if track_id in playlist['tracks']:
-                    playlist['tracks'].remove(track_id)
-                    removed_count += 1
-
-            if removed_count > 0:
-                playlist['updated_at'] = time.time()
-                logger.info(f"Removed {removed_count} tracks from playlist '{playlist['name']}'")
+            if changed:
+                logger.info("Removed %s tracks from playlist '%s'", len(removed), playlist['name'])
 
             return {
                 'success': True,
-                'removed_count': removed_count,
+                'removed_count': len(removed),
                 'data': playlist
             }
 
+        except PlaylistConflict as e:
+            return self._conflict_result(e)
         except Exception as e:
-            logger.error(f"Error removing from playlist: {str(e)}")
+            logger.error("Error removing from playlist: %s", e)
             return {
                 'success': False,
                 'error': 'Failed to remove tracks from playlist',
                 'message': str(e)
             }
 
-    def rename_playlist(self, playlist_id, new_name):
+    def rename_playlist(self, playlist_id, new_name, expected_updated_at=None):
         """
         Rename an existing playlist
 
         Args:
             playlist_id (str): Playlist identifier
             new_name (str): The new name for the playlist
+            expected_updated_at (float): Only apply if the playlist is still at this version
 
         Returns:
             dict: Update result
         """
         try:
-            if playlist_id not in self.playlist_store:
+            if not new_name or not new_name.strip():
                 return {
                     'success': False,
-                    'error': 'Playlist not found'
+                    'error': 'Playlist name cannot be empty'
                 }
 
-            if not new_name or not new_name.strip():
+            old_names = []
+
+            def rename(playlist):
+                old_names.append(playlist['name'])
+                playlist['name'] = new_name.strip()
+                return True
+
+            playlist, _ = self.playlist_store.update(
+                playlist_id, rename, expected_updated_at,
+                on_commit=self._record_playlist_change('playlist.updated', 'rename')
+            )
+            if playlist is None:
                 return {
                     'success': False,
-                    'error': 'Playlist name cannot be empty'
+                    'error': 'Playlist not found'
                 }
 
-            playlist = self.playlist_store[playlist_id]
-            old_name = playlist['name']
-            playlist['name'] = new_name.strip()
-            playlist['updated_at'] = time.time()
-
-            logger.info(f"Renamed playlist '{old_name}' to '{new_name.strip()}'")
+            logger.info("Renamed playlist '%s' to '%s'", old_names[0], new_name.strip())
 
             return {'success': True, 'data': playlist}
 
+        except PlaylistConflict as e:
+            return self._conflict_result(e)
         except Exception as e:
-            logger.error(f"Error renaming playlist: {str(e)}", exc_info=True)
+            logger.error("Error renaming playlist: %s", e, exc_info=True)
             return {'success': False, 'error': 'Failed to rename playlist', 'message': str(e)}
 
-    def reorder_playlist_tracks(self, playlist_id, ordered_track_ids):
+    def reorder_playlist_tracks(self, playlist_id, ordered_track_ids, expected_updated_at=None):
         """
         Reorder tracks in a playlist.
 
         Args:
             playlist_id (str): The ID of the playlist to update.
             ordered_track_ids (list): A list of track IDs in the new desired order.
+            expected_updated_at (float): Only apply if the playlist is still at this version.
 
         Returns:
             dict: The result of the operation.
         """
         try:
-            if playlist_id not in self.playlist_store:
-                return {'success': False, 'error': 'Playlist not found'}
+            mismatch = []
 
-            playlist = self.playlist_store[playlist_id]
+            def reorder(playlist):
+                # Validate that the new list of IDs matches the existing one, just reordered
+                if sorted(playlist['tracks']) != sorted(ordered_track_ids):
+                    mismatch.append(True)
+                    return False
+                playlist['tracks'] = list(ordered_track_ids)
+                return True
+
+            playlist, _ = self.playlist_store.update(
+                playlist_id, reorder, expected_updated_at,
+                on_commit=self._record_playlist_change('playlist.updated', 'reorder')
+            )
+            if playlist is None:
+                return {'success': False, 'error': 'Playlist not found'}
 
-            # Validate that the new list of IDs matches the existing one, just reordered
-            if sorted(playlist['tracks']) != sorted(ordered_track_ids):
-                logger.warning(f"Track reorder mismatch for playlist {playlist_id}")
+            if mismatch:
+                logger.warning("Track reorder mismatch for playlist %s", playlist_id)
                 return {
                     'success': False,
                     'error': 'Track list mismatch. Reorder failed.'
                 }
 
-            # Update the track order
-            playlist['tracks'] = ordered_track_ids
-            playlist['updated_at'] = time.time()
-
-            logger.info(f"Reordered tracks for playlist '{playlist['name']}'")
+            logger.info("Reordered tracks for playlist '%s'", playlist['name'])
             return {
                 'success': True,
                 'data': playlist
             }
 
+        except PlaylistConflict as e:
+            return self._conflict_result(e)
         except Exception as e:
-            logger.error(f"Error reordering playlist tracks: {str(e)}", exc_info=True)
+            logger.error("Error reordering playlist tracks: %s", e, exc_info=True)
             return {'success': False, 'error': 'Failed to reorder tracks', 'message': str(e)}
 
+    def apply_playlist_operations(self, playlist_id, operations, expected_updated_at=None):
+        """
+        Apply an ordered list of edits to a playlist as one atomic update
+
+        Either every operation applies and the playlist gets a single
+        updated_at bump, or none do.
+
+        Args:
+            playlist_id (str): Playlist identifier
+            operations (list): Dicts with "op" and its arguments, in order:
+                               {"op": "add", "track_ids": [...]},
+                               {"op": "remove", "track_ids": [...]},
+                               {"op": "rename", "name": "..."},
+                               {"op": "reorder", "ordered_track_ids": [...]}
+            expected_updated_at (float): Only apply if the playlist is still at this version
+
+        Returns:
+            dict: Update result
+        """
+        try:
+            if not isinstance(operations, list) or not operations:
+                return {'success': False, 'error': 'operations must be a non-empty list'}
+
+            applied = []
+
+            def apply(playlist):
+                original = playlist['tracks']
+                tracks = list(original)
+                members = set(tracks)
+                for index, operation in enumerate(operations):
+                    op = operation.get('op') if isinstance(operation, dict) else None
+                    if op in ('add', 'remove', 'reorder'):
+                        key = 'ordered_track_ids' if op == 'reorder' else 'track_ids'
+                        ids = operation.get(key)
+                        if not isinstance(ids, list):
+                            raise ValueError(f'Operation {index} ({op}) needs a "{key}" list')
+                    if op == 'add':
+                        for track_id in ids:
+                            if track_id in self.track_store and track_id not in members:
+                                tracks.append(track_id)
+                                members.add(track_id)
+                    elif op == 'remove':
+                        # Drops one occurrence per id, like remove_from_playlist
+                        pending = {}
+                        for track_id in ids:
+                            pending[track_id] = pending.get(track_id, 0) + 1
+                        kept = []
+                        for track_id in tracks:
+                            if pending.get(track_id):
+                                pending[track_id] -= 1
+                            else:
+                                kept.append(track_id)
+                        tracks = kept
+                        members = set(tracks)
+                    elif op == 'rename':
+                        name = operation.get('name')
+                        if not isinstance(name, str) or not name.strip():
+                            raise ValueError(f'Operation {index} (rename) needs a non-empty "name"')
+                        playlist['name'] = name.strip()
+                    elif op == 'reorder':
+                        if sorted(tracks) != sorted(ids):
+                            raise ValueError(f'Operation {index} (reorder) does not match the playlist tracks')
+                        tracks = list(ids)
+                    else:
+                        raise ValueError(f'Operation {index} has unknown op {op!r}')
+                    applied.append(op)
+
+                # Move pins by the net change in track membership
+                before, after = {}, {}
+                for track_id in original:
+                    before[track_id] = before.get(track_id, 0) + 1
+                for track_id in tracks:
+                    after[track_id] = after.get(track_id, 0) + 1
+                self.track_store.pin([t for t, n in after.items() for _ in range(n - before.get(t, 0))])
+                self.track_store.unpin([t for t, n in before.items() for _ in range(n - after.get(t, 0))])
+                playlist['tracks'] = tracks
+                return True
+
+            playlist, _ = self.playlist_store.update(
+                playlist_id, apply, expected_updated_at,
+                on_commit=self._record_playlist_change('playlist.updated', 'batch', operations=applied)
+            )
+            if playlist is None:
+                return {'success': False, 'error': 'Playlist not found'}
+
+            logger.info("Applied %s operations to playlist '%s'", len(applied), playlist['name'])
+            return {'success': True, 'applied': len(applied), 'data': playlist}
+
+        except PlaylistConflict as e:
+            return self._conflict_result(e)
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error("Error applying playlist operations: %s", e, exc_info=True)
+            return {'success': False, 'error': 'Failed to update playlist', 'message': str(e)}
 
     def delete_playlist(self, playlist_id):
         """
@@ -376,14 +1011,18 @@ class MusicController:
             dict: Deletion result
         """
         try:
-            if playlist_id not in self.playlist_store:
+            deleted_playlist = self.playlist_store.pop(
+                playlist_id, on_commit=self._record_playlist_change('playlist.deleted')
+            )
+            if deleted_playlist is None:
                 return {
                     'success': False,
                     'error': 'Playlist not found'
                 }
 
-            deleted_playlist = self.playlist_store.pop(playlist_id)
-            logger.info(f"Deleted playlist '{deleted_playlist['name']}'")
+            self.track_store.unpin(deleted_playlist['tracks'])
+            self.mix_renderer.remove_mixes(playlist_id)
+            logger.info("Deleted playlist '%s'", deleted_playlist['name'])
 
             return {
                 'success': True,
@@ -391,9 +1030,167 @@ class MusicController:
             }
 
         except Exception as e:
-            logger.error(f"Error deleting playlist: {str(e)}")
+            logger.error("Error deleting playlist: %s", e)
             return {
                 'success': False,
                 'error': 'Failed to delete playlist',
                 'message': str(e)
-            }
\ No newline at end of file
+            }
+
+    def export_records(self):
+        """
+        Stream every track and playlist as NDJSON lines
+
+        Records are serialized one at a time, so memory use does not grow
+        with the size of the stores. Spilled tracks are read from disk
+        without being promoted back into memory.
+
+        Yields:
+            str: One JSON document per line: a 'meta' header, then every
+                 'track', then every 'playlist'
+        """
+        yield json.dumps({
+            'type': 'meta',
+            'version': 1,
+            'exported_at': time.time(),
+            'tracks': len(self.track_store),
+            'playlists': len(self.playlist_store)
+        }, separators=(',', ':')) + '\n'
+        for track_id, payload in self.track_store.items_json():
+            # payload is the record's JSON object; splice the type and id in front
+            yield f'{{"type":"track","id":{json.dumps(track_id)},{payload[1:]}\n'
+        for _, playlist in self.playlist_store.items():
+            yield json.dumps({'type': 'playlist', **playlist}, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def import_records(self, lines, batch_size=None):
+        """
+        Ingest NDJSON produced by export_records
+
+        Lines are parsed in batches and each batch of tracks is inserted
+        under a single store lock. Tracks and playlists keep their ids;
+        ids that already exist are skipped. Tracks whose audio_url is not a
+        local synth clip or on an allowed audio host are rejected as line
+        errors. Search and similarity indexing of imported tracks continues
+        in the background (see index_backlog).
+
+        Args:
+            lines (iterable): NDJSON lines (str or bytes)
+            batch_size (int): Lines parsed per bulk insert
+
+        Returns:
+            dict: Import result with counts, the first few line errors and throughput
+        """
+        batch_size = batch_size or TRANSFER_CONFIG['import_batch_size']
+        started = time.perf_counter()
+        counts = {'tracks': 0, 'playlists': 0, 'skipped': 0, 'errors': 0}
+        errors = []
+        received = 0
+
+        numbered = enumerate(lines, 1)
+        for chunk in iter(lambda: list(islice(numbered, batch_size)), []):
+            tracks, playlists = [], []
+            for number, line in chunk:
+                received += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    kind = entry.get('type')
+                    if kind == 'track':
+                        record = TrackRecord.from_dict(entry)
+                        # Imported URLs are later fetched by the audio proxy
+                        if not validate_audio_url(record.audio_url):
+                            raise ValueError(f'audio_url is not an allowed audio source: {record.audio_url!r}')
+                        tracks.append((str(entry['id']), record))
+                    elif kind == 'playlist':
+                        playlists.append(self._imported_playlist(entry))
+                    elif kind != 'meta':
+                        raise ValueError(f'Unknown record type {kind!r}')
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    counts['errors'] += 1
+                    if len(errors) < 20:
+                        errors.append({'line': number, 'error': str(e)})
+
+            added = self.track_store.put_many(tracks)
+            counts['tracks'] += len(added)
+            counts['skipped'] += len(tracks) - len(added)
+            self._reserve_ids(added)
+            # Queued now, indexed once parsing is done so the two don't compete for the GIL
+            self._index_backlog.extend(added)
+
+            # Tracks are exported before playlists, so members are already stored
+            for playlist in playlists:
+                if playlist['id'] in self.playlist_store:
+                    counts['skipped'] += 1
+                    continue
+                playlist['tracks'] = [track_id for track_id in playlist['tracks'] if track_id in self.track_store]
+                self.track_store.pin(playlist['tracks'])
+                self.playlist_store.put(
+                    playlist['id'], playlist, on_commit=self._record_playlist_change('playlist.created')
+                )
+                counts['playlists'] += 1
+            self._reserve_ids([playlist['id'] for playlist in playlists])
+
+        self._start_indexer()
+        if counts['tracks']:
+            self.changes.append('tracks.imported', None, {'count': counts['tracks']})
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            'Imported %s tracks and %s playlists in %.2fs (%s skipped, %s errors)',
+            counts['tracks'], counts['playlists'], elapsed, counts['skipped'], counts['errors']
+        )
+        return {
+            'success': True,
+            **counts,
+            'line_errors': errors,
+            'seconds': round(elapsed, 3),
+            'records_per_second': round((counts['tracks'] + counts['playlists']) / elapsed) if elapsed else None,
+            'megabytes_per_second': round(received / elapsed / 1e6, 2) if elapsed else None,
+            'index_backlog': len(self._index_backlog)
+        }
+
+    @staticmethod
+    def _imported_playlist(entry):
+        name, tracks = entry['name'], entry['tracks']
+        if not isinstance(name, str) or not isinstance(tracks, list):
+            raise ValueError('Playlist needs a name and a list of tracks')
+        now = time.time()
+        return {
+            'id': str(entry['id']),
+            'name': name,
+            'tracks': [str(track_id) for track_id in tracks],
+            'created_at': float(entry.get('created_at') or now),
+            'updated_at': float(entry.get('updated_at') or now)
+        }
+
+    def _reserve_ids(self, ids):
+        """Keep _new_id ahead of imported numeric ids so new tracks never collide"""
+        numeric = [int(value) for value in ids if value.isdigit()]
+        if numeric:
+            with self._id_lock:
+                self._last_id = max(self._last_id, max(numeric))
+
+    def _start_indexer(self):
+        with self._indexer_lock:
+            if self._index_backlog and self._indexer is None:
+                self._indexer = threading.Thread(
+                    target=self._drain_index_backlog, name='import-indexer', daemon=True
+                )
+                self._indexer.start()
+
+    def _drain_index_backlog(self):
+        """Index imported tracks in small batches until the backlog is empty"""
+        while True:
+            with self._indexer_lock:
+                if not self._index_backlog:
+                    self._indexer = None
+                    return
+                batch = [self._index_backlog.popleft() for _ in range(min(256, len(self._index_backlog)))]
+            for track_id in batch:
+                try:
+                    record = self.track_store.get(track_id, promote=False)
+                    if record is not None:
+                        self._index_track(track_id, record.to_dict())
+                except Exception as e:
+                    logger.error('Failed to index imported track %s: %s', track_id, e)
@@ -50,6 +50,7 @@ const playlistTracks = document.getElementById('playlistTracks');
 // Global variables
 let currentTrackId = null;
 let playlists = [];
+let changeSeq = null; // Last change-feed sequence applied to `playlists`
 let draggedItem = null; // For drag-and-drop
 
 // Event Listeners
@@ -124,8 +125,8 @@ function displayTrack(data, trackId = null) {
     trackDuration.textContent = track.duration;
     trackKeyword.textContent = metadata.keyword;
 
-    // Set audio source
-    audioPlayer.src = track.audio_url;
+    // Set audio source (through our caching proxy when we know the track ID)
+    audioPlayer.src = trackId ? `${API_BASE_URL}/audio/${trackId}` : track.audio_url;
     audioPlayer.load();
 
     // Display lyrics if available
@@ -292,26 +293,72 @@ async function handleAddToPlaylist() {
 
 async function loadPlaylists() {
     try {
+        // After the first full load, only fetch what changed since
+        if (changeSeq !== null && await applyPlaylistChanges()) {
+            updatePlaylistSelect();
+            return;
+        }
+
+        // Read the feed position first so nothing between the two requests is missed
+        const feed = await (await fetch(`${API_BASE_URL}/changes?since=0&limit=1`)).json();
         const response = await fetch(`${API_BASE_URL}/playlists`);
         const data = await response.json();
 
         if (data.success) {
             playlists = data.playlists;
-
-            // Update playlist select dropdown
-            playlistSelect.innerHTML = '<option value="">Create New Playlist</option>';
-            playlists.forEach(playlist => {
-                const option = document.createElement('option');
-                option.value = playlist.id;
-                option.textContent = `${playlist.name} (${playlist.track_count} tracks)`;
-                playlistSelect.appendChild(option);
-            });
+            changeSeq = feed.success ? feed.latest : null;
+            updatePlaylistSelect();
         }
     } catch (error) {
         console.error('Error loading playlists:', error);
     }
 }
 
+// Apply playlist deltas from the change feed; returns false if a full reload is needed
+async function applyPlaylistChanges() {
+    while (true) {
+        const response = await fetch(`${API_BASE_URL}/changes?since=${changeSeq}`);
+        const data = await response.json();
+        if (!data.success || data.reset) {
+            return false;
+        }
+
+        data.changes.forEach(change => {
+            if (!change.type.startsWith('playlist.')) return;
+            const index = playlists.findIndex(p => p.id === change.id);
+            if (change.type === 'playlist.deleted') {
+                if (index !== -1) playlists.splice(index, 1);
+                return;
+            }
+            const playlist = change.data.playlist;
+            const summary = {
+                id: playlist.id,
+                name: playlist.name,
+                track_count: playlist.tracks.length,
+                created_at: playlist.created_at
+            };
+            if (index === -1) playlists.push(summary);
+            else playlists[index] = summary;
+        });
+
+        if (data.changes.length === 0) {
+            changeSeq = data.latest;
+            return true;
+        }
+        changeSeq = data.changes[data.changes.length - 1].seq;
+    }
+}
+
+function updatePlaylistSelect() {
+    playlistSelect.innerHTML = '<option value="">Create New Playlist</option>';
+    playlists.forEach(playlist => {
+        const option = document.createElement('option');
+        option.value = playlist.id;
+        option.textContent = `${playlist.name} (${playlist.track_count} tracks)`;
+        playlistSelect.appendChild(option);
+    });
+}
+
 async function showPlaylists() {
     try {
         await loadPlaylists();
@@ -1,25 +1,158 @@
 """
 Music Routes - API endpoints for music generation
 """
-from flask import Blueprint, request, jsonify
+import functools
+import hashlib
+import hmac
+import io
+import json
+import os
+import re
+import time
+from flask import Blueprint, request, jsonify, send_from_directory, send_file, Response, stream_with_context, make_response, g
 from controllers.music_controller import MusicController
+from services.llm_scheduler import llm_priority
+from services.model_router import model_request
+from utils.idempotency import IdempotencyStore, IdempotencyKeyMismatch, IDEMPOTENCY_REQUESTS
 from utils.logger import setup_logger
+from utils.rate_limiter import rate_limit_budget, charge, too_many_requests
+from utils.metrics import STORE_SIZE
+from utils.validators import validate_language
+from config.settings import (
+    APP_CONFIG, CHANGE_LOG_CONFIG, IDEMPOTENCY_CONFIG, LLM_SCHEDULER_CONFIG, SYNTH_CONFIG, TRANSFER_CONFIG
+)
 
 music_bp = Blueprint('music', __name__)
 controller = MusicController()
+idempotency = IdempotencyStore(ttl=IDEMPOTENCY_CONFIG['ttl'], max_entries=IDEMPOTENCY_CONFIG['max_keys'])
+STORE_SIZE.set_function(lambda: len(idempotency), store='idempotency_keys')
 logger = setup_logger()
 
+def idempotent(view):
+    """
+    Honor an Idempotency-Key request header on a view
+
+    The first request with a key runs the view and its response is kept
+    for IDEMPOTENCY_TTL seconds. Retries with the same key and body get
+    that response back (marked Idempotent-Replayed: true) without running
+    the view again; retries that arrive while the first request is still
+    running wait for it. A server error (5xx) or 429 is passed on to anyone
+    waiting but not kept, so a later retry runs again. Keys are scoped to
+    the caller, so one client can't collide with or read another's.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > 255:
+            return jsonify({
+                'success': False,
+                'error': 'Idempotency-Key must be 1-255 characters'
+            }), 400
+
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        key = f'{idempotency_scope()}|{key}'
+        try:
+            entry, owner = idempotency.begin(key, fingerprint)
+        except IdempotencyKeyMismatch:
+            IDEMPOTENCY_REQUESTS.inc(result='mismatch')
+            return jsonify({
+                'success': False,
+                'error': 'Idempotency-Key was already used with a different request'
+            }), 422
+
+        if not owner:
+            in_flight = not entry.done.is_set()
+            stored = idempotency.wait(entry, IDEMPOTENCY_CONFIG['wait_timeout'])
+            if stored is None:
+                IDEMPOTENCY_REQUESTS.inc(result='timeout')
+                response = jsonify({
+                    'success': False,
+                    'error': 'A request with this Idempotency-Key is still in progress'
+                })
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            IDEMPOTENCY_REQUESTS.inc(result='waited' if in_flight else 'replayed')
+            body, status, mimetype = stored
+            return Response(body, status=status, mimetype=mimetype, headers={'Idempotent-Replayed': 'true'})
+
+        IDEMPOTENCY_REQUESTS.inc(result='new')
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            idempotency.complete(key, entry, None, keep=False)
+            raise
+        stored = (response.get_data(), response.status_code, response.mimetype)
+        retryable = response.status_code >= 500 or response.status_code == 429
+        idempotency.complete(key, entry, stored, keep=not retryable)
+        return response
+
+    return wrapper
+
+def idempotency_scope():
+    """Identity of the caller that idempotency keys are scoped to"""
+    if 'client_id' in g:
+        return g.client_id  # set by the rate limiter
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        return 'key:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return f'ip:{request.remote_addr}'
+
+def interactive_caller():
+    """Whether the caller's X-API-Key lets its upstream calls run as interactive"""
+    supplied = request.headers.get('X-API-Key', '').encode('utf-8')
+    return bool(supplied) and any(
+        hmac.compare_digest(supplied, key.encode('utf-8')) for key in LLM_SCHEDULER_CONFIG['interactive_api_keys']
+    )
+
+def admin_only(view):
+    """
+    Require the ADMIN_API_KEY in an X-Admin-Key header
+
+    Without a configured key the view is disabled and answers 404.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        admin_key = APP_CONFIG['admin_api_key']
+        if not admin_key:
+            return jsonify({'error': 'Not found'}), 404
+        supplied = request.headers.get('X-Admin-Key', '')
+        if not hmac.compare_digest(supplied.encode('utf-8'), admin_key.encode('utf-8')):
+            return jsonify({'success': False, 'error': 'Admin key required'}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
+
 @music_bp.route('/generate', methods=['POST'])
+@rate_limit_budget('generate', deferred=True)
+@idempotent
 def generate_music():
     """
     Generate music from a word/name
+
+    Send an Idempotency-Key header to make retries safe: repeats of the
+    same request return the first response instead of generating again,
+    and aren't charged to the generate budget.
+    Upstream calls run as interactive only for callers with a key from
+    LLM_INTERACTIVE_API_KEYS (they may send "X-Priority: batch" to queue
+    behind interactive users); everyone else runs as batch. When no
+    upstream slot frees up in time the answer is 503 with Retry-After.
     
     Request body:
     {
         "word": "string",
-        "language": "string" (optional, default: "English")
+        "language": "string" (optional, default: "English"),
+        "languages": ["string"] (optional, one track per language in a single upstream call),
+        "model": "string" (optional, skip routing and use this Perplexity model),
+        "deadlineMs": number (optional, route to a model expected to answer within this time)
     }
     """
+    received = time.monotonic()
+    # Charged here rather than before the request so idempotent replays are free
+    decision = charge()
+    if decision is not None and not decision.allowed:
+        return too_many_requests(decision)
     try:
         # Get request data
         data = request.get_json()
@@ -30,9 +163,37 @@ def generate_music():
                 'error': 'No data provided'
             }), 400
         
+        priority = request.headers.get('X-Priority', 'interactive').lower()
+        if priority not in ('interactive', 'batch'):
+            return jsonify({
+                'success': False,
+                'error': 'X-Priority must be interactive or batch'
+            }), 400
+        if not interactive_caller():
+            # Otherwise any bulk client could claim the slots reserved for interactive users
+            priority = 'batch'
+        # Fair-share tenant: the rate limiter's client identity when available
+        tenant = g.get('client_id') or request.remote_addr
+
+        model = data.get('model')
+        if model is not None and model not in controller.perplexity_service.VALID_MODELS:
+            return jsonify({
+                'success': False,
+                'error': f"model must be one of: {', '.join(controller.perplexity_service.VALID_MODELS)}"
+            }), 400
+        deadline_ms, deadline = data.get('deadlineMs'), None
+        if deadline_ms is not None:
+            if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'deadlineMs must be a positive number'
+                }), 400
+            deadline = received + deadline_ms / 1000.0
+
         # Extract parameters
         word = data.get('word', '').strip()
         language = data.get('language', 'English')
+        languages = data.get('languages')
         custom_settings = data.get('customSettings', {})
         
         # Validate word
@@ -42,18 +203,49 @@ def generate_music():
                 'error': 'Word is required'
             }), 400
         
-        # Generate music
-        logger.info(f"Received request for word: '{word}' in {language}")
-        result = controller.generate_music(word, language, custom_settings)
+        # A list in "language" is treated the same as "languages"
+        if languages is None and isinstance(language, list):
+            languages = language
+        
+        if languages is not None:
+            if not isinstance(languages, list) or not languages:
+                return jsonify({
+                    'success': False,
+                    'error': 'languages must be a non-empty list'
+                }), 400
+            if not all(isinstance(lang, str) for lang in languages):
+                return jsonify({
+                    'success': False,
+                    'error': 'languages must be a list of strings'
+                }), 400
+            languages = list(dict.fromkeys(languages))
+            invalid = [lang for lang in languages if not validate_language(lang)]
+            if invalid:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unsupported languages: {', '.join(map(str, invalid))}"
+                }), 400
+            
+            logger.info("Received request for word: '%s' in %s", word, ', '.join(languages))
+            with llm_priority(priority, tenant), model_request(model, deadline):
+                result = controller.generate_music_multi(word, languages, custom_settings)
+        else:
+            # Generate music
+            logger.info("Received request for word: '%s' in %s", word, language)
+            with llm_priority(priority, tenant), model_request(model, deadline):
+                result = controller.generate_music(word, language, custom_settings)
         
         # Return result
         if result.get('success'):
             return jsonify(result), 200
-        else:
-            return jsonify(result), 500
+        status = result.pop('status', 500)
+        response = jsonify(result)
+        if status == 503:
+            response.headers['Retry-After'] = str(LLM_SCHEDULER_CONFIG['retry_after'])
+        return response, status
         
     except Exception as e:
-        logger.error(f"Error in generate_music endpoint: {str(e)}")
+        logger.error("Error in generate_music endpoint: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to generate music',
@@ -80,13 +272,45 @@ def get_track(track_id):
             }), 404
             
     except Exception as e:
-        logger.error(f"Error retrieving track: {str(e)}")
+        logger.error("Error retrieving track: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to retrieve track',
             'message': str(e)
         }), 500
 
+@music_bp.route('/track/<track_id>/similar', methods=['GET'])
+def similar_tracks(track_id):
+    """
+    Get the tracks most similar to a track
+
+    Query parameters:
+        k: number of results, 1-50 (default 10)
+    """
+    k = request.args.get('k', default=10, type=int)
+    if k is None or not 1 <= k <= 50:
+        return jsonify({
+            'success': False,
+            'error': 'k must be between 1 and 50'
+        }), 400
+
+    try:
+        result = controller.similar_tracks(track_id, k)
+        if not result['success']:
+            return jsonify({'success': False, 'error': result['error']}), result['status']
+        return jsonify({
+            'success': True,
+            'trackId': track_id,
+            'tracks': result['tracks'],
+            'count': len(result['tracks'])
+        }), 200
+    except Exception as e:
+        logger.error("Error finding similar tracks: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @music_bp.route('/tracks', methods=['GET'])
 def list_tracks():
     """
@@ -100,7 +324,46 @@ def list_tracks():
             'count': len(tracks)
         }), 200
     except Exception as e:
-        logger.error(f"Error listing tracks: {str(e)}")
+        logger.error("Error listing tracks: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@music_bp.route('/tracks/search', methods=['GET'])
+def search_tracks():
+    """
+    Search tracks by words in the title, keyword, style or lyrics
+
+    Query parameters:
+        q: search text (required)
+        limit: maximum results, 1-100 (default 20)
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': 'Query parameter "q" is required'
+        }), 400
+
+    limit = request.args.get('limit', default=20, type=int)
+    if limit is None or not 1 <= limit <= 100:
+        return jsonify({
+            'success': False,
+            'error': 'limit must be between 1 and 100'
+        }), 400
+
+    try:
+        results, total = controller.search_tracks(query, limit)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'tracks': results,
+            'count': len(results),
+            'total': total
+        }), 200
+    except Exception as e:
+        logger.error("Error searching tracks: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -141,7 +404,7 @@ def create_playlist():
                 'error': 'track_ids must be a list'
             }), 400
 
-        logger.info(f"Creating playlist '{name}' with {len(track_ids)} tracks")
+        logger.info("Creating playlist '%s' with %s tracks", name, len(track_ids))
         result = controller.create_playlist(name, track_ids)
 
         if result.get('success'):
@@ -150,7 +413,7 @@ def create_playlist():
             return jsonify(result), 400
 
     except Exception as e:
-        logger.error(f"Error creating playlist: {str(e)}")
+        logger.error("Error creating playlist: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to create playlist',
@@ -170,12 +433,39 @@ def list_playlists():
             'count': len(playlists)
         }), 200
     except Exception as e:
-        logger.error(f"Error listing playlists: {str(e)}")
+        logger.error("Error listing playlists: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def playlist_etag(playlist):
+    """Version tag for If-Match; updated_at is strictly increasing per playlist"""
+    return repr(playlist['updated_at'])
+
+def parse_playlist_version(value):
+    """
+    Turn an If-Match / if_match value into an expected updated_at
+
+    Returns:
+        tuple: (expected updated_at or None for "any version", error message or None)
+    """
+    if value is None or value == '*':
+        return None, None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value), None
+    try:
+        return float(str(value).strip().removeprefix('W/').strip('"')), None
+    except ValueError:
+        return None, f'Invalid playlist version: {value}'
+
+def playlist_result_status(result):
+    if result.get('success'):
+        return 200
+    if result.get('conflict'):
+        return 412
+    return 404 if 'not found' in result.get('error', '').lower() else 400
+
 @music_bp.route('/playlist/<playlist_id>', methods=['GET'])
 def get_playlist(playlist_id):
     """
@@ -200,10 +490,12 @@ def get_playlist(playlist_id):
                 'tracks_data': tracks_data
             }
 
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'data': playlist_with_tracks
-            }), 200
+            })
+            response.set_etag(playlist_etag(playlist))
+            return response, 200
         else:
             return jsonify({
                 'success': False,
@@ -211,7 +503,7 @@ def get_playlist(playlist_id):
             }), 404
 
     except Exception as e:
-        logger.error(f"Error retrieving playlist: {str(e)}")
+        logger.error("Error retrieving playlist: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to retrieve playlist',
@@ -223,12 +515,17 @@ def update_playlist(playlist_id):
     """
     Update a playlist (add/remove tracks)
 
+    Headers:
+        If-Match: playlist ETag from GET /api/playlist/<id> (optional);
+                  412 with the current playlist if it has changed since
+
     Request body:
     {
         "action": "add" | "remove" | "rename" | "reorder",
         "track_ids": ["string"] (for add/remove),
         "ordered_track_ids": ["string"] (for reorder),
-        "name": "string" (for rename)
+        "name": "string" (for rename),
+        "expected_updated_at": number (optional; same as If-Match, which wins if both are sent)
     }
     """
     try:
@@ -244,50 +541,159 @@ def update_playlist(playlist_id):
         track_ids = data.get('track_ids', [])
         new_name = data.get('name', '').strip()
         ordered_track_ids = data.get('ordered_track_ids', [])
+        expected = data.get('expected_updated_at')
+        if expected is not None and (isinstance(expected, bool) or not isinstance(expected, (int, float))):
+            return jsonify({'success': False, 'error': 'expected_updated_at must be a number'}), 400
+        if_match = request.headers.get('If-Match')
+        if if_match is not None:
+            expected, error = parse_playlist_version(if_match)
+            if error:
+                return jsonify({'success': False, 'error': error}), 400
 
         if action == 'add':
             if not isinstance(track_ids, list):
                 return jsonify({'success': False, 'error': 'track_ids must be a list'}), 400
-            result = controller.add_to_playlist(playlist_id, track_ids)
+            result = controller.add_to_playlist(playlist_id, track_ids, expected)
         elif action == 'remove':
             if not isinstance(track_ids, list):
                 return jsonify({'success': False, 'error': 'track_ids must be a list'}), 400
-            result = controller.remove_from_playlist(playlist_id, track_ids)
+            result = controller.remove_from_playlist(playlist_id, track_ids, expected)
         elif action == 'rename':
             if not new_name:
                 return jsonify({
                     'success': False,
                     'error': 'New name is required for rename action'
                 }), 400
-            result = controller.rename_playlist(playlist_id, new_name)
+            result = controller.rename_playlist(playlist_id, new_name, expected)
         elif action == 'reorder':
             if not isinstance(ordered_track_ids, list) or not ordered_track_ids:
                 return jsonify({
                     'success': False,
                     'error': 'ordered_track_ids list is required for reorder action'
                 }), 400
-            result = controller.reorder_playlist_tracks(playlist_id, ordered_track_ids)
+            result = controller.reorder_playlist_tracks(playlist_id, ordered_track_ids, expected)
         else:
             return jsonify({
                 'success': False,
                 'error': 'Action must be "add", "remove", "rename", or "reorder"'
             }), 400
 
-        if result.get('success'):
-            return jsonify(result), 200
-        else:
-            # Use 404 for 'not found' errors, otherwise 400
-            status_code = 404 if 'not found' in result.get('error', '').lower() else 400
-            return jsonify(result), status_code
+        # Same contract as PATCH: a stale version is 412 with the current playlist
+        response = jsonify(result)
+        if result.get('data'):
+            response.set_etag(playlist_etag(result['data']))
+        return response, playlist_result_status(result)
+
+    except Exception as e:
+        logger.error("Error updating playlist: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to update playlist',
+            'message': str(e)
+        }), 500
+
+@music_bp.route('/playlist/<playlist_id>', methods=['PATCH'])
+def patch_playlist(playlist_id):
+    """
+    Apply several edits to a playlist atomically, with one version bump
+
+    Headers:
+        If-Match: playlist ETag from GET /api/playlist/<id> (optional);
+                  412 with the current playlist if it has changed since
+
+    Request body:
+    {
+        "operations": [
+            {"op": "add", "track_ids": ["string"]},
+            {"op": "remove", "track_ids": ["string"]},
+            {"op": "rename", "name": "string"},
+            {"op": "reorder", "ordered_track_ids": ["string"]}
+        ]
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+
+        if_match = request.headers.get('If-Match')
+        expected, error = parse_playlist_version(if_match)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+
+        result = controller.apply_playlist_operations(playlist_id, data.get('operations'), expected)
+        response = jsonify(result)
+        if result.get('data'):
+            response.set_etag(playlist_etag(result['data']))
+        return response, playlist_result_status(result)
 
     except Exception as e:
-        logger.error(f"Error updating playlist: {str(e)}")
+        logger.error("Error patching playlist: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to update playlist',
             'message': str(e)
         }), 500
 
+@music_bp.route('/playlists', methods=['PATCH'])
+@rate_limit_budget('batch')
+def patch_playlists():
+    """
+    Apply batched edits to many playlists in one call
+
+    Each playlist's operations are applied atomically; playlists succeed
+    or fail independently.
+
+    Request body:
+    {
+        "playlists": [
+            {"id": "string", "if_match": "etag (optional)", "operations": [...]}
+        ]
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        edits = data.get('playlists') if isinstance(data, dict) else None
+        if not isinstance(edits, list) or not edits:
+            return jsonify({
+                'success': False,
+                'error': 'playlists must be a non-empty list'
+            }), 400
+
+        results = []
+        for edit in edits:
+            if not isinstance(edit, dict) or not edit.get('id'):
+                results.append({'success': False, 'status': 400, 'error': 'Each entry needs an id'})
+                continue
+            expected, error = parse_playlist_version(edit.get('if_match'))
+            if error:
+                result = {'success': False, 'error': error}
+            else:
+                result = controller.apply_playlist_operations(edit['id'], edit.get('operations'), expected)
+            result = {'id': edit['id'], 'status': playlist_result_status(result), **result}
+            if result.get('data'):
+                result['etag'] = playlist_etag(result['data'])
+            results.append(result)
+
+        succeeded = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': succeeded == len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        }), 200
+
+    except Exception as e:
+        logger.error("Error patching playlists: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to update playlists',
+            'message': str(e)
+        }), 500
+
 @music_bp.route('/playlist/<playlist_id>', methods=['DELETE'])
 def delete_playlist(playlist_id):
     """
@@ -302,9 +708,242 @@ def delete_playlist(playlist_id):
             return jsonify(result), 404
 
     except Exception as e:
-        logger.error(f"Error deleting playlist: {str(e)}")
+        logger.error("Error deleting playlist: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to delete playlist',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@music_bp.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Get track and playlist changes since a sequence number
+
+    Query parameters:
+        since: last sequence number the client applied (default 0)
+        limit: maximum changes, 1-1000 (default 500)
+
+    When "reset" is true the client fell too far behind and should reload
+    /api/tracks and /api/playlists, then continue from "latest".
+    """
+    since = request.args.get('since', default=0, type=int)
+    limit = request.args.get('limit', default=500, type=int)
+    if since is None or since < 0 or limit is None or not 1 <= limit <= 1000:
+        return jsonify({
+            'success': False,
+            'error': 'since must be a non-negative integer and limit between 1 and 1000'
+        }), 400
+
+    result = controller.get_changes(since, limit)
+    return jsonify({'success': True, **result}), 200
+
+@music_bp.route('/changes/stream', methods=['GET'])
+def stream_changes():
+    """
+    Server-Sent Events feed of track and playlist changes
+
+    Resumes after the Last-Event-ID header (sent automatically by
+    EventSource on reconnect) or the "since" query parameter.
+    """
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', default=controller.changes.latest, type=int)
+    heartbeat = CHANGE_LOG_CONFIG['heartbeat']
+
+    def events(seq):
+        yield 'retry: 3000\n\n'
+        while True:
+            result = controller.wait_for_changes(seq, heartbeat, limit=500)
+            if result['reset']:
+                seq = result['latest']
+                yield f"id: {seq}\nevent: reset\ndata: {json.dumps({'latest': seq})}\n\n"
+                continue
+            if not result['changes']:
+                # Comment line keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+                continue
+            for change in result['changes']:
+                seq = change['seq']
+                yield f"id: {seq}\nevent: {change['type']}\ndata: {json.dumps(change)}\n\n"
+
+    return Response(events(since), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@music_bp.route('/export', methods=['GET'])
+@rate_limit_budget('batch')
+def export_data():
+    """
+    Stream every track and playlist as NDJSON (application/x-ndjson)
+
+    Lines are batched into chunks of about EXPORT_CHUNK_BYTES so large
+    exports are not written one tiny line at a time.
+    """
+    chunk_bytes = TRANSFER_CONFIG['export_chunk_bytes']
+
+    def chunks():
+        buffered, size = [], 0
+        for line in controller.export_records():
+            buffered.append(line)
+            size += len(line)
+            if size >= chunk_bytes:
+                yield ''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield ''.join(buffered)
+
+    filename = time.strftime('beatify-export-%Y%m%d-%H%M%S.ndjson')
+    return Response(chunks(), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store'
+    })
+
+@music_bp.route('/import', methods=['POST'])
+@rate_limit_budget('batch')
+def import_data():
+    """
+    Import tracks and playlists from an NDJSON body in the /api/export format
+
+    The body is read as a stream, so its size is not limited by memory.
+    Existing ids are skipped. Search and similarity indexing of imported
+    tracks finishes in the background; "index_backlog" reports what is left.
+    """
+    try:
+        lines = io.BufferedReader(request.stream, buffer_size=1 << 16)
+        result = controller.import_records(lines)
+        return jsonify(result), 200
+    except Exception as e:
+        logger.error("Error importing data: %s", e, exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to import data',
+            'message': str(e)
+        }), 500
+
+@music_bp.route('/admin/hot-keywords', methods=['GET'])
+@admin_only
+def hot_keywords():
+    """
+    List the most requested words and their cache status
+
+    Requires the X-Admin-Key header, since the words are users' raw queries.
+
+    Query params:
+        limit (int): Maximum number of entries (default: 20)
+    """
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        keywords = controller.get_hot_keywords(max(1, min(limit, 1000)))
+        return jsonify({
+            'success': True,
+            'keywords': keywords,
+            'count': len(keywords),
+            'total_requests': controller.hot_keywords.total
+        }), 200
+    except Exception as e:
+        logger.error("Error listing hot keywords: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@music_bp.route('/audio/synth/<clip_name>', methods=['GET'])
+def get_synth_clip(clip_name):
+    """
+    Serve a procedurally rendered clip (supports Range and conditional requests)
+    """
+    if not re.fullmatch(r'[0-9a-f]{20}\.wav', clip_name):
+        return jsonify({'success': False, 'error': 'Clip not found'}), 404
+
+    cache_dir = os.path.abspath(SYNTH_CONFIG['cache_dir'])
+    if not os.path.exists(os.path.join(cache_dir, clip_name)):
+        return jsonify({'success': False, 'error': 'Clip not found'}), 404
+
+    # Clips are content-addressed by their parameters, so they never change
+    response = send_from_directory(
+        cache_dir, clip_name, mimetype='audio/wav', conditional=True, max_age=31536000
+    )
+    response.cache_control.immutable = True
+    return response
+
+
+@music_bp.route('/audio/<track_id>', methods=['GET'])
+def get_track_audio(track_id):
+    """
+    Stream a track's audio through the local cache
+
+    Supports Range requests (seeking) and If-None-Match / If-Modified-Since.
+    """
+    try:
+        audio = controller.open_track_audio(track_id)
+    except Exception as e:
+        logger.error("Error fetching audio for track %s: %s", track_id, e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch audio',
+            'message': str(e)
+        }), 502
+
+    if not audio:
+        return jsonify({'success': False, 'error': 'Audio not found'}), 404
+
+    if 'stream' in audio:
+        # Cache miss: pass the upstream bytes through while the cache fills
+        response = Response(audio['stream'], mimetype=audio['mimetype'])
+        if audio['length'] is not None:
+            response.content_length = audio['length']
+        return response
+
+    # The file is already open, so eviction can't pull it out from under the send
+    handle = audio['file']
+    stat = os.fstat(handle.fileno())
+    response = send_file(
+        handle,
+        mimetype=audio['mimetype'],
+        etag=f'{stat.st_mtime}-{stat.st_size}',
+        last_modified=stat.st_mtime,
+        max_age=86400
+    )
+    response.content_length = stat.st_size
+    try:
+        return response.make_conditional(request.environ, accept_ranges=True, complete_length=stat.st_size)
+    except Exception:
+        handle.close()
+        raise
+
+
+@music_bp.route('/playlist/<playlist_id>/mix', methods=['GET'])
+@rate_limit_budget('batch', deferred=True)
+def get_playlist_mix(playlist_id):
+    """
+    Stream a playlist as one continuous, loudness-normalized, crossfaded WAV
+
+    The first request streams while rendering; later requests for the same
+    playlist version are served from the cache with Range support. Only a
+    render is charged to the batch budget, so seeking a cached mix is not.
+    """
+    try:
+        result = controller.get_playlist_mix(playlist_id)
+    except Exception as e:
+        logger.error("Error rendering playlist mix: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to render mix',
+            'message': str(e)
+        }), 500
+
+    if 'error' in result:
+        return jsonify({'success': False, 'error': result['error']}), result['status']
+
+    if 'path' in result:
+        return send_file(result['path'], mimetype='audio/wav', conditional=True, etag=True)
+
+    decision = charge()
+    if decision is not None and not decision.allowed:
+        # Not started yet, so closing it releases nothing but the generator
+        result['stream'].close()
+        return too_many_requests(decision)
+    return Response(stream_with_context(result['stream']), mimetype='audio/wav')
@@ -0,0 +1,320 @@
+"""
+Audio Cache - Size-bounded on-disk LRU cache for remote audio files
+"""
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlparse, urljoin
+from config.settings import AUDIO_CACHE_CONFIG
+from services import upstream
+from utils.metrics import Counter
+from utils.validators import validate_remote_audio_url
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+AUDIO_CACHE_LOOKUPS = Counter(
+    'beatify_audio_cache_total',
+    'Audio proxy cache lookups by result',
+    ['result']
+)
+
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.ogg', '.opus', '.flac', '.m4a', '.aac'}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+
+
+class _ClosingChunks:
+    """Chunk iterator whose close() also releases the upstream response, even if never iterated"""
+
+    def __init__(self, chunks, response):
+        self._chunks = chunks
+        self._response = response
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        self._chunks.close()
+        self._response.close()
+
+
+class AudioCache:
+    """
+    Fetches remote audio once and keeps it on disk.
+
+    Files are named by a hash of their URL. When the total size exceeds
+    max_bytes, the least recently served files are deleted first. Only
+    URLs on the allowed audio hosts are fetched, including every redirect.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None, max_file_bytes=None, timeout=None):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir (str): Directory holding cached files
+            max_bytes (int): Total size budget
+            max_file_bytes (int): Largest single file accepted
+            timeout (float): Upstream fetch timeout in seconds
+        """
+        self.cache_dir = os.path.abspath(cache_dir or AUDIO_CACHE_CONFIG['cache_dir'])
+        self.max_bytes = max_bytes or AUDIO_CACHE_CONFIG['max_bytes']
+        self.max_file_bytes = max_file_bytes or AUDIO_CACHE_CONFIG['max_file_bytes']
+        self.timeout = timeout or AUDIO_CACHE_CONFIG['timeout']
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._filling = set()  # names being written by stream()
+        self._pins = {}  # file name -> holders; pinned files are never evicted
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_existing()
+
+    def _load_existing(self):
+        """Rebuild the LRU order from files left by a previous run"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp'):
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_atime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self.total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def file_name(url):
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        if extension not in AUDIO_EXTENSIONS:
+            extension = '.mp3'
+        return hashlib.sha1(url.encode('utf-8')).hexdigest() + extension
+
+    @staticmethod
+    def mimetype(path):
+        return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    def get(self, url):
+        """
+        Get a local path for a remote audio URL, fetching it on a miss
+
+        Args:
+            url (str): Remote audio URL
+
+        Returns:
+            str: Path of the cached file
+        """
+        name = self.file_name(url)
+        path = os.path.join(self.cache_dir, name)
+        if self._touch(name, path):
+            AUDIO_CACHE_LOOKUPS.inc(result='hit')
+            return path
+
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(name, threading.Lock())
+        with fetch_lock:
+            # Another request may have fetched it while we waited
+            if self._touch(name, path):
+                AUDIO_CACHE_LOOKUPS.inc(result='hit')
+                return path
+            AUDIO_CACHE_LOOKUPS.inc(result='miss')
+            try:
+                size = self._fetch(url, path)
+            finally:
+                with self._lock:
+                    self._fetch_locks.pop(name, None)
+            self._add_entry(name, size)
+        return path
+
+    @contextmanager
+    def pinned(self, url):
+        """
+        Fetch a remote file and keep it from being evicted while the block runs
+
+        Args:
+            url (str): Remote audio URL
+
+        Yields:
+            str: Path of the cached file
+        """
+        name = self.file_name(url)
+        with self._lock:
+            self._pins[name] = self._pins.get(name, 0) + 1
+        try:
+            yield self.get(url)
+        finally:
+            with self._lock:
+                holders = self._pins.pop(name) - 1
+                if holders:
+                    self._pins[name] = holders
+                else:
+                    # Catch up on evictions skipped while the file was pinned
+                    self._evict()
+
+    def open(self, url):
+        """
+        Open a cached file for reading
+
+        The handle stays valid even if the file is evicted while it is sent.
+
+        Args:
+            url (str): Remote audio URL
+
+        Returns:
+            file: Binary file handle, or None on a miss
+        """
+        name = self.file_name(url)
+        path = os.path.join(self.cache_dir, name)
+        if not self._touch(name, path):
+            return None
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            # Evicted between the lookup and the open
+            return None
+        AUDIO_CACHE_LOOKUPS.inc(result='hit')
+        return handle
+
+    def stream(self, url):
+        """
+        Fetch a remote file, passing chunks through while writing it into the cache
+
+        Args:
+            url (str): Remote audio URL
+
+        Returns:
+            tuple: (iterator of byte chunks, content length or None)
+        """
+        AUDIO_CACHE_LOOKUPS.inc(result='miss')
+        logger.info("Streaming audio into cache: %s", url)
+        response = self._request(url)
+        length = response.headers.get('Content-Length')
+        length = int(length) if length and length.isdigit() else None
+        if length is not None and length > self.max_file_bytes:
+            response.close()
+            raise ValueError(f'Audio file exceeds {self.max_file_bytes} bytes')
+        return _ClosingChunks(self._fill(url, response), response), length
+
+    def _fill(self, url, response):
+        name = self.file_name(url)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            # Concurrent misses for the same file pass through uncached
+            owner = name not in self._filling
+            self._filling.add(name)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        handle = open(temp_path, 'wb') if owner else None
+        size = 0
+        complete = False
+        try:
+            for chunk in response.iter_content(chunk_size=65536):
+                size += len(chunk)
+                if size > self.max_file_bytes:
+                    logger.warning("Audio exceeded %s bytes mid-stream: %s", self.max_file_bytes, url)
+                    return
+                if handle:
+                    handle.write(chunk)
+                yield chunk
+            complete = True
+        finally:
+            response.close()
+            if handle:
+                handle.close()
+                if complete:
+                    os.replace(temp_path, path)
+                    self._add_entry(name, size)
+                elif os.path.exists(temp_path):
+                    # Client disconnected or the upstream failed; keep nothing partial
+                    os.remove(temp_path)
+                with self._lock:
+                    self._filling.discard(name)
+
+    def _touch(self, name, path):
+        with self._lock:
+            if name not in self._entries:
+                return False
+            if not os.path.exists(path):
+                self.total_bytes -= self._entries.pop(name)
+                return False
+            self._entries.move_to_end(name)
+        try:
+            # Persist recency in atime so the LRU order survives restarts;
+            # mtime is left alone because it feeds the ETag
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        return True
+
+    def _add_entry(self, name, size):
+        with self._lock:
+            self.total_bytes += size - self._entries.get(name, 0)
+            self._entries[name] = size
+            self._entries.move_to_end(name)
+            self._evict(keep=name)
+
+    def _request(self, url):
+        """Open a streaming upstream response, checking the host of every redirect hop"""
+        for _ in range(MAX_REDIRECTS + 1):
+            if not validate_remote_audio_url(url):
+                raise ValueError(f'Audio host is not allowed: {url}')
+            response = upstream.send('audio', 'GET', url, stream=True, timeout=self.timeout,
+                                     allow_redirects=False)
+            location = response.headers.get('Location')
+            if response.status_code in REDIRECT_STATUSES and location:
+                response.close()
+                url = urljoin(url, location)
+                continue
+            try:
+                response.raise_for_status()
+            except Exception:
+                response.close()
+                raise
+            return response
+        raise ValueError(f'Too many redirects fetching audio: {url}')
+
+    def _fetch(self, url, path):
+        logger.info("Fetching audio into cache: %s", url)
+        response = self._request(url)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        size = 0
+        try:
+            with open(temp_path, 'wb') as handle:
+                for chunk in response.iter_content(chunk_size=65536):
+                    size += len(chunk)
+                    if size > self.max_file_bytes:
+                        raise ValueError(f'Audio file exceeds {self.max_file_bytes} bytes')
+                    handle.write(chunk)
+            os.replace(temp_path, path)
+        finally:
+            response.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return size
+
+    def _evict(self, keep=None):
+        """Delete least recently used files until the cache fits its budget (caller holds the lock)"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for name in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if name == keep or name in self._pins:
+                continue
+            self.total_bytes -= self._entries.pop(name)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
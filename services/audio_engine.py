@@ -1,8 +1,10 @@
 """
-Audio Engine - Audio generation using Freesound API
+Audio Engine - Audio generation using Freesound API or local synthesis
 """
 import requests
 from config.settings import AUDIO_CONFIG
+from services import upstream
+from services.synth_engine import SynthEngine, synth_available
 from utils.logger import setup_logger
 
 logger = setup_logger()
@@ -13,7 +15,17 @@ class AudioEngine:
     def __init__(self):
         """Initialize audio engine"""
         self.api_key = AUDIO_CONFIG.get('freesound_api_key', '')
-        self.use_api = bool(self.api_key)
+        self.backend = self._resolve_backend(AUDIO_CONFIG.get('backend', 'auto'))
+        self.use_api = self.backend == 'freesound'
+        self.synth = None
+        if self.backend == 'synth' or (self.use_api and synth_available()):
+            try:
+                self.synth = SynthEngine()
+            except Exception as e:
+                logger.warning("Synth backend unavailable: %s", e)
+                if self.backend == 'synth':
+                    self.backend = 'placeholder'
+        self.search_url = AUDIO_CONFIG.get('freesound_api_url', 'https://freesound.org/apiv2/search/text/')
         
         # Placeholder tracks by mood
         self.placeholder_tracks = {
@@ -34,8 +46,24 @@ class AudioEngine:
         
         if self.use_api:
             logger.info("AudioEngine initialized with Freesound API")
+        elif self.backend == 'synth':
+            logger.info("AudioEngine initialized with local synthesis")
         else:
             logger.info("AudioEngine initialized with placeholder audio (no API key)")
+
+    def _resolve_backend(self, backend):
+        """Pick the audio backend from configuration and what is available"""
+        if backend == 'auto':
+            if self.api_key:
+                return 'freesound'
+            return 'synth' if synth_available() else 'placeholder'
+        if backend == 'freesound' and not self.api_key:
+            logger.warning("AUDIO_BACKEND=freesound but no FREESOUND_API_KEY, using placeholder")
+            return 'placeholder'
+        if backend == 'synth' and not synth_available():
+            logger.warning("AUDIO_BACKEND=synth requires NumPy, using placeholder")
+            return 'placeholder'
+        return backend if backend in ('freesound', 'synth', 'placeholder') else 'placeholder'
     
     def generate_audio(self, track_data):
         """
@@ -48,21 +76,56 @@ class AudioEngine:
             dict: Audio information (url, format, engine)
         """
         try:
-            logger.info(f"Generating audio for: {track_data.get('title', 'Unknown')}")
+            logger.info("Generating audio for: %s", track_data.get('title', 'Unknown'))
             
             # Try Freesound API if available
             if self.use_api:
                 try:
                     return self._generate_with_freesound(track_data)
                 except Exception as e:
-                    logger.warning(f"Freesound API failed: {str(e)}, using placeholder")
-                    return self._generate_placeholder(track_data)
+                    logger.warning("Freesound API failed: %s, using fallback audio", e)
+                    return self._generate_fallback(track_data)
+            elif self.backend == 'synth':
+                return self._generate_with_synth(track_data)
             else:
                 return self._generate_placeholder(track_data)
                 
         except Exception as e:
-            logger.error(f'Audio generation error: {str(e)}')
+            logger.error('Audio generation error: %s', e)
             return self._generate_placeholder(track_data)
+
+    def _generate_fallback(self, track_data):
+        """Synthesize locally when possible, otherwise use a placeholder"""
+        if self.synth is not None:
+            try:
+                return self._generate_with_synth(track_data)
+            except Exception as e:
+                logger.warning("Synth fallback failed: %s", e)
+        return self._generate_placeholder(track_data)
+
+    def _generate_with_synth(self, track_data):
+        """
+        Render audio locally from the track's genre, mood and style
+
+        Args:
+            track_data (dict): Track information
+
+        Returns:
+            dict: Audio information pointing at our own synth route
+        """
+        clip_id, params, cached = self.synth.get_clip(track_data)
+        return {
+            'url': f'/api/audio/synth/{clip_id}.wav',
+            'format': 'wav',
+            'engine': 'synth',
+            'clip_id': clip_id,
+            'duration': int(params['duration']),
+            'cached': cached,
+            'note': (
+                f"Procedurally generated {params['genre']} clip at {params['bpm']} BPM "
+                f"({params['mood']}, {params['timbre']})"
+            )
+        }
     
     def _generate_with_freesound(self, track_data):
         """
@@ -80,7 +143,7 @@ class AudioEngine:
             mood = track_data.get('mood', 'ambient')
             search_query = f"{genre} {mood}".lower()
             
-            logger.info(f"Searching Freesound for: {search_query}")
+            logger.info("Searching Freesound for: %s", search_query)
             
             # API headers
             headers = {
@@ -97,8 +160,8 @@ class AudioEngine:
             }
             
             # Make request
-            response = requests.get(
-                'https://freesound.org/apiv2/search/text/',
+            response = upstream.send(
+                'freesound', 'GET', self.search_url,
                 headers=headers,
                 params=params,
                 timeout=10
@@ -117,7 +180,7 @@ class AudioEngine:
                     sound['previews'].get('preview-lq-mp3')
                 )
                 
-                logger.info(f"Found audio: {sound['name']}")
+                logger.info("Found audio: %s", sound['name'])
                 
                 return {
                     'url': audio_url,
@@ -134,10 +197,10 @@ class AudioEngine:
             raise Exception('No suitable sounds found')
             
         except requests.exceptions.RequestException as e:
-            logger.error(f'Freesound API error: {str(e)}')
+            logger.error('Freesound API error: %s', e)
             raise
         except Exception as e:
-            logger.error(f'Freesound error: {str(e)}')
+            logger.error('Freesound error: %s', e)
             raise
     
     def _generate_placeholder(self, track_data):
@@ -153,7 +216,7 @@ class AudioEngine:
         mood = track_data.get('mood', '').lower()
         audio_url = self.placeholder_tracks.get(mood, self.placeholder_tracks['default'])
         
-        logger.info(f"Using placeholder audio for mood: {mood}")
+        logger.info("Using placeholder audio for mood: %s", mood)
         
         return {
             'url': audio_url,
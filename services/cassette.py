@@ -0,0 +1,249 @@
+"""
+Cassette - Record and replay upstream HTTP traffic for offline runs
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config.settings import CASSETTE_CONFIG, PERPLEXITY_CONFIG, AUDIO_CONFIG
+
+SCRUBBED = '<scrubbed>'
+SECRET_KEYS = {'authorization', 'api_key', 'apikey', 'token', 'key', 'password', 'secret'}
+
+
+def _scrub(value):
+    """Recursively blank out secret-looking keys in request data"""
+    if isinstance(value, dict):
+        return {
+            k: SCRUBBED if str(k).lower() in SECRET_KEYS else _scrub(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_scrub(v) for v in value]
+    return value
+
+
+def _scrub_url(url):
+    parts = urlsplit(url)
+    query = [(k, SCRUBBED if k.lower() in SECRET_KEYS else v) for k, v in parse_qsl(parts.query)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+class ReplayResponse:
+    """Minimal stand-in for requests.Response built from a cassette entry"""
+
+    def __init__(self, entry):
+        self.status_code = entry['status']
+        self.headers = entry.get('headers', {})
+        self.url = entry['url']
+        if 'body_b64' in entry:
+            self.content = base64.b64decode(entry['body_b64'])
+        else:
+            self.content = entry.get('body', '').encode('utf-8')
+        self.encoding = 'utf-8'
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=65536):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self):
+        if not self.ok:
+            import requests
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error (replayed)', response=self)
+
+    def close(self):
+        pass
+
+
+class Cassette:
+    """
+    On-disk log of upstream request/response pairs.
+
+    Entries are stored as gzip-compressed JSON lines. Secrets are scrubbed
+    from URLs and request bodies, never-recorded headers are dropped, and
+    any configured API key found in a response body is blanked.
+    """
+
+    def __init__(self, path, mode='off', speed='fast', strict=False):
+        """
+        Initialize cassette
+
+        Args:
+            path (str): Cassette file (.jsonl.gz)
+            mode (str): "off", "record" or "replay"
+            speed (str): "recorded" to sleep the recorded latency, "fast" to skip it
+            strict (bool): In replay, fail on requests with no exact match
+        """
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._by_key = defaultdict(list)
+        self._by_service = defaultdict(list)
+        self._positions = defaultdict(int)
+        self._secrets = [s for s in (PERPLEXITY_CONFIG['api_key'], AUDIO_CONFIG['freesound_api_key']) if s]
+
+    @staticmethod
+    def request_key(service, method, url, params=None, json_body=None):
+        """
+        Stable fingerprint of a request, ignoring secrets
+
+        The "model" field of a JSON body is left out: with model routing on,
+        the model picked for a call depends on live latency, so it would
+        rarely match between recording and replay.
+
+        Returns:
+            str: Hex digest
+        """
+        if isinstance(json_body, dict) and 'model' in json_body:
+            json_body = {k: v for k, v in json_body.items() if k != 'model'}
+        normalized = json.dumps({
+            'service': service,
+            'method': method.upper(),
+            'url': _scrub_url(url),
+            'params': _scrub(params or {}),
+            'json': _scrub(json_body)
+        }, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def _scrub_body(self, text):
+        for secret in self._secrets:
+            text = text.replace(secret, SCRUBBED)
+        return text
+
+    def record(self, service, method, url, kwargs, response, latency):
+        """
+        Append one request/response pair to the cassette
+
+        Args:
+            service (str): Upstream name
+            method (str): HTTP method
+            url (str): Request URL
+            kwargs (dict): Keyword arguments the request was sent with
+            response (requests.Response): Upstream response
+            latency (float): Seconds the call took
+        """
+        content = response.content or b''
+        headers = {'Content-Type': response.headers.get('Content-Type', '')}
+        if response.headers.get('Location'):
+            # Redirects are followed by the caller, which needs the target on replay
+            headers['Location'] = response.headers['Location']
+        entry = {
+            'key': self.request_key(service, method, url, kwargs.get('params'), kwargs.get('json')),
+            'service': service,
+            'method': method.upper(),
+            'url': _scrub_url(url),
+            'params': _scrub(kwargs.get('params') or {}),
+            'request': _scrub(kwargs.get('json')),
+            'status': response.status_code,
+            'headers': headers,
+            'latency': round(latency, 4),
+            'recorded_at': time.time()
+        }
+        try:
+            entry['body'] = self._scrub_body(content.decode('utf-8'))
+        except UnicodeDecodeError:
+            entry['body_b64'] = base64.b64encode(content).decode('ascii')
+
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Each append is its own gzip member; readers see one continuous stream
+            with gzip.open(self.path, 'at', encoding='utf-8') as handle:
+                handle.write(line)
+
+    def _load(self):
+        if self._loaded:
+            return
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f'Cassette not found: {self.path}')
+        with gzip.open(self.path, 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                # Recomputed so cassettes recorded before a key change still match
+                key = self.request_key(
+                    entry['service'], entry['method'], entry['url'], entry.get('params'), entry.get('request')
+                )
+                self._by_key[key].append(entry)
+                self._by_service[entry['service']].append(entry)
+        self._loaded = True
+
+    def _next(self, bucket_name, entries):
+        # Cycle through matches in recorded order so replays are deterministic
+        position = self._positions[bucket_name]
+        self._positions[bucket_name] = position + 1
+        return entries[position % len(entries)]
+
+    def replay(self, service, method, url, kwargs):
+        """
+        Serve the recorded response for a request
+
+        Falls back to the service's entries in recorded order when there
+        is no exact match, unless the cassette is strict.
+
+        Returns:
+            ReplayResponse: Recorded response
+        """
+        with self._lock:
+            self._load()
+            key = self.request_key(service, method, url, kwargs.get('params'), kwargs.get('json'))
+            if self._by_key.get(key):
+                entry = self._next(key, self._by_key[key])
+            elif not self.strict and self._by_service.get(service):
+                entry = self._next(service, self._by_service[service])
+            else:
+                raise LookupError(f'No recorded {service} response for {method} {_scrub_url(url)}')
+
+        if self.speed == 'recorded':
+            time.sleep(entry.get('latency', 0))
+        return ReplayResponse(entry)
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return sum(len(entries) for entries in self._by_service.values())
+
+
+_cassette = None
+
+
+def get_cassette():
+    """
+    Get the process-wide cassette configured in settings
+
+    Returns:
+        Cassette: Cassette, or None when cassette mode is off
+    """
+    global _cassette
+    if CASSETTE_CONFIG['mode'] not in ('record', 'replay'):
+        return None
+    if _cassette is None:
+        _cassette = Cassette(
+            CASSETTE_CONFIG['path'],
+            CASSETTE_CONFIG['mode'],
+            CASSETTE_CONFIG['speed'],
+            CASSETTE_CONFIG['strict']
+        )
+    return _cassette
@@ -0,0 +1,271 @@
+"""
+LLM Scheduler - Fair-share admission control for upstream LLM calls
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config.settings import LLM_SCHEDULER_CONFIG
+from utils.metrics import Gauge, Histogram
+from utils.tracing import span
+
+# Highest priority first; also the tie-break order when virtual finish tags are equal
+PRIORITIES = ('interactive', 'batch', 'prewarm')
+
+LLM_QUEUE_WAIT = Histogram(
+    'beatify_llm_queue_wait_seconds',
+    'Time upstream LLM calls waited for a concurrency slot, by priority class',
+    ['priority'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+LLM_QUEUE_DEPTH = Gauge(
+    'beatify_llm_queue_depth',
+    'Upstream LLM calls waiting for a slot, by priority class',
+    ['priority']
+)
+LLM_IN_FLIGHT = Gauge(
+    'beatify_llm_in_flight',
+    'Upstream LLM calls in progress, by priority class',
+    ['priority']
+)
+
+_current = contextvars.ContextVar('beatify_llm_priority', default=('interactive', 'default'))
+
+
+@contextmanager
+def llm_priority(priority, tenant='default'):
+    """
+    Run the block's LLM calls under a priority class and tenant
+
+    Args:
+        priority (str): One of PRIORITIES
+        tenant (str): Who the calls are made for; tenants in the same class
+                      share its capacity equally
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f'Unknown LLM priority {priority!r}')
+    token = _current.set((priority, str(tenant)))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class SchedulerTimeout(Exception):
+    """Raised when a call waits longer than the queue timeout for a slot"""
+
+
+class _Waiter:
+    __slots__ = ('event', 'granted', 'cancelled')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+
+class _ClassQueue:
+    """Waiters of one priority class, fair-queued across tenants"""
+
+    __slots__ = ('heap', 'tags', 'queued', 'in_flight', 'vclock', 'tenant_finish')
+
+    def __init__(self):
+        self.heap = []  # (finish tag, sequence, waiter)
+        self.tags = deque()  # class-level finish tags of the queued calls, ascending
+        self.queued = 0
+        self.in_flight = 0
+        self.vclock = 0.0  # tag of the last waiter dispatched from this class
+        self.tenant_finish = {}  # tenant -> finish tag of its last queued call
+
+    def head(self):
+        while self.heap and self.heap[0][2].cancelled:
+            heapq.heappop(self.heap)
+        return self.heap[0] if self.heap else None
+
+
+class LLMScheduler:
+    """
+    Concurrency-capped scheduler for upstream LLM calls.
+
+    At most max_concurrency calls run at once, and `reserved` of those
+    slots only go to interactive calls, so a batch job cannot occupy every
+    slot. When calls are queued, the next one is picked by self-clocked
+    weighted fair queuing in two levels: across priority classes in
+    proportion to their weights, then across the tenants of that class in
+    equal shares. Interactive traffic therefore stays fast without starving
+    batch or pre-warm work, and one large batch tenant cannot crowd out
+    another.
+    """
+
+    def __init__(self, max_concurrency=None, weights=None, reserved=None, queue_timeout=None):
+        """
+        Initialize scheduler
+
+        Args:
+            max_concurrency (int): Upstream calls allowed in flight
+            weights (dict): Priority class -> share weight
+            reserved (int): Slots only interactive calls may use
+            queue_timeout (float): Seconds a call may wait for a slot (0 = forever)
+        """
+        config = LLM_SCHEDULER_CONFIG
+        self.max_concurrency = config['max_concurrency'] if max_concurrency is None else max_concurrency
+        self.weights = dict(config['weights'] if weights is None else weights)
+        self.reserved = config['reserved_interactive'] if reserved is None else reserved
+        self.queue_timeout = config['queue_timeout'] if queue_timeout is None else queue_timeout
+
+        self._queues = {priority: _ClassQueue() for priority in PRIORITIES}
+        self._class_finish = dict.fromkeys(PRIORITIES, 0.0)
+        self._vtime = 0.0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        for priority, queue in self._queues.items():
+            LLM_QUEUE_DEPTH.set_function(lambda queue=queue: queue.queued, priority=priority)
+            LLM_IN_FLIGHT.set_function(lambda queue=queue: queue.in_flight, priority=priority)
+
+    @property
+    def in_flight(self):
+        return sum(queue.in_flight for queue in self._queues.values())
+
+    @property
+    def load(self):
+        """Calls waiting for a slot, per slot"""
+        return sum(queue.queued for queue in self._queues.values()) / max(1, self.max_concurrency)
+
+    def configure(self, max_concurrency=None, reserved=None):
+        """
+        Change the slot limits, starting any queued calls they now admit
+
+        Args:
+            max_concurrency (int): Upstream calls allowed in flight
+            reserved (int): Slots only interactive calls may use
+        """
+        with self._lock:
+            if max_concurrency is not None:
+                self.max_concurrency = max_concurrency
+            if reserved is not None:
+                self.reserved = reserved
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority=None, tenant=None):
+        """
+        Hold a concurrency slot for the duration of the block
+
+        Args:
+            priority (str): Priority class (default: from llm_priority())
+            tenant (str): Tenant (default: from llm_priority())
+
+        Yields:
+            str: The priority class the slot was granted to
+
+        Raises:
+            SchedulerTimeout: No slot became free within queue_timeout
+        """
+        current_priority, current_tenant = _current.get()
+        priority = priority or current_priority
+        tenant = tenant or current_tenant
+        with span('llm_queue'):
+            self.acquire(priority, tenant)
+        try:
+            yield priority
+        finally:
+            self.release(priority)
+
+    def acquire(self, priority, tenant):
+        """
+        Wait for a slot
+
+        Args:
+            priority (str): Priority class
+            tenant (str): Tenant
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.perf_counter()
+        waiter = _Waiter()
+        with self._lock:
+            self._enqueue(priority, tenant, waiter)
+            self._dispatch()
+
+        if not waiter.granted and not waiter.event.wait(self.queue_timeout or None):
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+                    queue = self._queues[priority]
+                    queue.queued -= 1
+                    # Give back the class's latest tag so its remaining calls keep their place
+                    queue.tags.pop()
+                    self._class_finish[priority] = queue.tags[-1] if queue.tags else self._vtime
+                    LLM_QUEUE_WAIT.observe(time.perf_counter() - started, priority=priority)
+                    raise SchedulerTimeout(
+                        f'No upstream LLM slot free after {self.queue_timeout:g}s ({priority} queue)'
+                    )
+
+        waited = time.perf_counter() - started
+        LLM_QUEUE_WAIT.observe(waited, priority=priority)
+        return waited
+
+    def release(self, priority):
+        """
+        Free a slot and start the next queued calls
+
+        Args:
+            priority (str): Priority class the slot was acquired for
+        """
+        with self._lock:
+            self._queues[priority].in_flight -= 1
+            self._dispatch()
+
+    def _enqueue(self, priority, tenant, waiter):
+        queue = self._queues[priority]
+        # A tenant that has been idle restarts at the class clock rather than
+        # cashing in credit for the time it wasn't sending anything
+        tag = max(queue.vclock, queue.tenant_finish.get(tenant, 0.0)) + 1.0
+        queue.tenant_finish[tenant] = tag
+        if len(queue.tenant_finish) > 1024:
+            queue.tenant_finish = {
+                name: finish for name, finish in queue.tenant_finish.items() if finish > queue.vclock
+            }
+        heapq.heappush(queue.heap, (tag, next(self._sequence), waiter))
+        # The class tag is fixed on arrival; recomputing it from the current
+        # virtual time at dispatch would let a busy class starve the others
+        class_tag = max(self._vtime, self._class_finish[priority]) + 1.0 / self.weights[priority]
+        self._class_finish[priority] = class_tag
+        queue.tags.append(class_tag)
+        queue.queued += 1
+
+    def _has_room(self, priority):
+        in_flight = self.in_flight
+        if in_flight >= self.max_concurrency:
+            return False
+        return priority == 'interactive' or in_flight < self.max_concurrency - self.reserved
+
+    def _dispatch(self):
+        """Grant free slots to queued waiters in fair-share order (caller holds the lock)"""
+        while True:
+            best = None
+            for priority in PRIORITIES:
+                queue = self._queues[priority]
+                if queue.head() is None or not self._has_room(priority):
+                    continue
+                tag = queue.tags[0]
+                if best is None or tag < best[0]:
+                    best = (tag, priority)
+            if best is None:
+                return
+
+            tag, priority = best
+            queue = self._queues[priority]
+            tenant_tag, _, waiter = heapq.heappop(queue.heap)
+            queue.tags.popleft()
+            self._vtime = tag
+            queue.vclock = tenant_tag
+            queue.queued -= 1
+            queue.in_flight += 1
+            waiter.granted = True
+            waiter.event.set()
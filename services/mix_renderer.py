@@ -0,0 +1,198 @@
+"""
+Mix Renderer - Continuous, crossfaded playlist mixes rendered in a process pool
+"""
+import hashlib
+import multiprocessing
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config.settings import MIX_CONFIG
+from utils import audio_dsp
+from utils.metrics import Counter, Histogram
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+MIX_RENDERS = Counter(
+    'beatify_mix_renders_total',
+    'Playlist mix requests by result',
+    ['result']
+)
+MIX_RENDER_LATENCY = Histogram(
+    'beatify_mix_render_duration_seconds',
+    'Time to render a full playlist mix'
+)
+
+
+class MixRenderer:
+    """
+    Fetches playlist tracks in parallel threads, decodes and
+    loudness-normalizes them in worker processes, joins them with
+    crossfades in the request thread as results arrive, and caches
+    finished mixes on disk keyed by playlist version.
+    """
+
+    def __init__(self, cache_dir=None, workers=None, sample_rate=None,
+                 crossfade_seconds=None, target_dbfs=None, fetch_workers=None):
+        """
+        Initialize renderer
+
+        Args:
+            cache_dir (str): Directory for finished mixes
+            workers (int): Worker processes for decoding and DSP
+            sample_rate (int): Output sample rate in Hz
+            crossfade_seconds (float): Overlap between consecutive tracks
+            target_dbfs (float): Loudness target for every track
+            fetch_workers (int): Threads fetching track audio ahead of the mix
+        """
+        self.cache_dir = os.path.abspath(cache_dir or MIX_CONFIG['cache_dir'])
+        self.workers = workers or MIX_CONFIG['workers']
+        self.sample_rate = sample_rate or MIX_CONFIG['sample_rate']
+        self.crossfade_seconds = MIX_CONFIG['crossfade'] if crossfade_seconds is None else crossfade_seconds
+        self.target_dbfs = MIX_CONFIG['target_dbfs'] if target_dbfs is None else target_dbfs
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._fetch_pool = ThreadPoolExecutor(
+            max_workers=fetch_workers or MIX_CONFIG['fetch_workers'],
+            thread_name_prefix='mix-fetch'
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def available(self):
+        return audio_dsp.np is not None
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn avoids forking a multi-threaded server process
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def mix_path(self, playlist):
+        version = hashlib.sha1(
+            f"{playlist['updated_at']!r}|{','.join(playlist['tracks'])}".encode('utf-8')
+        ).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{playlist['id']}-{version}.wav")
+
+    def cached_mix(self, playlist):
+        """
+        Get the finished mix for the playlist's current version
+
+        Returns:
+            str: Path, or None if it has not been rendered
+        """
+        path = self.mix_path(playlist)
+        return path if os.path.exists(path) else None
+
+    def stream_mix(self, playlist, open_track):
+        """
+        Render a mix, yielding WAV bytes while later tracks are still being processed
+
+        Tracks are fetched and prepared in the background once iteration
+        starts, so the header goes out before any download finishes. The
+        output is also written to the cache; the file only becomes visible
+        once the whole mix has rendered, and a mix with no playable tracks
+        is not cached at all.
+
+        Args:
+            playlist (dict): Playlist data (id, tracks, updated_at)
+            open_track (callable): Context manager taking a track ID and
+                                   yielding a local audio path (or None)
+                                   that stays valid inside the block
+
+        Yields:
+            bytes: WAV header followed by PCM chunks
+        """
+        path = self.mix_path(playlist)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        pool = self._get_pool()
+
+        def prepare(track_id):
+            with open_track(track_id) as track_path:
+                if not track_path:
+                    return None
+                return pool.submit(
+                    audio_dsp.prepare_segment, track_path, self.sample_rate, self.target_dbfs
+                ).result()
+
+        futures = [self._fetch_pool.submit(prepare, track_id) for track_id in playlist['tracks']]
+
+        def segments():
+            for track_id, future in zip(playlist['tracks'], futures):
+                try:
+                    segment = future.result()
+                except Exception as e:
+                    logger.warning("Skipping track %s in mix: %s", track_id, e)
+                    continue
+                if segment is not None:
+                    yield segment
+
+        MIX_RENDERS.inc(result='rendered')
+        crossfade = int(self.crossfade_seconds * self.sample_rate)
+        data_size = 0
+        completed = False
+        try:
+            with MIX_RENDER_LATENCY.time(), open(temp_path, 'wb') as handle:
+                header = audio_dsp.wav_header(self.sample_rate)
+                handle.write(header)
+                yield header
+                for block in audio_dsp.crossfade_stream(segments(), crossfade):
+                    pcm = audio_dsp.to_pcm16(block)
+                    data_size += len(pcm)
+                    handle.write(pcm)
+                    yield pcm
+            completed = True
+        finally:
+            # Client went away or rendering failed: drop the partial file
+            if not completed:
+                for future in futures:
+                    future.cancel()
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        if not data_size:
+            # Every track failed to open or decode; caching the empty mix would
+            # keep serving it until the playlist changes
+            os.remove(temp_path)
+            MIX_RENDERS.inc(result='empty')
+            logger.warning("Mix for playlist %s has no playable tracks; not caching it", playlist['id'])
+            return
+
+        # Patch real sizes into the header so the cached file has a proper length
+        with open(temp_path, 'r+b') as handle:
+            handle.seek(4)
+            handle.write(struct.pack('<I', data_size + 36))
+            handle.seek(40)
+            handle.write(struct.pack('<I', data_size))
+        os.replace(temp_path, path)
+        self.remove_mixes(playlist['id'], keep=path)
+        logger.info("Rendered mix for playlist %s (%s bytes)", playlist['id'], data_size)
+
+    def remove_mixes(self, playlist_id, keep=None):
+        """
+        Delete a playlist's cached mixes
+
+        Args:
+            playlist_id (str): Playlist identifier
+            keep (str): Path of a mix to leave in place
+        """
+        prefix = f'{playlist_id}-'
+        for name in os.listdir(self.cache_dir):
+            full_path = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and name.endswith('.wav') and full_path != keep:
+                try:
+                    os.remove(full_path)
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,234 @@
+"""
+Model Router - Latency- and error-aware choice between Perplexity models
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config.settings import MODEL_ROUTING_CONFIG
+from utils.metrics import Counter, Gauge
+
+MODEL_ROUTED = Counter(
+    'beatify_model_routed_total',
+    'Upstream LLM calls by chosen model and the reason it was chosen',
+    ['model', 'reason']
+)
+MODEL_LATENCY_P90 = Gauge(
+    'beatify_model_latency_p90_seconds',
+    'Rolling p90 upstream latency per model',
+    ['model']
+)
+MODEL_ERROR_RATE = Gauge(
+    'beatify_model_error_rate',
+    'Rolling fraction of failed upstream calls per model',
+    ['model']
+)
+
+_request = contextvars.ContextVar('beatify_model_request', default=(None, None))
+
+
+@contextmanager
+def model_request(model=None, deadline=None):
+    """
+    Apply per-request routing options to the block's LLM calls
+
+    Args:
+        model (str): Use this model instead of routing
+        deadline (float): time.monotonic() by which the response is needed;
+                          the router picks a model expected to finish in time
+    """
+    token = _request.set((model, deadline))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def requested_model():
+    """
+    Model override set by model_request() for the current context
+
+    Returns:
+        str: Model name, or None when the router decides
+    """
+    return _request.get()[0]
+
+
+def parse_costs(spec):
+    """
+    Parse "model=cost,..." into a dict
+
+    Args:
+        spec (str): Cost specification, e.g. "sonar=1,sonar-pro=3"
+
+    Returns:
+        dict: Model -> relative cost
+    """
+    costs = {}
+    for item in spec.split(','):
+        model, _, cost = item.partition('=')
+        if model.strip():
+            costs[model.strip()] = float(cost)
+    return costs
+
+
+class _ModelStats:
+    """Rolling window of (time, latency, ok) samples for one model"""
+
+    __slots__ = ('samples',)
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+
+    def window(self, now, seconds):
+        return [sample for sample in self.samples if now - sample[0] <= seconds]
+
+
+class ModelRouter:
+    """
+    Picks the model for each upstream call.
+
+    Every call's latency and outcome feed a rolling window per model. A
+    call goes to the cheapest model whose rolling p90 latency fits the time
+    it has left: the target for its priority class, cut short by the
+    caller's deadline when one is set. The target also shrinks while calls
+    are queued for the scheduler, so slots turn over faster under load.
+    Models whose recent error rate is too high are skipped, and if no
+    model fits, the fastest healthy one is used.
+
+    A model with too few recent samples is not assumed to fit. The default
+    model is used until there are stats to beat it, and every probe_every-th
+    call without a deadline goes to the cheapest model lacking stats, so
+    new and recovered models are tried without moving all traffic to them.
+    """
+
+    def __init__(self, models, default_model, enabled=None, costs=None, targets=None,
+                 window=None, min_samples=None, max_error_rate=None, probe_every=None):
+        """
+        Initialize router
+
+        Args:
+            models (list): Candidate model names
+            default_model (str): Model used when routing is disabled or nothing is known yet
+            enabled (bool): Route per call instead of always using default_model
+            costs (dict): Model -> relative cost per call
+            targets (dict): Priority class -> latency target in seconds
+            window (float): Seconds of history considered
+            min_samples (int): Samples needed before a model's stats are trusted
+            max_error_rate (float): Error rate above which a model is avoided
+            probe_every (int): Send every Nth routed call to a model without
+                               stats (0 = never)
+        """
+        config = MODEL_ROUTING_CONFIG
+        self.models = list(models)
+        self.default_model = default_model
+        self.enabled = config['enabled'] if enabled is None else enabled
+        self.costs = parse_costs(config['costs']) if costs is None else dict(costs)
+        self.targets = dict(config['targets'] if targets is None else targets)
+        self.window = config['window'] if window is None else window
+        self.min_samples = config['min_samples'] if min_samples is None else min_samples
+        self.max_error_rate = config['max_error_rate'] if max_error_rate is None else max_error_rate
+        self.probe_every = config['probe_every'] if probe_every is None else probe_every
+        self._stats = {model: _ModelStats(config['max_samples']) for model in self.models}
+        self._routed = 0
+        self._lock = threading.Lock()
+
+        # Unknown costs sort last so they're only used when nothing cheaper fits
+        self._by_cost = sorted(self.models, key=lambda model: self.costs.get(model, float('inf')))
+        for model in self.models:
+            MODEL_LATENCY_P90.set_function(lambda model=model: self.estimate(model)[0] or 0.0, model=model)
+            MODEL_ERROR_RATE.set_function(lambda model=model: self.estimate(model)[1] or 0.0, model=model)
+
+    def estimate(self, model):
+        """
+        Rolling stats for a model
+
+        Args:
+            model (str): Model name
+
+        Returns:
+            tuple: (p90 latency of successful calls, error rate), each None
+                   when there are fewer than min_samples samples
+        """
+        now = time.monotonic()
+        with self._lock:
+            samples = self._stats[model].window(now, self.window)
+        if len(samples) < self.min_samples:
+            return None, None
+        error_rate = sum(1 for _, _, ok in samples if not ok) / len(samples)
+        latencies = sorted(latency for _, latency, ok in samples if ok)
+        p90 = latencies[min(len(latencies) - 1, int(0.9 * len(latencies)))] if latencies else None
+        return p90, error_rate
+
+    def choose(self, priority='interactive', load=0.0):
+        """
+        Pick the model for a call about to be sent
+
+        Args:
+            priority (str): Priority class of the call
+            load (float): Calls queued per concurrency slot
+
+        Returns:
+            str: Model name
+        """
+        override, deadline = _request.get()
+        if override:
+            MODEL_ROUTED.inc(model=override, reason='override')
+            return override
+        if not self.enabled:
+            MODEL_ROUTED.inc(model=self.default_model, reason='fixed')
+            return self.default_model
+
+        budget = self.targets.get(priority, self.targets['interactive']) / (1.0 + load)
+        if deadline is not None:
+            budget = min(budget, deadline - time.monotonic())
+
+        healthy, unknown = [], []
+        for model in self._by_cost:
+            p90, error_rate = self.estimate(model)
+            if error_rate is None:
+                unknown.append(model)
+                continue
+            if error_rate > self.max_error_rate or p90 is None:
+                continue
+            healthy.append((p90, model))
+
+        with self._lock:
+            self._routed += 1
+            probe = bool(self.probe_every) and self._routed % self.probe_every == 0
+        if probe and unknown and deadline is None:
+            MODEL_ROUTED.inc(model=unknown[0], reason='probe')
+            return unknown[0]
+
+        # healthy is in cost order, so the first that fits is the cheapest
+        for p90, model in healthy:
+            if p90 <= budget:
+                MODEL_ROUTED.inc(model=model, reason='cheapest')
+                return model
+        if self.default_model in unknown:
+            # Nothing known fits; stick with the configured model until it has stats
+            MODEL_ROUTED.inc(model=self.default_model, reason='default')
+            return self.default_model
+        if healthy:
+            model = min(healthy)[1]
+            MODEL_ROUTED.inc(model=model, reason='fastest')
+            return model
+        # Every model is failing; stay on the configured one
+        MODEL_ROUTED.inc(model=self.default_model, reason='fallback')
+        return self.default_model
+
+    def record(self, model, latency, ok):
+        """
+        Feed back the outcome of a call
+
+        Args:
+            model (str): Model used
+            latency (float): Seconds the upstream call took
+            ok (bool): Whether it produced a usable response
+        """
+        stats = self._stats.get(model)
+        if stats is None:
+            return
+        with self._lock:
+            stats.samples.append((time.monotonic(), latency, ok))
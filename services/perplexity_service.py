@@ -3,11 +3,23 @@ Perplexity Service - Integration with Perplexity AI API
 """
 import requests
 import json
+import re
+import time
 from config.settings import PERPLEXITY_CONFIG, MODEL_SETTINGS
+from services import upstream
+from services.llm_scheduler import LLMScheduler, SchedulerTimeout
+from services.model_router import ModelRouter
+from utils.metrics import STAGE_LATENCY
 from utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Longest upstream body excerpt written to the logs
+MAX_LOGGED_BODY = 500
+
+# sonar-reasoning replies start with their reasoning in <think>...</think>
+THINK_BLOCK = re.compile(r'<think>.*?</think>', re.DOTALL)
+
 
 def get_system_prompt(language='English'):
     """Generate system prompt for the specified language"""
@@ -42,6 +54,45 @@ Rules:
 - Be creative and unique"""
 
 
+def get_multilingual_system_prompt(languages):
+    """Generate system prompt asking for one track per language in a single response"""
+    language_list = ', '.join(languages)
+    return f"""You are an AI music generator for the project "Beatify".
+
+Task: Generate one music description inspired by the user's word for EACH of these languages: {language_list}.
+
+Output Format - MUST be valid JSON only:
+{{
+  "tracks": [
+    {{
+      "track": {{
+        "title": "Generated track title in that language",
+        "language": "One of: {language_list}",
+        "genre": "Electronic/Pop/Rock/etc",
+        "mood": "energetic/happy/sad/relaxed/emotional",
+        "style": "Detailed music style description with instruments",
+        "lyrics": "Creative lyrics in that language or null",
+        "duration": "1-2 minutes",
+        "audio_url": "placeholder"
+      }},
+      "metadata": {{
+        "keyword": "USER_WORD",
+        "timestamp": "ISO 8601 timestamp",
+        "model": "perplexity"
+      }}
+    }}
+  ]
+}}
+
+Rules:
+- Output ONLY JSON, no explanations
+- Return exactly {len(languages)} entries in "tracks", one per language, in this order: {language_list}
+- Set "language" to the exact language name from the list
+- Write each title and lyrics in its own language
+- Choose genre/mood based on word meaning
+- Be creative and unique"""
+
+
 class PerplexityService:
     """Service for interacting with Perplexity AI API"""
 
@@ -67,22 +118,30 @@ class PerplexityService:
 
         self.model = configured_model
         self.max_tokens = MODEL_SETTINGS['max_tokens']
+        self.max_tokens_per_call = MODEL_SETTINGS['max_tokens_per_call']
         self.temperature = MODEL_SETTINGS['temperature']
+        self.scheduler = LLMScheduler()
+        self.router = ModelRouter(self.VALID_MODELS, self.model)
 
         if not self.api_key:
             raise ValueError("PERPLEXITY_API_KEY is required")
 
-        logger.info(f"PerplexityService initialized with model: {self.model}")
+        logger.info("PerplexityService initialized with model: %s", self.model)
 
-    def generate_music_description(self, word, language='English', custom_settings=None):
-        """Generate music description using Perplexity AI"""
-        try:
-            logger.info(f'Generating music description for "{word}" in {language}')
+    def _request_json(self, system_prompt, user_prompt, max_tokens=None):
+        """
+        Send a chat completion request and parse the JSON content of the reply
 
-            # Prompt building
-            system_prompt = get_system_prompt(language)
-            user_prompt = f"Generate a unique music track inspired by the word: {word}"
+        Args:
+            system_prompt (str): System message
+            user_prompt (str): User message
+            max_tokens (int): Optional override for the response token budget
 
+        Returns:
+            dict: Parsed JSON content
+        """
+        model, latency, ok = None, 0.0, False
+        try:
             headers = {
                 'Authorization': f'Bearer {self.api_key}',
                 'Content-Type': 'application/json'
@@ -94,40 +153,130 @@ class PerplexityService:
                     {'role': 'system', 'content': system_prompt},
                     {'role': 'user', 'content': user_prompt}
                 ],
-                'max_tokens': self.max_tokens,
+                'max_tokens': max_tokens or self.max_tokens,
                 'temperature': self.temperature
             }
 
             logger.info("Calling Perplexity API...")
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
+            # Waits for a fair-share slot according to the caller's llm_priority()
+            with self.scheduler.slot() as priority, STAGE_LATENCY.time(stage='llm_call'):
+                # Chosen after the queue wait, so a deadline reflects the time actually left
+                model = payload['model'] = self.router.choose(priority, self.scheduler.load)
+                started = time.perf_counter()
+                try:
+                    response = upstream.send(
+                        'perplexity', 'POST', self.api_url,
+                        headers=headers, json=payload, timeout=30
+                    )
+                finally:
+                    latency = time.perf_counter() - started
 
             if response.status_code != 200:
-                logger.error(f"Perplexity API error {response.status_code}: {response.text}")
+                # Only log the start of the body; error pages can be large
+                logger.error(
+                    "Perplexity API error %s: %s (%s chars)",
+                    response.status_code, response.text[:MAX_LOGGED_BODY], len(response.text)
+                )
                 raise Exception(f"API request failed ({response.status_code})")
 
-            api_response = response.json()
-            content = api_response["choices"][0]["message"]["content"].strip()
-
-            # Strip ```json ``` wrapper
-            if content.startswith("```"):
-                content = content.split("```")[1]  # Removes first ```
-            if content.startswith("json"):
-                content = content[4:]
-            content = content.strip().rstrip("`").strip()
-
-            # Parse JSON
-            try:
-                result = json.loads(content)
-                logger.info("Successfully parsed Perplexity JSON response")
-                return result
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON from API: {content}")
-                raise Exception("Perplexity returned invalid JSON")
+            with STAGE_LATENCY.time(stage='json_parse'):
+                api_response = response.json()
+                content = THINK_BLOCK.sub('', api_response["choices"][0]["message"]["content"]).strip()
+
+                # Strip ```json ``` wrapper
+                if content.startswith("```"):
+                    content = content.split("```")[1]  # Removes first ```
+                if content.startswith("json"):
+                    content = content[4:]
+                content = content.strip().rstrip("`").strip()
+
+                # Parse JSON
+                try:
+                    result = json.loads(content)
+                except json.JSONDecodeError:
+                    logger.error("Invalid JSON from API: %s", content[:MAX_LOGGED_BODY])
+                    raise Exception("Perplexity returned invalid JSON")
+
+            logger.info("Successfully parsed Perplexity JSON response")
+            ok = True
+            return result
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Network error calling Perplexity API: {str(e)}")
+            logger.error("Network error calling Perplexity API: %s", e)
             raise Exception(f"Failed to connect to Perplexity API: {str(e)}")
 
+        except SchedulerTimeout as e:
+            # Overload, not a failure: callers turn it into a 503
+            logger.warning("%s", e)
+            raise
+
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
+            logger.error("Unexpected error: %s", e)
             raise
+
+        finally:
+            # Bad status codes and unparseable replies count against the model too
+            if model:
+                self.router.record(model, latency, ok)
+
+    def generate_music_description(self, word, language='English', custom_settings=None):
+        """Generate music description using Perplexity AI"""
+        logger.info('Generating music description for "%s" in %s', word, language)
+
+        # Prompt building
+        system_prompt = get_system_prompt(language)
+        user_prompt = f"Generate a unique music track inspired by the word: {word}"
+
+        return self._request_json(system_prompt, user_prompt)
+
+    def generate_multilingual_descriptions(self, word, languages, custom_settings=None):
+        """
+        Generate one music description per language with a single API call
+
+        Args:
+            word (str): The input word/name
+            languages (list): Target languages
+            custom_settings (dict): Optional custom settings
+
+        Returns:
+            dict: Mapping of language to its raw track response
+        """
+        if len(languages) == 1:
+            return {languages[0]: self.generate_music_description(word, languages[0], custom_settings)}
+
+        logger.info('Generating music descriptions for "%s" in %s', word, ", ".join(languages))
+
+        system_prompt = get_multilingual_system_prompt(languages)
+        user_prompt = f"Generate unique music tracks inspired by the word: {word}"
+
+        # Each track needs its own share of the response budget, up to the per-call ceiling
+        max_tokens = min(self.max_tokens * len(languages), max(self.max_tokens, self.max_tokens_per_call))
+        result = self._request_json(system_prompt, user_prompt, max_tokens)
+
+        tracks = result.get('tracks') if isinstance(result, dict) else result
+        if not isinstance(tracks, list):
+            raise Exception("Perplexity response is missing the tracks array")
+
+        # Match tracks to languages by name, falling back to position
+        by_language = {}
+        unmatched = []
+        for entry in tracks:
+            track = entry.get('track') if isinstance(entry, dict) else None
+            language = track.get('language') if isinstance(track, dict) else None
+            if language in languages and language not in by_language:
+                by_language[language] = entry
+            else:
+                unmatched.append(entry)
+
+        for language in languages:
+            if language not in by_language and unmatched:
+                entry = unmatched.pop(0)
+                if isinstance(entry, dict) and isinstance(entry.get('track'), dict):
+                    entry['track']['language'] = language
+                by_language[language] = entry
+
+        missing = [language for language in languages if language not in by_language]
+        if missing:
+            raise Exception(f"Perplexity returned no track for: {', '.join(missing)}")
+
+        return by_language
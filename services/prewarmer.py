@@ -0,0 +1,79 @@
+"""
+Cache Pre-warmer - Refresh cached generations for hot keywords while idle
+"""
+import threading
+import time
+from services.llm_scheduler import llm_priority
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class CachePrewarmer:
+    """Background worker that keeps the top-K keywords warm in the generation cache"""
+
+    def __init__(self, controller, top_k=20, interval=60, idle_seconds=10):
+        """
+        Initialize pre-warmer
+
+        Args:
+            controller (MusicController): Controller owning the cache and sketch
+            top_k (int): Number of hot keywords to keep warm
+            interval (float): Seconds between refresh passes
+            idle_seconds (float): Required quiet time before refreshing
+        """
+        self.controller = controller
+        self.top_k = top_k
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cache-prewarmer', daemon=True)
+        self._thread.start()
+        logger.info("Cache pre-warmer started (top %s, every %ss)", self.top_k, self.interval)
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+    def _is_idle(self):
+        return time.time() - self.controller.last_request_at >= self.idle_seconds
+
+    def _needs_refresh(self, key):
+        # Refresh once an entry has used up most of its lifetime
+        age = self.controller.generation_cache.age(key)
+        return age is None or age >= self.controller.generation_cache.ttl * 0.8
+
+    def run_once(self):
+        """
+        Refresh stale cache entries for the current hot keywords
+
+        Returns:
+            int: Number of entries refreshed
+        """
+        refreshed = 0
+        for (word, language), _count, _error in self.controller.hot_keywords.top(self.top_k):
+            if self._stop.is_set() or not self._is_idle():
+                break
+            if not self._needs_refresh((word, language)):
+                continue
+            try:
+                with llm_priority('prewarm', tenant='prewarmer'):
+                    self.controller.refresh_generation(word, language)
+                refreshed += 1
+            except Exception as e:
+                logger.warning("Pre-warm failed for '%s' (%s): %s", word, language, e)
+        if refreshed:
+            logger.info("Pre-warmed %s hot keywords", refreshed)
+        return refreshed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self._is_idle():
+                self.run_once()
@@ -0,0 +1,315 @@
+"""
+Synth Engine - Procedural audio rendering from track genre, mood and style
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import wave
+from config.settings import SYNTH_CONFIG
+from utils.logger import setup_logger
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; AudioEngine falls back to placeholders
+    np = None
+
+logger = setup_logger()
+
+# Tempo range (BPM), drum pattern and default instrument per genre
+GENRE_PROFILES = {
+    'electronic': {'bpm': (118, 128), 'drums': 'four_on_floor', 'timbre': 'saw'},
+    'pop': {'bpm': (100, 120), 'drums': 'pop', 'timbre': 'bright'},
+    'hip hop': {'bpm': (85, 95), 'drums': 'boom_bap', 'timbre': 'soft'},
+    'rock': {'bpm': (110, 140), 'drums': 'rock', 'timbre': 'square'},
+    'classical': {'bpm': (60, 90), 'drums': None, 'timbre': 'strings'},
+    'jazz': {'bpm': (90, 140), 'drums': 'swing', 'timbre': 'piano'},
+    'edm': {'bpm': (124, 130), 'drums': 'four_on_floor', 'timbre': 'saw'},
+    'r&b': {'bpm': (65, 80), 'drums': 'boom_bap', 'timbre': 'soft'},
+    'country': {'bpm': (100, 120), 'drums': 'rock', 'timbre': 'pluck'},
+    'folk': {'bpm': (90, 110), 'drums': 'sparse', 'timbre': 'pluck'},
+    'ambient': {'bpm': (60, 75), 'drums': None, 'timbre': 'pad'},
+    'lo-fi': {'bpm': (70, 88), 'drums': 'boom_bap', 'timbre': 'soft'},
+    'indie': {'bpm': (105, 125), 'drums': 'rock', 'timbre': 'pluck'},
+    'trap': {'bpm': (130, 150), 'drums': 'trap', 'timbre': 'saw'},
+    'house': {'bpm': (120, 126), 'drums': 'four_on_floor', 'timbre': 'bright'}
+}
+
+# Scale, tempo multiplier and chord progression (scale degrees) per mood
+MOOD_PROFILES = {
+    'energetic': {'scale': 'major', 'tempo': 1.08, 'progression': [0, 4, 5, 3]},
+    'happy': {'scale': 'major', 'tempo': 1.04, 'progression': [0, 3, 4, 0]},
+    'sad': {'scale': 'minor', 'tempo': 0.85, 'progression': [0, 5, 2, 6]},
+    'relaxed': {'scale': 'major_pentatonic', 'tempo': 0.9, 'progression': [0, 3, 1, 4]},
+    'emotional': {'scale': 'minor', 'tempo': 0.92, 'progression': [0, 5, 3, 4]},
+    'intense': {'scale': 'phrygian', 'tempo': 1.1, 'progression': [0, 1, 0, 6]},
+    'peaceful': {'scale': 'major_pentatonic', 'tempo': 0.8, 'progression': [0, 2, 3, 0]},
+    'uplifting': {'scale': 'lydian', 'tempo': 1.05, 'progression': [0, 1, 4, 5]},
+    'dark': {'scale': 'minor', 'tempo': 0.95, 'progression': [0, 6, 5, 4]},
+    'romantic': {'scale': 'major', 'tempo': 0.9, 'progression': [0, 5, 3, 4]},
+    'chill': {'scale': 'dorian', 'tempo': 0.9, 'progression': [0, 3, 0, 3]},
+    'aggressive': {'scale': 'phrygian', 'tempo': 1.12, 'progression': [0, 1, 6, 0]}
+}
+
+SCALES = {
+    'major': [0, 2, 4, 5, 7, 9, 11],
+    'minor': [0, 2, 3, 5, 7, 8, 10],
+    'dorian': [0, 2, 3, 5, 7, 9, 10],
+    'phrygian': [0, 1, 3, 5, 7, 8, 10],
+    'lydian': [0, 2, 4, 6, 7, 9, 11],
+    'major_pentatonic': [0, 2, 4, 7, 9]
+}
+
+# Harmonic amplitudes, attack (s) and exponential decay rate per instrument
+TIMBRES = {
+    'saw': {'harmonics': [1 / k for k in range(1, 9)], 'attack': 0.01, 'decay': 3.0},
+    'square': {'harmonics': [1 / k if k % 2 else 0 for k in range(1, 10)], 'attack': 0.01, 'decay': 2.5},
+    'soft': {'harmonics': [1, 0.3, 0.1], 'attack': 0.02, 'decay': 2.0},
+    'bright': {'harmonics': [1, 0.6, 0.4, 0.25, 0.15], 'attack': 0.01, 'decay': 3.5},
+    'pluck': {'harmonics': [1, 0.5, 0.33, 0.25, 0.2], 'attack': 0.003, 'decay': 6.0},
+    'piano': {'harmonics': [1, 0.5, 0.25, 0.12, 0.06], 'attack': 0.005, 'decay': 4.0},
+    'strings': {'harmonics': [1, 0.5, 0.33, 0.25, 0.2, 0.16], 'attack': 0.15, 'decay': 0.5},
+    'pad': {'harmonics': [1, 0.2, 0.1], 'attack': 0.4, 'decay': 0.3}
+}
+
+# Style keywords that pick the lead instrument, checked in order
+STYLE_TIMBRES = [
+    ('piano', 'piano'), ('keys', 'piano'), ('guitar', 'pluck'), ('acoustic', 'pluck'),
+    ('violin', 'strings'), ('string', 'strings'), ('orchestra', 'strings'), ('cello', 'strings'),
+    ('pad', 'pad'), ('atmospher', 'pad'), ('synth', 'saw'), ('distort', 'square')
+]
+
+# 16-step patterns for kick, snare and hi-hat
+DRUM_PATTERNS = {
+    'four_on_floor': ('x...x...x...x...', '....x.......x...', '..x...x...x...x.'),
+    'pop': ('x...x...x..x....', '....x.......x...', 'x.x.x.x.x.x.x.x.'),
+    'boom_bap': ('x......x..x.....', '....x.......x...', 'x.x.x.x.x.x.x.x.'),
+    'rock': ('x.......x.x.....', '....x.......x...', 'x.x.x.x.x.x.x.x.'),
+    'trap': ('x......x........', '........x.......', 'xxxxxxxxxxxxxxxx'),
+    'swing': ('x.......x.......', '....x.......x...', 'x..x.xx..x.xx..x'),
+    'sparse': ('x.......x.......', '................', '................')
+}
+
+
+def _match(value, options, default):
+    """Find the first known option named in a free-text field"""
+    text = str(value or '').lower()
+    if text in options:
+        return text
+    for option in options:
+        if option in text:
+            return option
+    return default
+
+
+def synth_available():
+    return np is not None
+
+
+class SynthEngine:
+    """Renders short clips from track descriptions and caches them on disk by parameters"""
+
+    def __init__(self, cache_dir=None, sample_rate=None, duration=None):
+        """
+        Initialize synth engine
+
+        Args:
+            cache_dir (str): Directory for rendered WAV files
+            sample_rate (int): Output sample rate in Hz
+            duration (float): Clip length in seconds
+        """
+        if np is None:
+            raise RuntimeError('NumPy is required for the synth audio backend')
+        self.cache_dir = cache_dir or SYNTH_CONFIG['cache_dir']
+        self.sample_rate = sample_rate or SYNTH_CONFIG['sample_rate']
+        self.duration = duration or SYNTH_CONFIG['duration']
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def params_for(self, track_data):
+        """
+        Map a track's genre, mood and style to synthesis parameters
+
+        Args:
+            track_data (dict): Track information
+
+        Returns:
+            dict: Deterministic rendering parameters
+        """
+        genre = _match(track_data.get('genre'), GENRE_PROFILES, 'electronic')
+        mood = _match(track_data.get('mood'), MOOD_PROFILES, 'energetic')
+        genre_profile = GENRE_PROFILES[genre]
+        mood_profile = MOOD_PROFILES[mood]
+
+        style = str(track_data.get('style') or '').lower()
+        timbre = next((t for keyword, t in STYLE_TIMBRES if keyword in style), genre_profile['timbre'])
+
+        # Seed only from the musical choices so equal choices share one cached clip
+        seed = int(hashlib.sha1(f'{genre}|{mood}|{timbre}'.encode('utf-8')).hexdigest()[:8], 16)
+        low, high = genre_profile['bpm']
+        bpm = round((low + seed % (high - low + 1)) * mood_profile['tempo'])
+
+        return {
+            'genre': genre,
+            'mood': mood,
+            'timbre': timbre,
+            'drums': genre_profile['drums'],
+            'scale': mood_profile['scale'],
+            'progression': mood_profile['progression'],
+            'bpm': bpm,
+            'key': seed % 12,
+            'seed': seed,
+            'duration': self.duration,
+            'sample_rate': self.sample_rate
+        }
+
+    @staticmethod
+    def clip_id(params):
+        encoded = json.dumps(params, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()[:20]
+
+    def clip_path(self, clip_id):
+        return os.path.join(self.cache_dir, f'{clip_id}.wav')
+
+    def get_clip(self, track_data):
+        """
+        Get a rendered clip for a track, rendering it only on a cache miss
+
+        Args:
+            track_data (dict): Track information
+
+        Returns:
+            tuple: (clip_id, params, cached)
+        """
+        params = self.params_for(track_data)
+        clip_id = self.clip_id(params)
+        path = self.clip_path(clip_id)
+        if os.path.exists(path):
+            return clip_id, params, True
+
+        with self._locks_lock:
+            lock = self._locks.setdefault(clip_id, threading.Lock())
+        with lock:
+            if os.path.exists(path):
+                return clip_id, params, True
+            start = time.perf_counter()
+            samples = self.render(params)
+            self._write_wav(path, samples)
+            elapsed = time.perf_counter() - start
+            logger.info(
+                "Rendered %ss synth clip %s in %.3fs (%.0fx real time)",
+                params['duration'], clip_id, elapsed, params['duration'] / max(elapsed, 1e-9)
+            )
+        return clip_id, params, False
+
+    def _tone(self, frequency, length, timbre, cache):
+        key = (round(frequency, 3), length, timbre)
+        tone = cache.get(key)
+        if tone is None:
+            spec = TIMBRES[timbre]
+            t = np.arange(length, dtype=np.float32) / self.sample_rate
+            harmonics = np.arange(1, len(spec['harmonics']) + 1, dtype=np.float32)[:, None]
+            amplitudes = np.asarray(spec['harmonics'], dtype=np.float32)[:, None]
+            # Drop harmonics above Nyquist to avoid aliasing
+            amplitudes = np.where(harmonics * frequency < self.sample_rate / 2, amplitudes, 0)
+            tone = (amplitudes * np.sin(2 * np.pi * frequency * harmonics * t)).sum(axis=0)
+            envelope = np.minimum(1.0, t / max(spec['attack'], 1e-4)) * np.exp(-spec['decay'] * t)
+            tone = (tone * envelope / max(float(amplitudes.sum()), 1e-6)).astype(np.float32)
+            cache[key] = tone
+        return tone
+
+    def _drum_hits(self, rng):
+        sr = self.sample_rate
+        t = np.arange(int(0.3 * sr), dtype=np.float32) / sr
+        sweep = 45 + 75 * np.exp(-t * 25)
+        kick = np.sin(2 * np.pi * np.cumsum(sweep) / sr) * np.exp(-t * 14)
+        noise = rng.standard_normal(t.size).astype(np.float32)
+        snare = (0.7 * noise + 0.5 * np.sin(2 * np.pi * 190 * t)) * np.exp(-t * 22)
+        hat = np.diff(noise, prepend=0)[:int(0.06 * sr)] * np.exp(-t[:int(0.06 * sr)] * 70) * 0.35
+        return kick.astype(np.float32), snare.astype(np.float32), hat.astype(np.float32)
+
+    def render(self, params):
+        """
+        Render a clip
+
+        Args:
+            params (dict): Parameters from params_for()
+
+        Returns:
+            numpy.ndarray: Mono int16 samples
+        """
+        sr = params['sample_rate']
+        rng = np.random.default_rng(params['seed'])
+        total = int(params['duration'] * sr)
+        out = np.zeros(total + sr, dtype=np.float32)
+
+        beat = 60.0 / params['bpm']
+        bar = 4 * beat
+        scale = SCALES[params['scale']]
+        root = 48 + params['key']
+        tones = {}
+
+        def note(degree, octave):
+            steps = len(scale)
+            midi = root + 12 * (octave + degree // steps) + scale[degree % steps]
+            return 440.0 * 2 ** ((midi - 69) / 12)
+
+        def place(signal, start_seconds, gain):
+            start = int(start_seconds * sr)
+            if start >= total:
+                return
+            end = min(start + signal.size, out.size)
+            out[start:end] += gain * signal[:end - start]
+
+        bars = int(np.ceil(params['duration'] / bar))
+        for index in range(bars):
+            degree = params['progression'][index % len(params['progression'])]
+            bar_start = index * bar
+
+            # Chord (triad) held for the bar
+            chord_length = int(bar * sr)
+            for offset in (0, 2, 4):
+                place(self._tone(note(degree + offset, 0), chord_length, 'pad', tones), bar_start, 0.18)
+
+            # Bass on every beat
+            for b in range(4):
+                place(self._tone(note(degree, -1), int(beat * sr), 'soft', tones), bar_start + b * beat, 0.35)
+
+            # Melody on eighth notes, drawn from the chord and scale
+            for step in range(8):
+                if rng.random() < 0.3:
+                    continue
+                melody_degree = degree + int(rng.choice([0, 2, 4, 7, 1, 5]))
+                melody = self._tone(note(melody_degree, 1), int(beat * sr), params['timbre'], tones)
+                place(melody, bar_start + step * beat / 2, 0.22)
+
+        if params['drums']:
+            kick, snare, hat = self._drum_hits(rng)
+            pattern = DRUM_PATTERNS[params['drums']]
+            step_length = beat / 4
+            for index in range(int(np.ceil(params['duration'] / step_length))):
+                step = index % 16
+                for hits, sound, gain in zip(pattern, (kick, snare, hat), (0.6, 0.35, 0.25)):
+                    if hits[step] == 'x':
+                        place(sound, index * step_length, gain)
+
+        out = out[:total]
+        fade = min(int(0.05 * sr), total // 2)
+        if fade:
+            ramp = np.linspace(0, 1, fade, dtype=np.float32)
+            out[:fade] *= ramp
+            out[-fade:] *= ramp[::-1]
+        peak = float(np.abs(out).max()) or 1.0
+        return (out / peak * 0.89 * 32767).astype(np.int16)
+
+    def _write_wav(self, path, samples):
+        # Write to a temp file first so readers never see a partial clip
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with wave.open(temp_path, 'wb') as handle:
+            handle.setnchannels(1)
+            handle.setsampwidth(2)
+            handle.setframerate(self.sample_rate)
+            handle.writeframes(samples.tobytes())
+        os.replace(temp_path, path)
@@ -0,0 +1,44 @@
+"""
+Upstream HTTP - Shared wrapper for calls to external APIs
+"""
+import time
+import requests
+from services.cassette import get_cassette
+from utils.metrics import UPSTREAM_REQUESTS, UPSTREAM_LATENCY
+from utils.tracing import span
+
+
+def send(service, method, url, **kwargs):
+    """
+    Send an HTTP request to an upstream API, recording its status, latency and trace span
+
+    With UPSTREAM_CASSETTE_MODE=record the exchange is also written to the
+    cassette; with replay the recorded response is served instead.
+
+    Args:
+        service (str): Upstream name used in metrics (e.g. "perplexity")
+        method (str): HTTP method
+        url (str): Request URL
+        **kwargs: Passed through to requests
+
+    Returns:
+        requests.Response: Upstream response
+    """
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        with span(f'upstream_{service}') as current:
+            cassette = get_cassette()
+            if cassette is not None and cassette.mode == 'replay':
+                response = cassette.replay(service, method, url, kwargs)
+            else:
+                response = getattr(requests, method.lower())(url, **kwargs)
+                if cassette is not None:
+                    cassette.record(service, method, url, kwargs, response, time.perf_counter() - start)
+            status = str(response.status_code)
+            if current is not None:
+                current.attributes['status'] = status
+        return response
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, service=service)
+        UPSTREAM_REQUESTS.inc(service=service, status=status)
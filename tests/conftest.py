@@ -0,0 +1,10 @@
+"""
+Shared pytest setup
+"""
+import os
+import sys
+
+# Tests import the app's packages directly, as the app does when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PERPLEXITY_API_KEY', 'pplx-test')
+os.environ.setdefault('LOG_SAMPLE_RATE', '0')
@@ -0,0 +1,79 @@
+"""
+Tests for the change log feed
+"""
+import threading
+import time
+
+from utils.change_log import ChangeLog
+
+
+def fill(log, count):
+    for i in range(count):
+        log.append('track.created', str(i), {'n': i})
+
+
+def test_since_returns_events_after_the_sequence_number():
+    log = ChangeLog(capacity=10)
+    fill(log, 5)
+
+    result = log.since(2)
+
+    assert [change['seq'] for change in result['changes']] == [3, 4, 5]
+    assert result['latest'] == 5
+    assert not result['reset']
+    assert log.since(5)['changes'] == []
+
+
+def test_limit_pages_through_events():
+    log = ChangeLog(capacity=10)
+    fill(log, 5)
+
+    first = log.since(0, limit=2)
+    second = log.since(first['changes'][-1]['seq'], limit=2)
+
+    assert [change['seq'] for change in first['changes']] == [1, 2]
+    assert [change['seq'] for change in second['changes']] == [3, 4]
+
+
+def test_falling_behind_the_buffer_asks_for_a_reset():
+    log = ChangeLog(capacity=3)
+    fill(log, 6)
+
+    # Events 1-3 were dropped; a client at 3 can still catch up, one at 2 cannot
+    assert [change['seq'] for change in log.since(3)['changes']] == [4, 5, 6]
+    assert log.since(2)['reset']
+
+
+def test_sequence_from_the_future_asks_for_a_reset():
+    log = ChangeLog(capacity=3)
+    fill(log, 2)
+    # e.g. the client remembers a sequence from before a server restart
+    assert log.since(10)['reset']
+
+
+def test_empty_log():
+    log = ChangeLog()
+    assert log.since(0) == {'changes': [], 'latest': 0, 'reset': False}
+
+
+def test_wait_wakes_on_append():
+    log = ChangeLog()
+    fill(log, 1)
+
+    def later():
+        time.sleep(0.05)
+        log.append('playlist.updated', 'p1', {'op': 'rename'})
+
+    threading.Thread(target=later).start()
+    started = time.monotonic()
+    result = log.wait(1, timeout=2)
+
+    assert time.monotonic() - started < 1
+    assert [change['type'] for change in result['changes']] == ['playlist.updated']
+
+
+def test_wait_times_out_with_no_changes():
+    log = ChangeLog()
+    fill(log, 1)
+    result = log.wait(1, timeout=0.05)
+    assert result['changes'] == [] and not result['reset']
@@ -0,0 +1,80 @@
+"""
+Tests for the idempotency key store
+"""
+import threading
+
+import pytest
+
+from utils import idempotency as idempotency_module
+from utils.idempotency import IdempotencyStore, IdempotencyKeyMismatch
+
+
+def test_first_request_owns_the_key_and_later_ones_replay():
+    store = IdempotencyStore()
+    entry, owner = store.begin('k', 'body')
+    assert owner
+
+    store.complete('k', entry, ('{}', 200, 'application/json'))
+    again, owner = store.begin('k', 'body')
+
+    assert not owner
+    assert store.wait(again, 1) == ('{}', 200, 'application/json')
+
+
+def test_reusing_a_key_with_another_payload_is_rejected():
+    store = IdempotencyStore()
+    store.begin('k', 'body')
+    with pytest.raises(IdempotencyKeyMismatch):
+        store.begin('k', 'other body')
+
+
+def test_duplicate_waits_for_the_owner():
+    store = IdempotencyStore()
+    entry, _ = store.begin('k', 'body')
+    duplicate, owner = store.begin('k', 'body')
+    assert not owner
+    assert store.wait(duplicate, 0.01) is None
+
+    threading.Timer(0.05, store.complete, args=('k', entry, 'response')).start()
+    assert store.wait(duplicate, 2) == 'response'
+
+
+def test_released_key_runs_again():
+    store = IdempotencyStore()
+    entry, _ = store.begin('k', 'body')
+    waiter, _ = store.begin('k', 'body')
+
+    store.complete('k', entry, 'server error', keep=False)
+
+    # Whoever was waiting still gets the failure, but the next retry owns the key
+    assert store.wait(waiter, 1) == 'server error'
+    _, owner = store.begin('k', 'body')
+    assert owner
+
+
+def test_completed_keys_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(idempotency_module.time, 'time', lambda: now[0])
+    store = IdempotencyStore(ttl=60)
+    entry, _ = store.begin('k', 'body')
+    store.complete('k', entry, 'response')
+
+    now[0] += 61
+    _, owner = store.begin('k', 'other body')
+    assert owner
+
+
+def test_in_flight_keys_are_never_dropped():
+    store = IdempotencyStore(max_entries=2)
+    running, _ = store.begin('running', 'body')
+    for i in range(5):
+        entry, _ = store.begin(str(i), 'body')
+        store.complete(str(i), entry, 'response')
+
+    _, owner = store.begin('running', 'body')
+    assert not owner
+
+    # Once it finishes, the oldest completed keys are trimmed back to the limit
+    store.complete('running', running, 'response')
+    store.begin('new', 'body')
+    assert len(store) <= 3
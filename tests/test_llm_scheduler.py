@@ -0,0 +1,121 @@
+"""
+Tests for the fair-share LLM scheduler
+"""
+import threading
+import time
+
+import pytest
+
+from services.llm_scheduler import LLMScheduler, SchedulerTimeout
+
+WEIGHTS = {'interactive': 8, 'batch': 2, 'prewarm': 1}
+
+
+def make_scheduler(**kwargs):
+    options = {'max_concurrency': 1, 'weights': WEIGHTS, 'reserved': 0, 'queue_timeout': 5}
+    options.update(kwargs)
+    return LLMScheduler(**options)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.001)
+
+
+def queue_call(scheduler, priority, tenant, granted):
+    """Start acquire() in a thread and wait until it is queued; grants are appended to `granted`"""
+    queued_before = scheduler._queues[priority].queued
+
+    def run():
+        scheduler.acquire(priority, tenant)
+        granted.append((priority, tenant))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    wait_until(lambda: scheduler._queues[priority].queued > queued_before or (priority, tenant) in granted)
+    return thread
+
+
+def test_reserved_slot_is_kept_for_interactive_calls():
+    scheduler = make_scheduler(max_concurrency=2, reserved=1)
+    granted = []
+    scheduler.acquire('batch', 'bulk')
+
+    # The only unreserved slot is taken, so a second batch call has to wait
+    waiting_batch = queue_call(scheduler, 'batch', 'bulk', granted)
+    assert granted == []
+
+    # ...while an interactive call still gets the reserved slot immediately
+    scheduler.acquire('interactive', 'user')
+    assert scheduler.in_flight == 2
+
+    scheduler.release('interactive')
+    time.sleep(0.05)
+    assert granted == [], 'batch must not take the reserved slot'
+
+    scheduler.release('batch')
+    waiting_batch.join(2)
+    assert granted == [('batch', 'bulk')]
+
+
+def test_batch_is_not_starved_by_queued_interactive_calls():
+    scheduler = make_scheduler()
+    granted = []
+    scheduler.acquire('interactive', 'holder')
+    threads = [queue_call(scheduler, 'interactive', f'user{i}', granted) for i in range(12)]
+    threads.append(queue_call(scheduler, 'batch', 'bulk', granted))
+
+    for _ in range(len(threads)):
+        count = len(granted)
+        scheduler.release(granted[-1][0] if granted else 'interactive')
+        wait_until(lambda: len(granted) > count)
+
+    order = [priority for priority, _ in granted]
+    # With weights 8:2 the batch call goes out within the first few grants, not last
+    assert order.index('batch') < 8
+
+
+def test_queue_timeout_cancels_the_waiter():
+    scheduler = make_scheduler(queue_timeout=0.05)
+    scheduler.acquire('interactive', 'holder')
+
+    with pytest.raises(SchedulerTimeout):
+        scheduler.acquire('batch', 'bulk')
+    assert scheduler._queues['batch'].queued == 0
+
+    # The cancelled waiter must not be handed the freed slot
+    scheduler.release('interactive')
+    assert scheduler.in_flight == 0
+    assert scheduler.acquire('batch', 'bulk') < 0.05
+    assert scheduler.in_flight == 1
+
+
+def test_tenants_in_a_class_share_it_equally():
+    scheduler = make_scheduler()
+    granted = []
+    scheduler.acquire('batch', 'holder')
+    threads = [queue_call(scheduler, 'batch', 'big', granted) for _ in range(4)]
+    threads += [queue_call(scheduler, 'batch', 'small', granted) for _ in range(2)]
+
+    for _ in range(len(threads)):
+        count = len(granted)
+        scheduler.release('batch')
+        wait_until(lambda: len(granted) > count)
+
+    assert [tenant for _, tenant in granted] == ['big', 'small', 'big', 'small', 'big', 'big']
+
+
+def test_configure_starts_calls_the_new_limits_admit():
+    scheduler = make_scheduler(max_concurrency=2, reserved=1)
+    granted = []
+    scheduler.acquire('batch', 'bulk')
+    waiting = queue_call(scheduler, 'batch', 'bulk', granted)
+    assert granted == []
+
+    scheduler.configure(reserved=0)
+    waiting.join(2)
+    assert granted == [('batch', 'bulk')]
+    assert scheduler.in_flight == 2
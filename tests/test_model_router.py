@@ -0,0 +1,72 @@
+"""
+Tests for latency-aware model routing
+"""
+from collections import Counter
+
+from services.model_router import ModelRouter, model_request, requested_model
+
+MODELS = ['sonar', 'sonar-pro', 'sonar-reasoning']
+COSTS = {'sonar': 1, 'sonar-reasoning': 2, 'sonar-pro': 3}
+
+
+def make_router(**kwargs):
+    options = {'enabled': True, 'costs': COSTS, 'targets': {'interactive': 10}, 'window': 300,
+               'min_samples': 5, 'max_error_rate': 0.25, 'probe_every': 0}
+    options.update(kwargs)
+    return ModelRouter(MODELS, 'sonar-pro', **options)
+
+
+def feed(router, model, latency, ok=True, count=10):
+    for _ in range(count):
+        router.record(model, latency, ok)
+
+
+def test_default_model_is_used_until_there_are_stats():
+    router = make_router()
+    assert Counter(router.choose() for _ in range(50)) == {'sonar-pro': 50}
+
+
+def test_cheapest_model_with_stats_that_fits_wins():
+    router = make_router()
+    feed(router, 'sonar-pro', 3.0)
+    feed(router, 'sonar', 4.0)
+    assert router.choose() == 'sonar'
+
+    # A slow cheap model loses to the default once its p90 misses the target
+    feed(router, 'sonar', 20.0, count=50)
+    assert router.choose() == 'sonar-pro'
+
+
+def test_failing_models_are_skipped():
+    router = make_router()
+    feed(router, 'sonar-pro', 3.0)
+    feed(router, 'sonar', 4.0, ok=False)
+    assert router.choose() == 'sonar-pro'
+
+
+def test_probes_try_models_without_stats():
+    router = make_router(probe_every=10)
+    feed(router, 'sonar-pro', 3.0)
+    picks = Counter(router.choose() for _ in range(100))
+    assert picks == {'sonar-pro': 90, 'sonar': 10}
+
+
+def test_probes_skip_calls_with_a_deadline():
+    router = make_router(probe_every=1)
+    with model_request(deadline=float('inf')):
+        assert router.choose() == 'sonar-pro'
+
+
+def test_override_wins_and_is_visible():
+    router = make_router()
+    assert requested_model() is None
+    with model_request(model='sonar-reasoning'):
+        assert requested_model() == 'sonar-reasoning'
+        assert router.choose() == 'sonar-reasoning'
+    assert requested_model() is None
+
+
+def test_disabled_router_always_uses_default():
+    router = make_router(enabled=False)
+    feed(router, 'sonar', 1.0)
+    assert router.choose() == 'sonar-pro'
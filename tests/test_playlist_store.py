@@ -0,0 +1,116 @@
+"""
+Tests for the copy-on-write playlist store
+"""
+import threading
+
+import pytest
+
+from utils.playlist_store import PlaylistStore, PlaylistConflict
+
+
+def make_store():
+    store = PlaylistStore(stripes=4)
+    store.put('p1', {'id': 'p1', 'name': 'Mix', 'tracks': ['a'], 'created_at': 1.0, 'updated_at': 1.0})
+    return store
+
+
+def add_track(track_id):
+    def mutate(playlist):
+        playlist['tracks'].append(track_id)
+        return True
+    return mutate
+
+
+def test_update_swaps_in_a_new_snapshot():
+    store = make_store()
+    before = store['p1']
+
+    after, changed = store.update('p1', add_track('b'))
+
+    assert changed
+    assert after['tracks'] == ['a', 'b']
+    assert after['updated_at'] > before['updated_at']
+    # Readers holding the old snapshot never see the change
+    assert before['tracks'] == ['a']
+    assert store['p1'] is after
+
+
+def test_stale_expected_version_raises_conflict():
+    store = make_store()
+    store.update('p1', add_track('b'))
+
+    with pytest.raises(PlaylistConflict) as error:
+        store.update('p1', add_track('c'), expected_updated_at=1.0)
+
+    assert error.value.current['tracks'] == ['a', 'b']
+    assert store['p1']['tracks'] == ['a', 'b']
+
+
+def test_matching_expected_version_applies():
+    store = make_store()
+    after, changed = store.update('p1', add_track('b'), expected_updated_at=1.0)
+    assert changed and after['tracks'] == ['a', 'b']
+
+
+def test_no_change_keeps_version_and_skips_commit():
+    store = make_store()
+    commits = []
+
+    after, changed = store.update('p1', lambda playlist: False, on_commit=commits.append)
+
+    assert not changed
+    assert after['updated_at'] == 1.0
+    assert commits == []
+
+
+def test_missing_playlist():
+    store = make_store()
+    assert store.update('nope', add_track('b')) == (None, False)
+    assert store.pop('nope', 'gone') == 'gone'
+
+
+def test_versions_stay_distinct_within_one_clock_tick():
+    store = make_store()
+    versions = {store.update('p1', add_track(str(i)))[0]['updated_at'] for i in range(100)}
+    assert len(versions) == 100
+
+
+def test_concurrent_compare_and_set_has_one_winner_per_version():
+    store = make_store()
+    version = store['p1']['updated_at']
+    barrier = threading.Barrier(8)
+    results = []
+
+    def writer(i):
+        barrier.wait()
+        try:
+            store.update('p1', add_track(f't{i}'), expected_updated_at=version)
+            results.append('ok')
+        except PlaylistConflict:
+            results.append('conflict')
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count('ok') == 1
+    assert results.count('conflict') == 7
+    assert len(store['p1']['tracks']) == 2
+
+
+def test_concurrent_updates_are_not_lost():
+    store = make_store()
+
+    def writer(i):
+        for j in range(50):
+            store.update('p1', add_track(f'{i}-{j}'))
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store['p1']['tracks']) == 1 + 4 * 50
@@ -0,0 +1,60 @@
+"""
+Tests for the token-bucket rate limiter
+"""
+from utils import rate_limiter as rate_limiter_module
+from utils.rate_limiter import MemoryBackend, RateLimiter
+
+
+def limiter(max_keys=100000, **budgets):
+    return RateLimiter(budgets or {'generate': '2/60', 'read': '10/1'}, MemoryBackend(max_keys))
+
+
+def test_bucket_empties_and_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, 'monotonic', lambda: now[0])
+    rl = limiter()
+
+    assert rl.check('generate', 'ip:a').allowed
+    assert rl.check('generate', 'ip:a').allowed
+    rejected = rl.check('generate', 'ip:a')
+    assert not rejected.allowed
+    assert rejected.retry_after == 30
+
+    now[0] += 30
+    assert rl.check('generate', 'ip:a').allowed
+
+
+def test_clients_and_budgets_have_separate_buckets():
+    rl = limiter()
+    rl.check('generate', 'ip:a')
+    rl.check('generate', 'ip:a')
+
+    assert not rl.check('generate', 'ip:a').allowed
+    assert rl.check('generate', 'ip:b').allowed
+    assert rl.check('read', 'ip:a').allowed
+
+
+def test_listed_api_keys_get_their_own_bucket():
+    rl = RateLimiter({'read': '1/1'}, MemoryBackend(), api_keys=['secret'])
+
+    assert rl.client_id('secret', '10.0.0.1') != rl.client_id(None, '10.0.0.1')
+    assert rl.client_id('invented', '10.0.0.1') == 'ip:10.0.0.1'
+    assert 'secret' not in rl.client_id('secret', '10.0.0.1')
+
+
+def test_pruning_keeps_buckets_of_longer_budgets(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, 'monotonic', lambda: now[0])
+    rl = limiter(max_keys=3)
+    rl.check('generate', 'ip:a')
+    rl.check('generate', 'ip:a')
+    rl.check('read', 'ip:b')
+    rl.check('read', 'ip:c')
+
+    # Past the read window but well inside the generate window: a new read
+    # bucket prunes the idle read buckets, not a's half-refilled generate one
+    now[0] += 5
+    rl.check('read', 'ip:d')
+
+    assert len(rl.backend) == 2
+    assert not rl.check('generate', 'ip:a').allowed
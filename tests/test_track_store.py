@@ -0,0 +1,104 @@
+"""
+Tests for the spilling track store
+"""
+import json
+
+import pytest
+
+from utils.track_record import TrackRecord
+from utils.track_store import TrackStore
+
+
+def make_record(i):
+    return TrackRecord(
+        title=f'Track {i}', language='English', genre='Pop', mood='happy', style='bright synth pop',
+        lyrics='la ' * 200, duration='1-2 minutes', audio_url=f'/api/audio/synth/{i:020x}.wav',
+        audio_format='wav', audio_engine='synth', keyword=f'word{i}', timestamp='2025-01-01T00:00:00Z',
+        model='perplexity'
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrackStore(max_tracks=3, max_bytes=0, max_age=0, spill_dir=str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_least_recently_used_tracks_spill_and_fault_back(store):
+    for i in range(5):
+        store.put(str(i), make_record(i))
+
+    assert len(store) == 5
+    assert store.resident_count == 3
+    assert store.spilled_count == 2
+
+    # The two oldest were spilled; reading one brings it back with the same data
+    record = store.get('0')
+    assert record.to_dict() == make_record(0).to_dict()
+    assert store.resident_count == 3
+    assert store.spilled_count == 2
+
+
+def test_get_without_promote_leaves_residency_alone(store):
+    for i in range(5):
+        store.put(str(i), make_record(i))
+
+    assert store.get('0', promote=False).title == 'Track 0'
+    assert store.spilled_count == 2
+    assert [track_id for track_id, _ in store.items()] == ['0', '1', '2', '3', '4']
+
+
+def test_pinned_tracks_are_never_spilled(store):
+    store.put('a', make_record(1))
+    store.put('b', make_record(2))
+    store.pin(['a', 'b'])
+
+    for i in range(10):
+        store.put(str(i), make_record(i))
+
+    assert store.get('a', promote=False) is not None
+    assert 'a' in store._pinned and 'b' in store._pinned
+    # Pins don't count against the LRU: the other tracks fill what is left
+    assert store.resident_count == 3
+
+
+def test_pins_are_counted(store):
+    store.put('a', make_record(1))
+    store.pin(['a'])
+    store.pin(['a'])
+
+    store.unpin(['a'])
+    assert 'a' in store._pinned
+
+    store.unpin(['a'])
+    assert 'a' not in store._pinned
+    for i in range(5):
+        store.put(str(i), make_record(i))
+    assert store.spilled_count == 3
+
+
+def test_pinning_a_spilled_track_faults_it_in(store):
+    for i in range(5):
+        store.put(str(i), make_record(i))
+
+    store.pin(['0'])
+    assert '0' in store._pinned
+    assert store.get('0', promote=False).keyword == 'word0'
+
+
+def test_duplicate_ids_are_rejected_or_skipped(store):
+    store.put('a', make_record(1))
+    with pytest.raises(KeyError):
+        store.put('a', make_record(2))
+
+    assert store.put_many([('a', make_record(3)), ('b', make_record(4))]) == ['b']
+    assert store.get('a').title == 'Track 1'
+
+
+def test_items_json_matches_records(store):
+    for i in range(5):
+        store.put(str(i), make_record(i))
+
+    for track_id, text in store.items_json():
+        assert json.loads(text) == make_record(int(track_id)).to_dict()
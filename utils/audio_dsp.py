@@ -0,0 +1,155 @@
+"""
+Audio DSP - Decoding, loudness normalization and crossfading helpers
+
+Kept free of application imports so these functions can run cheaply in
+worker processes.
+"""
+import shutil
+import struct
+import subprocess
+import wave
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; mix rendering is disabled without it
+    np = None
+
+
+def decode_audio(path, sample_rate):
+    """
+    Decode an audio file to mono float32 samples at the given rate
+
+    WAV is decoded natively; other formats need ffmpeg on the PATH.
+
+    Args:
+        path (str): Audio file
+        sample_rate (int): Output sample rate in Hz
+
+    Returns:
+        numpy.ndarray: Samples in [-1, 1]
+    """
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as handle:
+            channels = handle.getnchannels()
+            width = handle.getsampwidth()
+            rate = handle.getframerate()
+            frames = handle.readframes(handle.getnframes())
+        if width != 2:
+            raise ValueError(f'Unsupported WAV sample width: {width * 8} bits')
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != sample_rate:
+            samples = resample(samples, rate, sample_rate)
+        return samples
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise RuntimeError(f'ffmpeg is required to decode {path}')
+    result = subprocess.run(
+        [ffmpeg, '-v', 'error', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), '-'],
+        capture_output=True,
+        check=True
+    )
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def resample(samples, source_rate, target_rate):
+    """Linear-interpolation resampling (adequate for previews)"""
+    if samples.size == 0 or source_rate == target_rate:
+        return samples
+    duration = samples.size / source_rate
+    target_size = int(duration * target_rate)
+    positions = np.linspace(0, samples.size - 1, target_size)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def normalize_loudness(samples, target_dbfs=-16.0, peak_ceiling=0.95):
+    """
+    Scale samples to a target RMS level without exceeding the peak ceiling
+
+    Args:
+        samples (numpy.ndarray): Input samples
+        target_dbfs (float): Target RMS level in dBFS
+        peak_ceiling (float): Maximum absolute sample value after gain
+
+    Returns:
+        numpy.ndarray: Normalized samples
+    """
+    if samples.size == 0:
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    if rms < 1e-6:
+        return samples
+    gain = 10 ** (target_dbfs / 20) / rms
+    peak = float(np.abs(samples).max()) * gain
+    if peak > peak_ceiling:
+        gain *= peak_ceiling / peak
+    return (samples * gain).astype(np.float32)
+
+
+def prepare_segment(path, sample_rate, target_dbfs):
+    """
+    Decode and loudness-normalize one track (runs in a worker process)
+
+    Returns:
+        numpy.ndarray: Normalized float32 samples
+    """
+    return normalize_loudness(decode_audio(path, sample_rate), target_dbfs)
+
+
+def crossfade_stream(segments, crossfade_samples):
+    """
+    Join segments with equal-power crossfades, yielding output as soon as it is final
+
+    Args:
+        segments (iterable): float32 sample arrays in play order
+        crossfade_samples (int): Overlap length between consecutive segments
+
+    Yields:
+        numpy.ndarray: Output sample blocks
+    """
+    pending = None
+    for segment in segments:
+        if segment.size == 0:
+            continue
+        if pending is None:
+            overlap = min(crossfade_samples, segment.size // 2)
+            yield segment[:segment.size - overlap]
+            pending = segment[segment.size - overlap:]
+            continue
+
+        overlap = min(pending.size, segment.size // 2)
+        if overlap:
+            curve = np.linspace(0, np.pi / 2, overlap, dtype=np.float32)
+            blended = pending[pending.size - overlap:] * np.cos(curve) + segment[:overlap] * np.sin(curve)
+            yield np.concatenate([pending[:pending.size - overlap], blended])
+        else:
+            yield pending
+
+        tail = min(crossfade_samples, (segment.size - overlap) // 2)
+        yield segment[overlap:segment.size - tail]
+        pending = segment[segment.size - tail:]
+
+    if pending is not None and pending.size:
+        yield pending
+
+
+def to_pcm16(samples):
+    """Convert float samples to little-endian 16-bit PCM bytes"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
+def wav_header(sample_rate, data_size=0xFFFFFFFF - 36, channels=1):
+    """
+    Build a 44-byte PCM WAV header
+
+    The default data size marks the length as unknown, which players
+    accept for streamed output.
+    """
+    byte_rate = sample_rate * channels * 2
+    return b''.join([
+        b'RIFF', struct.pack('<I', min(data_size + 36, 0xFFFFFFFF)), b'WAVE',
+        b'fmt ', struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, byte_rate, channels * 2, 16),
+        b'data', struct.pack('<I', min(data_size, 0xFFFFFFFF))
+    ])
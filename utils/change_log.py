@@ -0,0 +1,98 @@
+"""
+Change Log - Bounded, sequence-numbered feed of store mutations
+"""
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+
+class ChangeLog:
+    """
+    Ring buffer of change events with monotonically increasing sequence numbers.
+
+    Clients remember the last sequence number they saw and ask for
+    everything after it. If they fall further behind than the buffer
+    holds, they are told to reset and reload full collections.
+    """
+
+    def __init__(self, capacity=10000):
+        """
+        Initialize log
+
+        Args:
+            capacity (int): Events retained
+        """
+        self.capacity = capacity
+        self._events = deque(maxlen=capacity)
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def latest(self):
+        return self._seq
+
+    def append(self, event_type, entity_id, data):
+        """
+        Record a change and wake waiting subscribers
+
+        Args:
+            event_type (str): e.g. 'track.created', 'playlist.updated'
+            entity_id (str): Track or playlist identifier
+            data (dict): Delta payload
+
+        Returns:
+            int: Sequence number assigned to the event
+        """
+        with self._condition:
+            self._seq += 1
+            self._events.append({
+                'seq': self._seq,
+                'type': event_type,
+                'id': entity_id,
+                'at': time.time(),
+                'data': data
+            })
+            self._condition.notify_all()
+            return self._seq
+
+    def since(self, seq, limit=None):
+        """
+        Get events after a sequence number
+
+        Args:
+            seq (int): Last sequence number the client has seen (0 for none)
+            limit (int): Maximum events to return
+
+        Returns:
+            dict: {'changes': [...], 'latest': int, 'reset': bool}; reset is
+                  True when events after seq were already discarded
+        """
+        with self._condition:
+            return self._since(seq, limit)
+
+    def _since(self, seq, limit):
+        oldest = self._events[0]['seq'] if self._events else self._seq + 1
+        if seq < oldest - 1 or seq > self._seq:
+            return {'changes': [], 'latest': self._seq, 'reset': True}
+        # Sequence numbers are contiguous, so the start position is arithmetic
+        start = seq - oldest + 1
+        end = len(self._events) if limit is None else min(len(self._events), start + limit)
+        changes = list(islice(self._events, start, end))
+        return {'changes': changes, 'latest': self._seq, 'reset': False}
+
+    def wait(self, seq, timeout=None, limit=None):
+        """
+        Block until there are events after seq, or the timeout passes
+
+        Args:
+            seq (int): Last sequence number the client has seen
+            timeout (float): Seconds to wait
+            limit (int): Maximum events to return
+
+        Returns:
+            dict: Same shape as since(); changes is empty on timeout
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq != seq, timeout)
+            return self._since(seq, limit)
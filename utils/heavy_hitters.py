@@ -0,0 +1,89 @@
+"""
+Heavy Hitters - Fixed-memory tracking of the most frequent keys
+"""
+import heapq
+import itertools
+import threading
+
+
+class SpaceSaving:
+    """
+    Streaming top-k counter using the SpaceSaving algorithm.
+
+    At most `capacity` keys are tracked. When a new key arrives and the
+    table is full, the key with the smallest count is replaced and the new
+    key inherits that count (recorded as its error bound), so memory stays
+    fixed no matter how many distinct keys are seen.
+
+    The minimum is found with a lazy min-heap holding one entry per key.
+    Increments don't touch the heap; an entry whose count is stale is only
+    refreshed when it surfaces at the top during an eviction, so adds cost
+    O(log capacity) amortized instead of a scan of every key.
+    """
+
+    def __init__(self, capacity=1000):
+        """
+        Initialize the sketch
+
+        Args:
+            capacity (int): Maximum number of keys tracked
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}  # key -> [count, error]
+        self._heap = []  # (count when pushed, sequence, key); counts only grow, so entries may lag
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, key, weight=1):
+        """
+        Record an occurrence of a key
+
+        Args:
+            key (hashable): Key to count
+            weight (int): Number of occurrences to add
+        """
+        with self._lock:
+            self.total += weight
+            entry = self._counts.get(key)
+            if entry is not None:
+                entry[0] += weight
+                return
+
+            min_count = 0
+            if len(self._counts) >= self.capacity:
+                # Replace the current minimum; the newcomer inherits its count
+                min_count = self._pop_min()
+            self._counts[key] = [min_count + weight, min_count]
+            heapq.heappush(self._heap, (min_count + weight, next(self._sequence), key))
+
+    def _pop_min(self):
+        """Remove the key with the smallest count and return its count (caller holds the lock)"""
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            current = self._counts[key][0]
+            if current == count:
+                # Every other entry's true count is at least its heap count, so this is a minimum
+                del self._counts[key]
+                return count
+            heapq.heappush(self._heap, (current, next(self._sequence), key))
+
+    def top(self, k=10):
+        """
+        Get the k most frequent keys
+
+        Args:
+            k (int): Number of keys to return
+
+        Returns:
+            list: Tuples of (key, count, error), highest count first
+        """
+        with self._lock:
+            items = [(key, c[0], c[1]) for key, c in self._counts.items()]
+        items.sort(key=lambda item: item[1], reverse=True)
+        return items[:k]
+
+    def __len__(self):
+        return len(self._counts)
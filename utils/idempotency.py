@@ -0,0 +1,124 @@
+"""
+Idempotency Store - Remembers the first response for each Idempotency-Key
+"""
+import threading
+import time
+from collections import OrderedDict
+from utils.metrics import Counter
+
+IDEMPOTENCY_REQUESTS = Counter(
+    'beatify_idempotency_requests_total',
+    'Requests carrying an Idempotency-Key, by outcome',
+    ['result']
+)
+
+
+class IdempotencyKeyMismatch(Exception):
+    """Raised when a key is reused with a different request payload"""
+
+
+class _Entry:
+    __slots__ = ('fingerprint', 'created_at', 'response', 'done')
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.created_at = time.time()
+        self.response = None
+        self.done = threading.Event()
+
+
+class IdempotencyStore:
+    """
+    Maps idempotency keys to the response of the first request that used them.
+
+    The first request with a key becomes its owner and runs normally; any
+    request with the same key that arrives while it is running waits for it,
+    and later ones get the stored response until the key expires. Owners
+    that fail in a retryable way release the key instead of storing the
+    failure, so the next retry runs again.
+    """
+
+    def __init__(self, ttl=86400, max_entries=10000):
+        """
+        Initialize store
+
+        Args:
+            ttl (float): Seconds a key is remembered after first use
+            max_entries (int): Completed keys kept before the oldest are forgotten
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> _Entry, oldest first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin(self, key, fingerprint):
+        """
+        Claim a key or find the request that already claimed it
+
+        Args:
+            key (str): Idempotency key
+            fingerprint (str): Digest of the request payload
+
+        Returns:
+            tuple: (entry, True if the caller owns the key and must run the request)
+
+        Raises:
+            IdempotencyKeyMismatch: The key was used with a different payload
+        """
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    raise IdempotencyKeyMismatch(f'Idempotency-Key {key!r} was used with a different request')
+                return entry, False
+            entry = self._entries[key] = _Entry(fingerprint)
+            return entry, True
+
+    def complete(self, key, entry, response, keep=True):
+        """
+        Publish the owner's response and wake waiting duplicates
+
+        Args:
+            key (str): Idempotency key
+            entry: Entry returned by begin()
+            response (object): Response to replay
+            keep (bool): Remember the response for later retries; False
+                         releases the key so the next retry runs again
+        """
+        with self._lock:
+            entry.response = response
+            if not keep and self._entries.get(key) is entry:
+                del self._entries[key]
+            entry.done.set()
+
+    @staticmethod
+    def wait(entry, timeout):
+        """
+        Wait for a key's owner to finish
+
+        Args:
+            entry: Entry returned by begin()
+            timeout (float): Seconds to wait
+
+        Returns:
+            object: The owner's response, or None on timeout
+        """
+        if not entry.done.wait(timeout):
+            return None
+        return entry.response
+
+    def _expire(self):
+        """Forget expired and excess completed keys (caller holds the lock)"""
+        cutoff = time.time() - self.ttl
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            # In-flight keys are never dropped, or a duplicate could start a second run
+            if not entry.done.is_set():
+                break
+            if entry.created_at >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
@@ -1,41 +1,183 @@
 """
 Logger Configuration - Setup application logging
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+from config.settings import LOGGING_CONFIG
+from utils.metrics import LOG_RECORDS_DROPPED
+from utils.tracing import current_trace
+
+_listener = None
+_queue = None
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks or formats on the calling thread.
+
+    Records are handed to the background listener as-is (formatting happens
+    there) and dropped, not waited on, when the queue is full.
+    """
+
+    def prepare(self, record):
+        # The queue is in-process, so skip the eager format/pickling prep.
+        # Tracebacks are rendered now so frames aren't kept alive in the queue.
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO-and-below records, per message template"""
+
+    def __init__(self, default_rate=1.0, rates=None):
+        """
+        Initialize filter
+
+        Args:
+            default_rate (float): Fraction of records kept when no rule matches
+            rates (dict): Message template prefix -> fraction kept
+        """
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = rates or {}
+        self._cache = {}  # template -> rate
+
+    def _rate_for(self, template):
+        rate = self._cache.get(template)
+        if rate is None:
+            rate = self.default_rate
+            for prefix, prefix_rate in self.rates.items():
+                if template.startswith(prefix):
+                    rate = prefix_rate
+                    break
+            if len(self._cache) < 10000:
+                self._cache[template] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        # record.msg is the unformatted template, so it identifies the message type
+        rate = self._rate_for(str(record.msg))
+        return rate >= 1.0 or random.random() < rate
+
+
+class TraceContextFilter(logging.Filter):
+    """Attach the active request trace ID to each record"""
+
+    def filter(self, record):
+        trace = current_trace()
+        record.trace_id = trace.trace_id if trace is not None else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if getattr(record, 'trace_id', None):
+            entry['trace_id'] = record.trace_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def parse_sample_rates(value):
+    """
+    Parse "prefix=rate,prefix=rate" into a dict
+
+    Args:
+        value (str): Sampling rules
+
+    Returns:
+        dict: Message template prefix -> rate
+    """
+    rates = {}
+    for rule in filter(None, (part.strip() for part in value.split(','))):
+        prefix, _, rate = rule.rpartition('=')
+        try:
+            rates[prefix.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def _get_queue():
+    """Create the shared log queue and its background writer on first use"""
+    global _listener, _queue
+    if _queue is None:
+        _queue = queue.Queue(maxsize=LOGGING_CONFIG['queue_size'])
+
+        console_handler = logging.StreamHandler(sys.stdout)
+        if LOGGING_CONFIG['format'] == 'json':
+            console_handler.setFormatter(JsonFormatter())
+        else:
+            console_handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+
+        _listener = logging.handlers.QueueListener(_queue, console_handler)
+        _listener.start()
+        # Flush whatever is still queued on shutdown
+        atexit.register(_listener.stop)
+    return _queue
+
 
 def setup_logger(name='beatify', level=logging.INFO):
     """
     Setup and configure logger
-    
+
+    Records are queued on the calling thread and written to stdout by a
+    background listener, so slow stdout never stalls request threads.
+
     Args:
         name (str): Logger name
         level (int): Logging level
-        
+
     Returns:
         logging.Logger: Configured logger
     """
-    
+
     logger = logging.getLogger(name)
-    
+
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(level)
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    
-    # Formatter with colors
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+
+    queue_handler = NonBlockingQueueHandler(_get_queue())
+    queue_handler.setLevel(level)
+    queue_handler.addFilter(SamplingFilter(
+        LOGGING_CONFIG['sample_rate'],
+        parse_sample_rates(LOGGING_CONFIG['sample_rates'])
+    ))
+    queue_handler.addFilter(TraceContextFilter())
+
+    logger.addHandler(queue_handler)
+
+    return logger
@@ -0,0 +1,286 @@
+"""
+Metrics - Lightweight Prometheus-compatible counters, gauges and histograms
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers in-process stages (sub-millisecond) up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding name, help text and label names"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.metric_type}'
+        ]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+    def _samples(self):
+        return []
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    metric_type = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        """
+        Increment the counter
+
+        Args:
+            amount (float): Amount to add
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at scrape time"""
+
+    metric_type = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function, **labels):
+        """
+        Read the gauge value from a callback at scrape time
+
+        Args:
+            function (callable): Zero-argument callable returning a number
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def _samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        """
+        Record an observation
+
+        Args:
+            value (float): Observed value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the wrapped block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return sum(state[:-1]) if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}'
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(state[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} already registered')
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """
+        Render all metrics in Prometheus text exposition format
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+# Shared application metrics
+HTTP_REQUESTS = Counter(
+    'beatify_http_requests_total',
+    'HTTP requests by route, method and status',
+    ['route', 'method', 'status']
+)
+HTTP_ERRORS = Counter(
+    'beatify_http_errors_total',
+    'HTTP responses with status >= 400 by route and status',
+    ['route', 'status']
+)
+HTTP_LATENCY = Histogram(
+    'beatify_http_request_duration_seconds',
+    'HTTP request latency by route',
+    ['route']
+)
+STAGE_LATENCY = Histogram(
+    'beatify_generate_stage_duration_seconds',
+    'Latency of each music generation stage',
+    ['stage']
+)
+UPSTREAM_REQUESTS = Counter(
+    'beatify_upstream_requests_total',
+    'Upstream API calls by service and status code',
+    ['service', 'status']
+)
+UPSTREAM_LATENCY = Histogram(
+    'beatify_upstream_request_duration_seconds',
+    'Upstream API call latency by service',
+    ['service']
+)
+GENERATION_CACHE = Counter(
+    'beatify_generation_cache_total',
+    'Generation cache lookups by result',
+    ['result']
+)
+STORE_SIZE = Gauge(
+    'beatify_store_entries',
+    'Number of entries held in each in-memory store',
+    ['store']
+)
+STORE_BYTES = Gauge(
+    'beatify_store_resident_bytes',
+    'Approximate bytes held in memory by each store',
+    ['store']
+)
+LOG_RECORDS_DROPPED = Counter(
+    'beatify_log_records_dropped_total',
+    'Log records dropped because the log queue was full'
+)
@@ -0,0 +1,124 @@
+"""
+Playlist Store - Lock-striped playlist storage with copy-on-write updates
+"""
+import threading
+import time
+import zlib
+
+
+class PlaylistConflict(Exception):
+    """Raised when a compare-and-set finds the playlist changed since it was read"""
+
+    def __init__(self, current):
+        super().__init__(f"Playlist {current['id']} was modified (updated_at {current['updated_at']})")
+        self.current = current
+
+
+class PlaylistStore:
+    """
+    Thread-safe playlist storage.
+
+    Stored playlist dicts are treated as immutable snapshots: every update
+    copies the playlist, applies the change and swaps the new dict in, so
+    readers never need a lock and never see a half-applied change. Writers
+    take one of a fixed set of striped locks chosen by playlist id, so
+    updates to different playlists rarely contend. Each successful update
+    gets a strictly increasing updated_at, which doubles as a version for
+    compare-and-set.
+    """
+
+    def __init__(self, stripes=64):
+        """
+        Initialize store
+
+        Args:
+            stripes (int): Number of writer locks
+        """
+        self._playlists = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _lock_for(self, playlist_id):
+        return self._locks[zlib.crc32(str(playlist_id).encode('utf-8')) % len(self._locks)]
+
+    @staticmethod
+    def _next_timestamp(previous):
+        # Strictly increasing so two updates in the same clock tick stay distinguishable
+        return max(time.time(), previous + 1e-6)
+
+    def __len__(self):
+        return len(self._playlists)
+
+    def __contains__(self, playlist_id):
+        return playlist_id in self._playlists
+
+    def __getitem__(self, playlist_id):
+        return self._playlists[playlist_id]
+
+    def __setitem__(self, playlist_id, playlist):
+        self.put(playlist_id, playlist)
+
+    def get(self, playlist_id, default=None):
+        return self._playlists.get(playlist_id, default)
+
+    def items(self):
+        return list(self._playlists.items())
+
+    def put(self, playlist_id, playlist, on_commit=None):
+        """
+        Store a playlist
+
+        Args:
+            playlist_id (str): Playlist identifier
+            playlist (dict): Playlist data
+            on_commit (callable): Called with the playlist while the lock is
+                                  held, so observers see changes in order
+        """
+        with self._lock_for(playlist_id):
+            self._playlists[playlist_id] = playlist
+            if on_commit:
+                on_commit(playlist)
+
+    def update(self, playlist_id, mutate, expected_updated_at=None, on_commit=None):
+        """
+        Atomically apply a change to a playlist
+
+        Args:
+            playlist_id (str): Playlist identifier
+            mutate (callable): Receives a private copy of the playlist (with
+                               its own tracks list), edits it in place and
+                               returns True if anything changed
+            expected_updated_at (float): If set, fail unless the stored
+                                         playlist still has this updated_at
+            on_commit (callable): Called with the new playlist, under the
+                                  lock, only if it changed
+
+        Returns:
+            tuple: (playlist after the call, whether it changed), or (None, False) if not found
+
+        Raises:
+            PlaylistConflict: expected_updated_at no longer matches
+        """
+        with self._lock_for(playlist_id):
+            current = self._playlists.get(playlist_id)
+            if current is None:
+                return None, False
+            if expected_updated_at is not None and current['updated_at'] != expected_updated_at:
+                raise PlaylistConflict(current)
+            draft = dict(current)
+            draft['tracks'] = list(current['tracks'])
+            if not mutate(draft):
+                return current, False
+            draft['updated_at'] = self._next_timestamp(current['updated_at'])
+            self._playlists[playlist_id] = draft
+            if on_commit:
+                on_commit(draft)
+            return draft, True
+
+    def pop(self, playlist_id, default=None, on_commit=None):
+        with self._lock_for(playlist_id):
+            playlist = self._playlists.pop(playlist_id, None)
+            if playlist is None:
+                return default
+            if on_commit:
+                on_commit(playlist)
+            return playlist
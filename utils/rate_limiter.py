@@ -0,0 +1,331 @@
+"""
+Rate Limiter - Per-client token buckets with in-process or Redis state
+"""
+import hashlib
+import math
+import threading
+import time
+from flask import current_app, g, jsonify, request
+from utils.metrics import Counter
+from utils.logger import setup_logger
+
+try:
+    import redis
+except ImportError:  # Optional dependency; only needed for RATE_LIMIT_BACKEND=redis
+    redis = None
+
+logger = setup_logger()
+
+RATE_LIMITED = Counter(
+    'beatify_rate_limited_total',
+    'Requests rejected by the rate limiter, by budget',
+    ['budget']
+)
+RATE_LIMIT_BACKEND_ERRORS = Counter(
+    'beatify_rate_limit_backend_errors_total',
+    'Shared rate limit backend failures (requests are allowed through)'
+)
+
+
+class Budget:
+    """A token bucket shape: `capacity` requests at once, refilled over `window` seconds"""
+
+    __slots__ = ('name', 'capacity', 'window', 'rate')
+
+    def __init__(self, name, capacity, window):
+        self.name = name
+        self.capacity = capacity
+        self.window = window
+        self.rate = capacity / window  # tokens per second
+
+    @classmethod
+    def parse(cls, name, spec):
+        """
+        Parse a "requests/seconds" budget, e.g. "10/60"
+
+        Args:
+            name (str): Budget name
+            spec (str): Budget specification
+
+        Returns:
+            Budget: Parsed budget
+        """
+        capacity, _, window = spec.partition('/')
+        capacity, window = int(capacity), float(window or 1)
+        if capacity <= 0 or window <= 0:
+            raise ValueError(f'Invalid rate limit budget {name}={spec!r}')
+        return cls(name, capacity, window)
+
+
+class Decision:
+    """Outcome of one rate limit check"""
+
+    __slots__ = ('allowed', 'budget', 'tokens', 'cost')
+
+    def __init__(self, allowed, budget, tokens, cost):
+        self.allowed = allowed
+        self.budget = budget
+        self.tokens = tokens
+        self.cost = cost
+
+    @property
+    def retry_after(self):
+        """Seconds until the request would be allowed"""
+        return max(1, math.ceil((self.cost - self.tokens) / self.budget.rate))
+
+    def headers(self):
+        """RateLimit-* response headers (IETF draft), plus Retry-After when rejected"""
+        budget = self.budget
+        headers = {
+            'RateLimit-Limit': str(budget.capacity),
+            'RateLimit-Remaining': str(max(0, math.floor(self.tokens))),
+            'RateLimit-Reset': str(math.ceil((budget.capacity - self.tokens) / budget.rate)),
+            'RateLimit-Policy': f'{budget.capacity};w={budget.window:g}'
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after)
+        return headers
+
+
+class MemoryBackend:
+    """Token buckets in a dict; correct for a single process only"""
+
+    def __init__(self, max_keys=100000):
+        """
+        Initialize backend
+
+        Args:
+            max_keys (int): Buckets kept before idle ones are pruned
+        """
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> [tokens, updated, window]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, budget, cost=1):
+        """
+        Refill a bucket for the time elapsed and take `cost` tokens if available
+
+        Args:
+            key (str): Bucket key
+            budget (Budget): Bucket shape
+            cost (int): Tokens the request needs
+
+        Returns:
+            tuple: (allowed, tokens left)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                tokens = budget.capacity
+                bucket = self._buckets[key] = [tokens, now, budget.window]
+            else:
+                tokens = min(budget.capacity, bucket[0] + (now - bucket[1]) * budget.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            bucket[0], bucket[1] = tokens, now
+            return allowed, tokens
+
+    def _prune(self, now):
+        """Drop buckets idle long enough to be full again (caller holds the lock)"""
+        # A bucket refills within its own budget's window, so anything idle that
+        # long is full and indistinguishable from a missing bucket; the request
+        # being charged may use a shorter window than the buckets it prunes
+        idle = [key for key, (_, updated, window) in self._buckets.items() if now - updated >= window]
+        for key in idle:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            # Still full of active clients: forget the least recently seen half
+            stale = sorted(self._buckets, key=lambda key: self._buckets[key][1])
+            for key in stale[:len(stale) // 2]:
+                del self._buckets[key]
+
+
+class RedisBackend:
+    """
+    Token buckets in Redis, shared by every worker process.
+
+    The refill-and-take step runs as a Lua script, so it is atomic across
+    workers and costs one round trip per request. Redis's own clock is
+    used so workers with skewed clocks agree. If Redis is unreachable,
+    requests are allowed through rather than failing the API.
+    """
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + (now - tonumber(bucket[2])) * rate)
+end
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url, prefix='beatify:ratelimit:'):
+        """
+        Initialize backend
+
+        Args:
+            url (str): Redis URL
+            prefix (str): Key prefix
+        """
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def take(self, key, budget, cost=1):
+        try:
+            allowed, tokens = self._script(keys=[self.prefix + key], args=[budget.capacity, budget.rate, cost])
+            return bool(allowed), float(tokens)
+        except redis.RedisError as e:
+            RATE_LIMIT_BACKEND_ERRORS.inc()
+            logger.warning('Rate limit backend unavailable, allowing request: %s', e)
+            return True, float(budget.capacity)
+
+
+class RateLimiter:
+    """Checks requests against named budgets, one bucket per (budget, client)"""
+
+    def __init__(self, budgets, backend, api_keys=()):
+        """
+        Initialize limiter
+
+        Args:
+            budgets (dict): Budget name -> "requests/seconds" spec
+            backend: MemoryBackend or RedisBackend
+            api_keys (iterable): API keys that get their own buckets; other
+                                 callers are limited by IP address, so a
+                                 client can't dodge its limit by inventing keys
+        """
+        self.budgets = {name: Budget.parse(name, spec) for name, spec in budgets.items()}
+        self.backend = backend
+        self._api_keys = {key: hashlib.sha256(key.encode('utf-8')).hexdigest()[:16] for key in api_keys}
+
+    def client_id(self, api_key, address):
+        """
+        Identify the caller
+
+        Args:
+            api_key (str): X-API-Key header value, if any
+            address (str): Client IP address
+
+        Returns:
+            str: Bucket identity (API keys are hashed, never stored raw)
+        """
+        digest = self._api_keys.get(api_key) if api_key else None
+        return f'key:{digest}' if digest else f'ip:{address}'
+
+    def check(self, budget_name, client, cost=1):
+        """
+        Take tokens for a request
+
+        Args:
+            budget_name (str): Budget to charge
+            client (str): Identity from client_id()
+            cost (int): Tokens the request needs
+
+        Returns:
+            Decision: Whether the request may proceed, with header values
+        """
+        budget = self.budgets[budget_name]
+        allowed, tokens = self.backend.take(f'{budget_name}:{client}', budget, cost)
+        if not allowed:
+            RATE_LIMITED.inc(budget=budget_name)
+        return Decision(allowed, budget, tokens, cost)
+
+
+def rate_limit_budget(name, deferred=False):
+    """
+    Mark a view as charged against a named budget (views default to "read")
+
+    Args:
+        name (str): Budget name
+        deferred (bool): Charge only "read" before the view runs; the view
+                         calls charge() once it knows the request does the
+                         expensive work (e.g. not a cache hit or a replay)
+    """
+    def mark(view):
+        view.rate_limit_budget = name
+        view.rate_limit_deferred = deferred
+        return view
+    return mark
+
+
+def charge(budget_name=None, cost=1):
+    """
+    Charge the current request against a budget from inside a view
+
+    Args:
+        budget_name (str): Budget to charge (default: the view's own budget)
+        cost (int): Tokens the request needs
+
+    Returns:
+        Decision: Outcome (also used for the response headers), or None
+                  when rate limiting is disabled
+    """
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None or 'client_id' not in g:
+        return None
+    if budget_name is None:
+        view = current_app.view_functions.get(request.endpoint)
+        budget_name = getattr(view, 'rate_limit_budget', 'read')
+    decision = g.rate_limit = limiter.check(budget_name, g.client_id, cost)
+    return decision
+
+
+def too_many_requests(decision):
+    """
+    Build the 429 response for a rejected decision
+
+    Args:
+        decision (Decision): Rejected decision
+
+    Returns:
+        tuple: (response, 429)
+    """
+    return jsonify({
+        'success': False,
+        'error': 'Rate limit exceeded',
+        'budget': decision.budget.name,
+        'retry_after': decision.retry_after
+    }), 429
+
+
+def create_rate_limiter(config):
+    """
+    Build the limiter described by RATE_LIMIT_CONFIG
+
+    Args:
+        config (dict): Rate limit settings
+
+    Returns:
+        RateLimiter: Configured limiter, or None when rate limiting is disabled
+    """
+    if not config['enabled']:
+        return None
+    backend = None
+    if config['backend'] == 'redis':
+        if redis is None:
+            logger.error('RATE_LIMIT_BACKEND=redis but the redis package is not installed; limiting per process')
+        else:
+            backend = RedisBackend(config['redis_url'])
+    return RateLimiter(config['budgets'], backend or MemoryBackend(config['max_keys']), config['api_keys'])
@@ -0,0 +1,208 @@
+"""
+Search Index - Incremental inverted index with BM25 ranking
+"""
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; scoring falls back to pure Python
+    np = None
+
+# Scripts written without spaces are indexed as overlapping character bigrams
+_UNSEGMENTED = (
+    '\u0e00-\u0e7f'  # Thai
+    '\u3040-\u30ff'  # Hiragana, Katakana
+    '\u3400-\u4dbf'  # CJK Extension A
+    '\u4e00-\u9fff'  # CJK Unified Ideographs
+    '\uac00-\ud7af'  # Hangul syllables
+)
+# Indic vowel signs and viramas are combining marks, not word characters
+_INDIC = '\u0900-\u0963\u0966-\u0dff'
+_TOKEN_RE = re.compile(rf'[{_UNSEGMENTED}]+|(?:[^\W_{_UNSEGMENTED}]|[{_INDIC}])+', re.UNICODE)
+_UNSEGMENTED_RE = re.compile(rf'[{_UNSEGMENTED}]')
+
+# Field -> weight applied to term frequency and document length
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'keyword': 2.0,
+    'style': 1.0,
+    'lyrics': 1.0
+}
+
+
+def tokenize(text):
+    """
+    Split text into normalized search terms
+
+    Text is NFKC-normalized, case-folded and stripped of accents. Runs of
+    Thai, Japanese, Chinese or Korean characters become overlapping
+    character bigrams so queries match without a word segmenter.
+
+    Args:
+        text (str): Text in any language
+
+    Returns:
+        list: Terms in order of appearance
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKC', str(text)).casefold()
+    terms = []
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group()
+        if _UNSEGMENTED_RE.match(token):
+            if len(token) == 1:
+                terms.append(token)
+            else:
+                terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+            continue
+        # Fold Latin accents (café -> cafe); marks in Indic scripts carry meaning
+        folded = ''.join(
+            ch for ch in unicodedata.normalize('NFD', token)
+            if not unicodedata.combining(ch)
+        )
+        terms.append(folded if folded.isascii() else token)
+    return terms
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over track text fields.
+
+    Each term maps to parallel posting arrays of internal document numbers
+    and field-weighted term frequencies. Documents only ever get appended,
+    so posting lists stay sorted and adding a track touches only its own
+    terms.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        """
+        Initialize index
+
+        Args:
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 document-length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> (array of doc numbers, array of weighted tf)
+        self._doc_ids = []  # doc number -> track id
+        self._doc_numbers = {}  # track id -> doc number
+        self._doc_lengths = array('f')
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def add(self, track_id, fields):
+        """
+        Index a document
+
+        Args:
+            track_id (str): Track identifier
+            fields (dict): Field name -> text; unknown fields are ignored
+        """
+        frequencies = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(fields.get(field)):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+
+        with self._lock:
+            if track_id in self._doc_numbers:
+                return
+            doc = len(self._doc_ids)
+            self._doc_ids.append(track_id)
+            self._doc_numbers[track_id] = doc
+            self._doc_lengths.append(length)
+            self._total_length += length
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array('I'), array('f'))
+                postings[0].append(doc)
+                postings[1].append(frequency)
+
+    def search(self, query, limit=20):
+        """
+        Rank documents against a query with BM25
+
+        Args:
+            query (str): Free-text query
+            limit (int): Maximum number of results
+
+        Returns:
+            tuple: (list of (track_id, score) best first, number of matching documents)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            count = len(self._doc_ids)
+            if not terms or not count:
+                return [], 0
+            average_length = self._total_length / count or 1.0
+            matched = [(self._postings[t], self._idf(len(self._postings[t][0]), count))
+                       for t in terms if t in self._postings]
+            if not matched:
+                return [], 0
+            if np is not None:
+                ranked, total = self._score_numpy(matched, average_length, limit)
+            else:
+                ranked, total = self._score_python(matched, average_length, limit)
+            return [(self._doc_ids[doc], score) for doc, score in ranked], total
+
+    @staticmethod
+    def _idf(document_frequency, count):
+        return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _score_numpy(self, matched, average_length, limit):
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.float32)
+        views = []
+        try:
+            scale = np.float32(self.b / average_length)
+            # Long posting lists: normalizing every length once beats gathering per term
+            dense = sum(len(docs) for (docs, _), _ in matched) > lengths.size // 4
+            norms = self.k1 * (1 - self.b + lengths * scale) if dense else None
+            totals = np.zeros(lengths.size, dtype=np.float32) if len(matched) > 1 else None
+            for (docs, frequencies), idf in matched:
+                docs = np.frombuffer(docs, dtype=np.uint32)
+                frequencies = np.frombuffer(frequencies, dtype=np.float32)
+                views.extend((docs, frequencies))
+                norm = norms[docs] if dense else self.k1 * (1 - self.b + lengths[docs] * scale)
+                scores = np.float32(idf * (self.k1 + 1)) * frequencies / (frequencies + norm)
+                if totals is not None:
+                    # Doc numbers are unique within a posting list, so this is a plain scatter-add
+                    totals[docs] += scores
+
+            if totals is None:
+                total = int(docs.size)
+                top = np.argpartition(-scores, limit - 1)[:limit] if total > limit else np.arange(total)
+            else:
+                # Rank the dense totals directly; compacting to matches first costs more
+                docs = None
+                scores = totals
+                total = int(np.count_nonzero(totals))
+                top = np.argpartition(-totals, limit - 1)[:limit] if total > limit else np.flatnonzero(totals)
+            top = top[np.argsort(-scores[top], kind='stable')]
+            if docs is None:
+                return [(int(i), float(scores[i])) for i in top], total
+            return [(int(docs[i]), float(scores[i])) for i in top], total
+        finally:
+            # Release buffer views so the arrays can keep growing
+            del lengths, views, docs, frequencies
+
+    def _score_python(self, matched, average_length, limit):
+        lengths = self._doc_lengths
+        scores = {}
+        for (docs, frequencies), idf in matched:
+            for doc, frequency in zip(docs, frequencies):
+                norm = self.k1 * (1 - self.b + self.b * lengths[doc] / average_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return top, len(scores)
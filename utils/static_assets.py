@@ -0,0 +1,182 @@
+"""
+Static Assets - Fingerprinted, precompressed frontend files served from memory
+
+Can also be run as a build step to write the same files to disk for a CDN
+or reverse proxy:
+
+    python -m utils.static_assets dist
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import threading
+
+try:
+    import brotli
+except ImportError:  # Optional dependency; gzip is used alone without it
+    brotli = None
+
+# Files referenced from index.html that get content-hashed names
+FINGERPRINTED = ('script.js', 'styles.css')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+class Asset:
+    """One servable file with its precompressed variants"""
+
+    __slots__ = ('body', 'encoded', 'etag', 'mimetype', 'cache_control')
+
+    def __init__(self, body, mimetype, cache_control):
+        self.body = body
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        self.encoded = {}  # content-encoding -> bytes, only when smaller than the original
+        if mimetype.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.encoded['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.encoded['br'] = compressed
+
+
+class StaticAssets:
+    """
+    In-memory frontend bundle.
+
+    script.js and styles.css are published under content-hashed names
+    (script.<hash>.js) with a one-year immutable Cache-Control, and
+    index.html is rewritten to reference them. index.html and files under
+    their original names are served with no-cache so browsers revalidate
+    with the ETag and get a 304 when nothing changed.
+    """
+
+    def __init__(self, root, reload=False):
+        """
+        Build the bundle
+
+        Args:
+            root (str): Frontend directory
+            reload (bool): Rebuild when a source file changes (development)
+        """
+        self.root = os.path.abspath(root)
+        self.reload = reload
+        self.assets = {}
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self.build()
+
+    def _source_files(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                yield os.path.relpath(path, self.root).replace(os.sep, '/'), path
+
+    def build(self):
+        """Read, fingerprint and compress every file under the root"""
+        sources, mtimes = {}, {}
+        for name, path in self._source_files():
+            with open(path, 'rb') as handle:
+                sources[name] = handle.read()
+            mtimes[name] = os.path.getmtime(path)
+
+        assets, renames = {}, {}
+        for name, body in sources.items():
+            mimetype = self._mimetype(name)
+            if name in FINGERPRINTED:
+                stem, extension = os.path.splitext(name)
+                hashed = f'{stem}.{hashlib.sha256(body).hexdigest()[:10]}{extension}'
+                renames[name] = hashed
+                assets[hashed] = Asset(body, mimetype, IMMUTABLE_CACHE)
+            if name != 'index.html':
+                assets[name] = Asset(body, mimetype, REVALIDATE_CACHE)
+
+        if 'index.html' in sources:
+            html = sources['index.html'].decode('utf-8')
+            for name, hashed in renames.items():
+                html = re.sub(rf'''((?:src|href)=["'])(?:\./)?{re.escape(name)}(["'])''', rf'\g<1>{hashed}\g<2>', html)
+            assets['index.html'] = Asset(html.encode('utf-8'), 'text/html; charset=utf-8', REVALIDATE_CACHE)
+
+        self.assets = assets
+        self._mtimes = mtimes
+
+    @staticmethod
+    def _mimetype(name):
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/') or mimetype == 'application/javascript':
+            mimetype += '; charset=utf-8'
+        return mimetype
+
+    def _changed(self):
+        current = {name: os.path.getmtime(path) for name, path in self._source_files()}
+        return current != self._mtimes
+
+    def get(self, name):
+        """
+        Look up an asset by URL path
+
+        Args:
+            name (str): Path relative to the site root
+
+        Returns:
+            Asset: The asset, or None if there is no such file
+        """
+        if self.reload:
+            with self._lock:
+                if self._changed():
+                    self.build()
+        return self.assets.get(name)
+
+    def write(self, out_dir):
+        """
+        Write every asset and its compressed variants to a directory
+
+        Args:
+            out_dir (str): Output directory
+
+        Returns:
+            int: Number of files written
+        """
+        written = 0
+        for name, asset in self.assets.items():
+            path = os.path.join(out_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            variants = {'': asset.body, '.gz': asset.encoded.get('gzip'), '.br': asset.encoded.get('br')}
+            for suffix, body in variants.items():
+                if body is None:
+                    continue
+                with open(path + suffix, 'wb') as handle:
+                    handle.write(body)
+                written += 1
+        return written
+
+
+def negotiate(asset, accept_encoding):
+    """
+    Pick the smallest variant the client accepts
+
+    Args:
+        asset (Asset): Asset to serve
+        accept_encoding (werkzeug.datastructures.Accept): Parsed Accept-Encoding
+
+    Returns:
+        tuple: (content encoding or None, body)
+    """
+    for encoding in ('br', 'gzip'):
+        if encoding in asset.encoded and accept_encoding[encoding]:
+            return encoding, asset.encoded[encoding]
+    return None, asset.body
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, 'dist')
+    bundle = StaticAssets(os.path.join(project_root, 'frontend'))
+    print(f"Wrote {bundle.write(out)} files to {out}")
@@ -0,0 +1,207 @@
+"""
+Tracing - Per-request trace IDs, timed spans and Server-Timing output
+"""
+import contextvars
+import functools
+import json
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+_current_trace = contextvars.ContextVar('beatify_trace', default=None)
+_exporters = []
+_TRACE_ID_PATTERN = re.compile(r'^[A-Za-z0-9\-]{8,64}$')
+
+
+class Span:
+    """A named, timed section of a trace"""
+
+    __slots__ = ('name', 'start', 'duration', 'attributes')
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = None
+        self.attributes = attributes or {}
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.start
+
+
+class Trace:
+    """Spans recorded while handling one request"""
+
+    def __init__(self, trace_id=None, name='request'):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans = []
+
+    def start_span(self, name, **attributes):
+        """
+        Open a span that is closed by calling its end() method
+
+        Args:
+            name (str): Span name
+            **attributes: Extra data stored with the span
+
+        Returns:
+            Span: The open span
+        """
+        span = Span(name, attributes)
+        self.spans.append(span)
+        return span
+
+    def server_timing(self):
+        """
+        Build a Server-Timing header value, summing spans with the same name
+
+        Returns:
+            str: Header value (durations in milliseconds)
+        """
+        totals = {}
+        for span in self.spans:
+            if span.duration is None:
+                continue
+            total, count = totals.get(span.name, (0.0, 0))
+            totals[span.name] = (total + span.duration, count + 1)
+
+        entries = []
+        for name, (total, count) in totals.items():
+            entry = f'{name};dur={total * 1000:.2f}'
+            if count > 1:
+                entry += f';desc="{count} calls"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+    def to_dict(self):
+        """
+        Serialize the trace as a structured record
+
+        Returns:
+            dict: Trace record with span offsets and durations in milliseconds
+        """
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'timestamp': self.started_at,
+            'spans': [
+                {
+                    'name': span.name,
+                    'offset_ms': round((span.start - self.origin) * 1000, 3),
+                    'duration_ms': round((span.duration or 0) * 1000, 3),
+                    **({'attributes': span.attributes} if span.attributes else {})
+                }
+                for span in self.spans
+            ]
+        }
+
+
+def clean_trace_id(value):
+    """
+    Accept a caller-supplied trace ID only if it is safe to echo back
+
+    Args:
+        value (str): Incoming header value (X-Trace-Id or W3C traceparent)
+
+    Returns:
+        str: Trace ID or None
+    """
+    if not value:
+        return None
+    # W3C traceparent: version-traceid-parentid-flags
+    parts = value.split('-')
+    if len(parts) == 4 and len(parts[1]) == 32:
+        value = parts[1]
+    return value if _TRACE_ID_PATTERN.match(value) else None
+
+
+def start_trace(trace_id=None, name='request'):
+    """
+    Start a trace for the current context
+
+    Args:
+        trace_id (str): Optional trace ID to reuse
+        name (str): Trace name (e.g. the route)
+
+    Returns:
+        Trace: The new active trace
+    """
+    trace = Trace(trace_id, name)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def end_trace():
+    """
+    Detach the active trace from the context and export it
+
+    Returns:
+        Trace: The finished trace or None
+    """
+    trace = _current_trace.get()
+    _current_trace.set(None)
+    if trace is not None:
+        for exporter in list(_exporters):
+            try:
+                exporter(trace)
+            except Exception:
+                pass
+    return trace
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time the wrapped block as a span of the active trace (no-op without one)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.start_span(name, **attributes)
+    try:
+        yield current
+    finally:
+        current.end()
+
+
+def traced(name):
+    """Decorator recording each call of the function as a span"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_exporter(exporter):
+    """
+    Register a callable that receives every finished trace
+
+    Args:
+        exporter (callable): Function taking a Trace
+    """
+    _exporters.append(exporter)
+
+
+class JsonLinesExporter:
+    """Append finished traces to a local file, one JSON record per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, trace):
+        line = json.dumps(trace.to_dict(), separators=(',', ':'))
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as handle:
+                handle.write(line + '\n')
@@ -0,0 +1,116 @@
+"""
+Track Record - Compact in-memory representation of a stored track
+"""
+import sys
+import zlib
+from config.settings import TRACK_STORE_CONFIG
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class TrackRecord:
+    """
+    Slotted replacement for the nested track/metadata dicts.
+
+    Low-cardinality fields (genre, mood, language, ...) are interned so
+    every record shares one copy of each string. Lyrics longer than the
+    configured threshold are kept zlib-compressed and inflated on read.
+    to_dict() rebuilds exactly the shape returned by prepare_json plus
+    the audio fields, so API responses are unchanged.
+    """
+
+    __slots__ = (
+        'title', 'language', 'genre', 'mood', 'style', '_lyrics', 'duration',
+        'audio_url', 'audio_format', 'audio_engine', 'keyword', 'timestamp', 'model'
+    )
+
+    def __init__(self, title, language, genre, mood, style, lyrics, duration,
+                 audio_url, audio_format, audio_engine, keyword, timestamp, model):
+        self.title = title
+        self.language = _intern(language)
+        self.genre = _intern(genre)
+        self.mood = _intern(mood)
+        self.style = style
+        self.lyrics = lyrics
+        self.duration = _intern(duration)
+        self.audio_url = audio_url
+        self.audio_format = _intern(audio_format)
+        self.audio_engine = _intern(audio_engine)
+        self.keyword = keyword
+        self.timestamp = timestamp
+        self.model = _intern(model)
+
+    @property
+    def lyrics(self):
+        if isinstance(self._lyrics, bytes):
+            return zlib.decompress(self._lyrics).decode('utf-8')
+        return self._lyrics
+
+    @lyrics.setter
+    def lyrics(self, value):
+        if isinstance(value, str):
+            encoded = value.encode('utf-8')
+            if len(encoded) >= TRACK_STORE_CONFIG['compress_lyrics_min_bytes']:
+                compressed = zlib.compress(encoded)
+                if len(compressed) < len(encoded):
+                    self._lyrics = compressed
+                    return
+        self._lyrics = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from prepared track data
+
+        Args:
+            data (dict): {'track': {...}, 'metadata': {...}} as stored by the controller
+
+        Returns:
+            TrackRecord: Compact record
+        """
+        track = data['track']
+        metadata = data['metadata']
+        return cls(
+            title=track.get('title'),
+            language=track.get('language'),
+            genre=track.get('genre'),
+            mood=track.get('mood'),
+            style=track.get('style'),
+            lyrics=track.get('lyrics'),
+            duration=track.get('duration'),
+            audio_url=track.get('audio_url'),
+            audio_format=track.get('audio_format'),
+            audio_engine=track.get('audio_engine'),
+            keyword=metadata.get('keyword'),
+            timestamp=metadata.get('timestamp'),
+            model=metadata.get('model')
+        )
+
+    def to_dict(self):
+        """
+        Rebuild the nested dict shape used in API responses
+
+        Returns:
+            dict: {'track': {...}, 'metadata': {...}}
+        """
+        return {
+            'track': {
+                'title': self.title,
+                'language': self.language,
+                'genre': self.genre,
+                'mood': self.mood,
+                'style': self.style,
+                'lyrics': self.lyrics,
+                'duration': self.duration,
+                'audio_url': self.audio_url,
+                'audio_format': self.audio_format,
+                'audio_engine': self.audio_engine
+            },
+            'metadata': {
+                'keyword': self.keyword,
+                'timestamp': self.timestamp,
+                'model': self.model
+            }
+        }
@@ -0,0 +1,318 @@
+"""
+Track Store - Bounded in-memory track storage that spills to disk
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from config.settings import TRACK_STORE_CONFIG
+from utils.track_record import TrackRecord
+from utils.metrics import Counter
+
+TRACK_STORE_EVICTIONS = Counter(
+    'beatify_track_store_evictions_total',
+    'Tracks spilled from memory to disk, by the limit that triggered it',
+    ['reason']
+)
+TRACK_STORE_FAULTS = Counter(
+    'beatify_track_store_faults_total',
+    'Spilled tracks read back from disk'
+)
+
+# Record fields that are not interned and so count against the byte budget
+_OWNED_FIELDS = ('title', 'style', '_lyrics', 'audio_url', 'keyword', 'timestamp')
+
+
+def record_size(record):
+    """Approximate bytes held by a record and the strings it owns"""
+    return sys.getsizeof(record) + sum(
+        sys.getsizeof(getattr(record, field)) for field in _OWNED_FIELDS
+        if getattr(record, field) is not None
+    )
+
+
+class TrackStore:
+    """
+    Dict-like track store with count, byte and idle-age limits.
+
+    Resident records are kept in LRU order. When a limit is exceeded the
+    least recently used records are written to an append-only segment file
+    and dropped from memory; get() faults them back in transparently.
+    Records are immutable, so a track is written to the segment at most
+    once. Pinned tracks (those in a playlist) are kept out of the LRU and
+    are never spilled.
+    """
+
+    def __init__(self, max_tracks=None, max_bytes=None, max_age=None, spill_dir=None):
+        """
+        Initialize store
+
+        Args:
+            max_tracks (int): Resident tracks before spilling (0 = unlimited)
+            max_bytes (int): Approximate resident bytes before spilling (0 = unlimited)
+            max_age (float): Seconds since last access before spilling (0 = never)
+            spill_dir (str): Directory for the segment file
+        """
+        self.max_tracks = TRACK_STORE_CONFIG['max_tracks'] if max_tracks is None else max_tracks
+        self.max_bytes = TRACK_STORE_CONFIG['max_bytes'] if max_bytes is None else max_bytes
+        self.max_age = TRACK_STORE_CONFIG['max_age'] if max_age is None else max_age
+        self.spill_dir = os.path.abspath(spill_dir or TRACK_STORE_CONFIG['spill_dir'])
+
+        self._index = {}  # track id -> segment (offset, length), or None while only in memory; insertion ordered
+        self._lru = OrderedDict()  # track id -> [record, size, last access], least recently used first
+        self._pinned = {}  # track id -> [record, size, pin count]
+        self.resident_bytes = 0
+        self._lock = threading.RLock()
+        self._segment = None
+        self._segment_path = os.path.join(self.spill_dir, f'tracks-{os.getpid()}-{id(self):x}.seg')
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, track_id):
+        return track_id in self._index
+
+    def __setitem__(self, track_id, record):
+        self.put(track_id, record)
+
+    @property
+    def resident_count(self):
+        return len(self._lru) + len(self._pinned)
+
+    @property
+    def spilled_count(self):
+        return len(self._index) - self.resident_count
+
+    def put(self, track_id, record):
+        """
+        Add a new track
+
+        Args:
+            track_id (str): Track identifier
+            record (TrackRecord): Track data
+        """
+        size = record_size(record)
+        with self._lock:
+            if track_id in self._index:
+                raise KeyError(f'Track {track_id} already stored')
+            self._index[track_id] = None
+            self._lru[track_id] = [record, size, time.time()]
+            self.resident_bytes += size
+            self._enforce(keep=track_id)
+
+    def put_many(self, items):
+        """
+        Add a batch of new tracks under one lock acquisition
+
+        Tracks whose id is already stored are skipped. Limits are enforced
+        once for the whole batch, so a large import spills in one pass
+        instead of after every insert.
+
+        Args:
+            items (list): (track id, TrackRecord) pairs
+
+        Returns:
+            list: Ids that were added
+        """
+        sized = [(track_id, record, record_size(record)) for track_id, record in items]
+        added = []
+        with self._lock:
+            now = time.time()
+            for track_id, record, size in sized:
+                if track_id in self._index:
+                    continue
+                self._index[track_id] = None
+                self._lru[track_id] = [record, size, now]
+                self.resident_bytes += size
+                added.append(track_id)
+            self._enforce()
+        return added
+
+    def get(self, track_id, default=None, promote=True):
+        """
+        Get a track, reading it back from disk if it was spilled
+
+        Args:
+            track_id (str): Track identifier
+            default: Value returned for unknown tracks
+            promote (bool): Mark the track as recently used and keep a
+                            faulted-in track resident; pass False for scans
+                            that should not disturb the hot set
+
+        Returns:
+            TrackRecord: Track data or default
+        """
+        with self._lock:
+            if track_id not in self._index:
+                return default
+            pinned = self._pinned.get(track_id)
+            if pinned:
+                return pinned[0]
+            entry = self._lru.get(track_id)
+            if entry:
+                if promote:
+                    entry[2] = time.time()
+                    self._lru.move_to_end(track_id)
+                    self._enforce(keep=track_id)
+                return entry[0]
+
+            record = self._read(track_id)
+            if promote:
+                TRACK_STORE_FAULTS.inc()
+                self._make_resident(track_id, record)
+                self._enforce(keep=track_id)
+            return record
+
+    def items(self):
+        """
+        Iterate (track id, record) in insertion order without changing residency
+
+        Yields:
+            tuple: (track id, TrackRecord)
+        """
+        with self._lock:
+            track_ids = list(self._index)
+        for track_id in track_ids:
+            record = self.get(track_id, promote=False)
+            if record is not None:
+                yield track_id, record
+
+    def items_json(self):
+        """
+        Iterate (track id, JSON of record.to_dict()) without changing residency
+
+        Spilled tracks are emitted straight from their stored JSON instead
+        of being decoded into records and encoded again, which makes full
+        scans (exports) of a mostly spilled store several times cheaper.
+
+        Yields:
+            tuple: (track id, JSON object text)
+        """
+        with self._lock:
+            track_ids = list(self._index)
+        for track_id in track_ids:
+            with self._lock:
+                entry = self._pinned.get(track_id) or self._lru.get(track_id)
+                if entry:
+                    record, payload = entry[0], None
+                else:
+                    record, payload = None, self._read_payload(track_id)
+            if record is not None:
+                yield track_id, json.dumps(record.to_dict(), ensure_ascii=False, separators=(',', ':'))
+            else:
+                yield track_id, zlib.decompress(payload).decode('utf-8')
+
+    def pin(self, track_ids):
+        """
+        Keep tracks resident until unpinned (pins are counted)
+
+        Args:
+            track_ids (list): Track identifiers; unknown ones are ignored
+        """
+        with self._lock:
+            for track_id in track_ids:
+                if track_id not in self._index:
+                    continue
+                pinned = self._pinned.get(track_id)
+                if pinned:
+                    pinned[2] += 1
+                    continue
+                entry = self._lru.pop(track_id, None)
+                if entry:
+                    self._pinned[track_id] = [entry[0], entry[1], 1]
+                else:
+                    TRACK_STORE_FAULTS.inc()
+                    self._make_resident(track_id, self._read(track_id))
+                    entry = self._lru.pop(track_id)
+                    self._pinned[track_id] = [entry[0], entry[1], 1]
+            self._enforce()
+
+    def unpin(self, track_ids):
+        """
+        Release pins; a track with no pins left becomes evictable again
+
+        Args:
+            track_ids (list): Track identifiers
+        """
+        with self._lock:
+            for track_id in track_ids:
+                pinned = self._pinned.get(track_id)
+                if not pinned:
+                    continue
+                pinned[2] -= 1
+                if pinned[2] <= 0:
+                    del self._pinned[track_id]
+                    self._lru[track_id] = [pinned[0], pinned[1], time.time()]
+            self._enforce()
+
+    def _make_resident(self, track_id, record):
+        size = record_size(record)
+        self._lru[track_id] = [record, size, time.time()]
+        self.resident_bytes += size
+
+    def _enforce(self, keep=None):
+        """Spill least recently used tracks until every limit holds (caller holds the lock)"""
+        now = time.time()
+        while self._lru:
+            track_id, (record, size, last_access) = next(iter(self._lru.items()))
+            if self.max_tracks and self.resident_count > self.max_tracks:
+                reason = 'count'
+            elif self.max_bytes and self.resident_bytes > self.max_bytes:
+                reason = 'bytes'
+            elif self.max_age and now - last_access > self.max_age:
+                reason = 'age'
+            else:
+                break
+            if track_id == keep:
+                if len(self._lru) == 1:
+                    break
+                self._lru.move_to_end(track_id)
+                continue
+            self._spill(track_id, record)
+            del self._lru[track_id]
+            self.resident_bytes -= size
+            TRACK_STORE_EVICTIONS.inc(reason=reason)
+
+    def _open_segment(self):
+        if self._segment is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            # Tracks don't outlive the process, so any previous segment is stale
+            self._segment = open(self._segment_path, 'w+b')
+            atexit.register(self.close)
+        return self._segment
+
+    def _spill(self, track_id, record):
+        if self._index[track_id] is not None:
+            return
+        payload = zlib.compress(json.dumps(record.to_dict(), separators=(',', ':')).encode('utf-8'))
+        segment = self._open_segment()
+        segment.seek(0, os.SEEK_END)
+        offset = segment.tell()
+        segment.write(payload)
+        self._index[track_id] = (offset, len(payload))
+
+    def _read_payload(self, track_id):
+        offset, length = self._index[track_id]
+        segment = self._open_segment()
+        segment.flush()
+        segment.seek(offset)
+        return segment.read(length)
+
+    def _read(self, track_id):
+        return TrackRecord.from_dict(json.loads(zlib.decompress(self._read_payload(track_id))))
+
+    def close(self):
+        """Close and delete the segment file"""
+        with self._lock:
+            if self._segment is None:
+                return
+            self._segment.close()
+            self._segment = None
+            try:
+                os.remove(self._segment_path)
+            except OSError:
+                pass
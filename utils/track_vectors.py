@@ -0,0 +1,184 @@
+"""
+Track Vectors - Contiguous feature matrix for "similar tracks" lookups
+"""
+import threading
+import zlib
+from config.settings import MUSIC_SETTINGS, SIMILARITY_CONFIG
+from utils.search_index import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; similarity is disabled without it
+    np = None
+
+# Relative weight of each feature group in the cosine similarity
+GROUP_WEIGHTS = {
+    'genre': 1.0,
+    'mood': 0.8,
+    'language': 0.6,
+    'style': 1.0,
+    'lyrics': 0.5
+}
+
+
+class TrackVectors:
+    """
+    One float32 row per track: one-hot genre, mood and language from
+    MUSIC_SETTINGS followed by signed hashed buckets of style and lyric
+    terms. Rows are L2-normalized, so cosine similarity is a dot product.
+
+    The matrix grows by doubling and rows are only ever appended, so
+    readers can score a snapshot of the first n rows without holding the
+    lock while new tracks are added.
+    """
+
+    def __init__(self, style_buckets=None, lyric_buckets=None, block_rows=65536):
+        """
+        Initialize an empty matrix
+
+        Args:
+            style_buckets (int): Hashed dimensions for style terms
+            lyric_buckets (int): Hashed dimensions for lyric terms
+            block_rows (int): Rows scored per block when searching
+        """
+        self.style_buckets = style_buckets or SIMILARITY_CONFIG['style_buckets']
+        self.lyric_buckets = lyric_buckets or SIMILARITY_CONFIG['lyric_buckets']
+        self.block_rows = block_rows
+        self._offsets = {}
+        offset = 0
+        for group in ('genres', 'moods', 'languages'):
+            self._offsets[group] = {value.lower(): offset + i for i, value in enumerate(MUSIC_SETTINGS[group])}
+            offset += len(MUSIC_SETTINGS[group])
+        self._style_offset = offset
+        self._lyric_offset = offset + self.style_buckets
+        self.dimensions = self._lyric_offset + self.lyric_buckets
+
+        self._matrix = np.zeros((1024, self.dimensions), dtype=np.float32) if np is not None else None
+        self._count = 0
+        self._row_ids = []  # row -> track id
+        self._rows = {}  # track id -> row
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return np is not None
+
+    @property
+    def nbytes(self):
+        return self._matrix.nbytes if self._matrix is not None else 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, track_id):
+        return track_id in self._rows
+
+    def vectorize(self, track):
+        """
+        Build the normalized feature vector for one track
+
+        Args:
+            track (dict): Track fields (genre, mood, language, style, lyrics)
+
+        Returns:
+            numpy.ndarray: float32 vector of length `dimensions`
+        """
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for group, field in (('genres', 'genre'), ('moods', 'mood'), ('languages', 'language')):
+            column = self._offsets[group].get(str(track.get(field) or '').strip().lower())
+            if column is not None:
+                vector[column] = GROUP_WEIGHTS[field]
+
+        self._hash_terms(vector, track.get('style'), self._style_offset, self.style_buckets, GROUP_WEIGHTS['style'])
+        self._hash_terms(vector, track.get('lyrics'), self._lyric_offset, self.lyric_buckets, GROUP_WEIGHTS['lyrics'])
+
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    @staticmethod
+    def _hash_terms(vector, text, offset, buckets, weight):
+        """Signed feature hashing of a text field into vector[offset:offset + buckets]"""
+        terms = tokenize(text)
+        if not terms:
+            return
+        section = vector[offset:offset + buckets]
+        for term in terms:
+            digest = zlib.crc32(term.encode('utf-8'))
+            section[digest % buckets] += 1.0 if digest & 0x80000000 else -1.0
+        norm = float(np.linalg.norm(section))
+        if norm:
+            section *= weight / norm
+
+    def add(self, track_id, track):
+        """
+        Append a track's vector
+
+        Args:
+            track_id (str): Track identifier
+            track (dict): Track fields
+        """
+        if np is None:
+            return
+        vector = self.vectorize(track)
+        with self._lock:
+            if track_id in self._rows:
+                return
+            if self._count == len(self._matrix):
+                grown = np.zeros((len(self._matrix) * 2, self.dimensions), dtype=np.float32)
+                grown[:self._count] = self._matrix[:self._count]
+                self._matrix = grown
+            self._matrix[self._count] = vector
+            self._rows[track_id] = self._count
+            self._row_ids.append(track_id)
+            self._count += 1
+
+    def most_similar(self, track_ids, k=10):
+        """
+        Cosine top-k for a batch of tracks
+
+        The matrix is scanned once in blocks, scoring every query track
+        against each block with a single matrix product.
+
+        Args:
+            track_ids (list): Query track identifiers (unknown ones are skipped)
+            k (int): Results per query
+
+        Returns:
+            dict: Query track id -> list of (track_id, score), best first
+        """
+        with self._lock:
+            matrix = self._matrix[:self._count]
+            row_ids = self._row_ids[:self._count]
+            query_rows = [(track_id, self._rows[track_id]) for track_id in track_ids if track_id in self._rows]
+        if not query_rows:
+            return {}
+
+        queries = matrix[[row for _, row in query_rows]]
+        # Keep k + 1 per block so the query track itself can be dropped
+        keep = k + 1
+        best_rows = np.empty((len(query_rows), 0), dtype=np.int64)
+        best_scores = np.empty((len(query_rows), 0), dtype=np.float32)
+        for start in range(0, len(matrix), self.block_rows):
+            scores = queries @ matrix[start:start + self.block_rows].T
+            if scores.shape[1] > keep:
+                top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_rows.shape[1] > keep:
+                top = np.argpartition(-best_scores, keep - 1, axis=1)[:, :keep]
+                best_rows = np.take_along_axis(best_rows, top, axis=1)
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+
+        results = {}
+        for i, (track_id, row) in enumerate(query_rows):
+            order = np.argsort(-best_scores[i], kind='stable')
+            results[track_id] = [
+                (row_ids[best_rows[i, j]], float(best_scores[i, j]))
+                for j in order if best_rows[i, j] != row
+            ][:k]
+        return results
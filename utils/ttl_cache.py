@@ -0,0 +1,85 @@
+"""
+TTL Cache - Small thread-safe cache with per-entry expiry
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, max_entries=1000, ttl=3600):
+        """
+        Initialize cache
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            ttl (float): Seconds an entry stays valid (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key):
+        """
+        Get a live entry
+
+        Args:
+            key (hashable): Cache key
+
+        Returns:
+            object: Cached value or None if missing/expired
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store an entry, evicting the least recently used one if full
+
+        Args:
+            key (hashable): Cache key
+            value (object): Value to store
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def age(self, key):
+        """
+        Get the age of an entry in seconds
+
+        Args:
+            key (hashable): Cache key
+
+        Returns:
+            float: Seconds since the entry was stored, or None if missing
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return time.time() - entry[0]
+
+    def __len__(self):
+        return len(self._entries)
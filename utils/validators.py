@@ -2,6 +2,10 @@
 Input Validators - Validate user inputs
 """
 import re
+from urllib.parse import urlparse
+from config.settings import AUDIO_CONFIG
+
+SYNTH_AUDIO_PATTERN = re.compile(r'^/api/audio/synth/[0-9a-f]{20}\.wav$')
 
 def validate_input(word):
     """
@@ -62,4 +66,47 @@ def validate_language(language):
         'Japanese', 'Korean', 'Chinese', 'Hindi', 'Tamil',
         'Portuguese', 'Arabic'
     ]
-    return language in supported_languages
\ No newline at end of file
+    return language in supported_languages
+
+
+def validate_remote_audio_url(url):
+    """
+    Check that a remote audio URL points at an allowed audio host
+
+    Args:
+        url (str): Remote audio URL
+
+    Returns:
+        bool: True if it is http(s) on an allowed host or one of its subdomains
+    """
+    try:
+        parsed = urlparse(str(url))
+        host = (parsed.hostname or '').lower()
+    except ValueError:
+        return False
+    if parsed.scheme not in ('http', 'https') or not host:
+        return False
+
+    allowed = set(AUDIO_CONFIG['allowed_hosts'])
+    # Freesound previews come from the configured API's host
+    api_host = urlparse(AUDIO_CONFIG['freesound_api_url']).hostname
+    if api_host:
+        allowed.add(api_host.lower())
+    return any(host == allowed_host or host.endswith('.' + allowed_host) for allowed_host in allowed)
+
+
+def validate_audio_url(url):
+    """
+    Check an audio URL supplied from outside (e.g. an import)
+
+    Args:
+        url (str): Audio URL
+
+    Returns:
+        bool: True if it is empty, a local synth clip or an allowed remote URL
+    """
+    if not url:
+        return True
+    if not isinstance(url, str):
+        return False
+    return bool(SYNTH_AUDIO_PATTERN.match(url)) or validate_remote_audio_url(url)